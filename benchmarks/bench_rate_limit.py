@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from admin_page_finder.rate_limit import AsyncRateLimiter
+
+
+async def measure(rate: float, duration: float = 1.0, workers: int = 200) -> float:
+    limiter = AsyncRateLimiter(rate, burst=1)
+    total = max(2, int(rate * duration))
+    remaining = total
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await limiter.acquire("bench")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    # The first token is available immediately, so pace over the remaining ones.
+    return (total - 1) / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    print(f"{'requested':>10} {'achieved':>10} {'error':>8}")
+    for rate in (10, 1_000, 10_000):
+        achieved = await measure(rate)
+        print(f"{rate:>10} {achieved:>10.0f} {100 * (achieved - rate) / rate:>7.1f}%")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
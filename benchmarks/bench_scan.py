@@ -1,22 +1,235 @@
+"""Offline scan benchmarks against an in-process local server.
+
+Runs a matrix of protocol x concurrency x wordlist size. Each case scans in
+a fresh subprocess, so peak RSS and CPU time belong to that case's scanner
+alone; the target server stays in this process on its own thread.
+
+    python benchmarks/bench_scan.py --output bench.json
+    python benchmarks/bench_scan.py --baseline bench.json   # exit 1 on regression
+"""
+
 from __future__ import annotations
 
+import argparse
 import asyncio
+import itertools
+import json
+import platform
+import resource
+import sys
 import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+
+from local_server import PROTOCOLS, ServerConfig, running_server, tls_available
 
+import admin_page_finder
 from admin_page_finder.scanner import scan_admin_paths
+from admin_page_finder.stats import ScanStats
+
+HIT_EVERY = 100
+
+# metric -> True when bigger is better
+METRICS = {
+    "throughput_rps": True,
+    "latency_p50_ms": False,
+    "latency_p99_ms": False,
+    "cpu_seconds": False,
+    "peak_rss_mb": False,
+}
+
+
+@dataclass(frozen=True)
+class Case:
+    protocol: str
+    concurrency: int
+    paths: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.protocol}-c{self.concurrency}-n{self.paths}"
+
+
+def wordlist(n: int) -> list[str]:
+    return [f"bench/{i}" for i in range(n)]
+
+
+def hit_paths(n: int) -> frozenset[str]:
+    return frozenset(f"/bench/{i}" for i in range(0, n, HIT_EVERY))
 
 
-async def main() -> None:
-    base = "http://example.com"
-    # Synthetic paths
-    paths = [f"admin/{i}" for i in range(200)]
+def _peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_case(case: Case, base_url: str) -> dict[str, Any]:
+    """Scan ``base_url`` once; runs in a fresh child process."""
+    paths = wordlist(case.paths)
+    stats = ScanStats()
+    cpu_start = time.process_time()
     start = time.perf_counter()
-    await scan_admin_paths(base, paths, concurrency=50)
-    mid = time.perf_counter()
-    await scan_admin_paths(base, paths, concurrency=200)
-    end = time.perf_counter()
-    print(f"50 concurrency: {mid - start:.3f}s, 200 concurrency: {end - mid:.3f}s")
+    results = asyncio.run(
+        scan_admin_paths(
+            base_url,
+            paths,
+            concurrency=case.concurrency,
+            per_host_concurrency=case.concurrency,
+            verify_tls=False,
+            calibrate=False,
+            stats=stats,
+        )
+    )
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    hits = sum(r.ok for r in results)
+    errors = sum(r.status == 0 for r in results)
+    return {
+        "requests": len(results),
+        "hits": hits,
+        "errors": errors,
+        "wall_seconds": round(wall, 4),
+        "throughput_rps": round(len(results) / wall, 1),
+        "latency_p50_ms": round((stats.latency.percentile(50) or 0) * 1000, 3),
+        "latency_p90_ms": round((stats.latency.percentile(90) or 0) * 1000, 3),
+        "latency_p99_ms": round((stats.latency.percentile(99) or 0) * 1000, 3),
+        "cpu_seconds": round(cpu, 4),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def run_suite(
+    protocols: list[str],
+    concurrencies: list[int],
+    sizes: list[int],
+    *,
+    latency: float,
+    body_size: int,
+) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    ctx = get_context("spawn")
+    for protocol in protocols:
+        config = ServerConfig(
+            protocol=protocol,
+            hit_paths=hit_paths(max(sizes)),
+            body_size=body_size,
+            latency=latency,
+        )
+        with running_server(config) as base_url:
+            for concurrency, size in itertools.product(concurrencies, sizes):
+                case = Case(protocol, concurrency, size)
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                    measured = pool.submit(run_case, case, base_url).result()
+                expected = len(range(0, size, HIT_EVERY))
+                if measured["hits"] != expected or measured["errors"]:
+                    print(
+                        f"warning: {case.key}: {measured['hits']}/{expected} hits, "
+                        f"{measured['errors']} errors",
+                        file=sys.stderr,
+                    )
+                results.append({"case": case.key, **asdict(case), **measured})
+                print(
+                    f"{case.key:>18} {measured['throughput_rps']:>9.0f} req/s "
+                    f"p50 {measured['latency_p50_ms']:>7.2f} ms "
+                    f"p99 {measured['latency_p99_ms']:>7.2f} ms "
+                    f"cpu {measured['cpu_seconds']:>6.2f} s "
+                    f"rss {measured['peak_rss_mb']:>6.1f} MB",
+                    file=sys.stderr,
+                )
+    return results
+
+
+def compare(
+    current: list[dict[str, Any]], baseline: list[dict[str, Any]], threshold: float
+) -> list[str]:
+    """Return one line per metric that got worse than ``threshold`` (a fraction)."""
+    previous = {row["case"]: row for row in baseline}
+    regressions: list[str] = []
+    for row in current:
+        old = previous.get(row["case"])
+        if old is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            before, after = old.get(metric), row.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append(
+                    f"{row['case']}: {metric} {before} -> {after} ({100 * change:+.1f}%)"
+                )
+    return regressions
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--protocols",
+        default="http,h1,h2",
+        help=f"Comma-separated subset of {','.join(PROTOCOLS)} (h1/h2 use TLS)",
+    )
+    parser.add_argument("--concurrency", type=_int_list, default=[10, 50, 200])
+    parser.add_argument("--sizes", type=_int_list, default=[1000, 10000])
+    parser.add_argument("--latency", type=float, default=0.0, help="Server delay per response")
+    parser.add_argument("--body-size", type=int, default=1024, help="Bytes per hit body")
+    parser.add_argument("--quick", action="store_true", help="One small case per protocol")
+    parser.add_argument("--output", type=Path, help="Write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="Compare against a previous results JSON")
+    parser.add_argument(
+        "--threshold", type=float, default=0.15, help="Allowed relative regression (0.15 = 15%%)"
+    )
+    args = parser.parse_args(argv)
+
+    protocols = [p for p in args.protocols.split(",") if p]
+    unknown = set(protocols) - set(PROTOCOLS)
+    if unknown:
+        parser.error(f"unknown protocol(s): {', '.join(sorted(unknown))}")
+    if not tls_available() and any(p != "http" for p in protocols):
+        print("warning: openssl not found, skipping TLS protocols", file=sys.stderr)
+        protocols = [p for p in protocols if p == "http"]
+    concurrency, sizes = args.concurrency, args.sizes
+    if args.quick:
+        concurrency, sizes = [50], [1000]
+
+    results = run_suite(
+        protocols, concurrency, sizes, latency=args.latency, body_size=args.body_size
+    )
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "version": getattr(admin_page_finder, "__version__", None),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "latency": args.latency,
+            "body_size": args.body_size,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline["results"], args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"no regressions beyond {100 * args.threshold:.0f}%", file=sys.stderr)
+    return 0
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(main())
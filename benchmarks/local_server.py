@@ -0,0 +1,235 @@
+"""In-process HTTP target for the benchmarks.
+
+Serves HTTP/1.1 over plain TCP, or HTTP/1.1 or HTTP/2 over TLS (picked by
+ALPN) from an asyncio loop running in a background thread, so the scanner
+talks to real sockets without leaving the machine.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import h2.config
+import h2.connection
+import h2.events
+import h2.exceptions
+
+PROTOCOLS = ("http", "h1", "h2")
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    """How the target behaves.
+
+    ``protocol`` is ``http`` (HTTP/1.1 cleartext), ``h1`` (HTTP/1.1 over TLS)
+    or ``h2`` (HTTP/2 over TLS). Paths in ``hit_paths`` answer 200 with
+    ``body_size`` bytes; everything else answers 404 with a short body.
+    ``latency`` delays every response.
+    """
+
+    protocol: str = "http"
+    hit_paths: frozenset[str] = field(default_factory=frozenset)
+    body_size: int = 1024
+    latency: float = 0.0
+
+
+def tls_available() -> bool:
+    return shutil.which("openssl") is not None
+
+
+def _self_signed_cert(directory: Path) -> tuple[Path, Path]:
+    cert, key = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "ec",
+            "-pkeyopt",
+            "ec_paramgen_curve:prime256v1",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=localhost",
+            "-keyout",
+            str(key),
+            "-out",
+            str(cert),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+class LocalServer:
+    def __init__(self, config: ServerConfig) -> None:
+        self.config = config
+        self._hit_body = b"x" * config.body_size
+        self._miss_body = b"not found"
+
+    def _answer(self, path: str) -> tuple[int, bytes]:
+        path = path.split("?", 1)[0]
+        if path in self.config.hit_paths:
+            return 200, self._hit_body
+        return 404, self._miss_body
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        ssl_object = writer.get_extra_info("ssl_object")
+        try:
+            if ssl_object is not None and ssl_object.selected_alpn_protocol() == "h2":
+                await self._serve_h2(reader, writer)
+            else:
+                await self._serve_h1(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError, ssl.SSLError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_h1(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            keep_alive = True
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.strip().lower() == "connection" and value.strip().lower() == "close":
+                    keep_alive = False
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            if self.config.latency:
+                await asyncio.sleep(self.config.latency)
+            status, body = self._answer(path)
+            reason = "OK" if status == 200 else "Not Found"
+            head = (
+                f"HTTP/1.1 {status} {reason}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Content-Type: text/html\r\n\r\n"
+            ).encode("latin-1")
+            writer.write(head if method == "HEAD" else head + body)
+            await writer.drain()
+            if not keep_alive:
+                return
+
+    async def _serve_h2(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+        # Bodies held back by flow control, flushed when the window opens.
+        pending: dict[int, bytes] = {}
+        tasks: set[asyncio.Task] = set()
+
+        def window(stream_id: int) -> int:
+            return min(conn.local_flow_control_window(stream_id), conn.max_outbound_frame_size)
+
+        def send_body(stream_id: int, body: bytes) -> None:
+            try:
+                while body and window(stream_id) > 0:
+                    size = window(stream_id)
+                    chunk, body = body[:size], body[size:]
+                    conn.send_data(stream_id, chunk, end_stream=not body)
+            except h2.exceptions.StreamClosedError:
+                body = b""
+            if body:
+                pending[stream_id] = body
+            else:
+                pending.pop(stream_id, None)
+
+        async def respond(stream_id: int, method: str, path: str) -> None:
+            if self.config.latency:
+                await asyncio.sleep(self.config.latency)
+            status, body = self._answer(path)
+            if method == "HEAD":
+                body = b""
+            try:
+                conn.send_headers(
+                    stream_id,
+                    [(":status", str(status)), ("content-length", str(len(body)))],
+                    end_stream=not body,
+                )
+            except h2.exceptions.StreamClosedError:
+                return
+            if body:
+                send_body(stream_id, body)
+            writer.write(conn.data_to_send())
+            with contextlib.suppress(ConnectionError):
+                await writer.drain()
+
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    return
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        headers = dict(event.headers)
+                        task = asyncio.create_task(
+                            respond(event.stream_id, headers[":method"], headers[":path"])
+                        )
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                    elif isinstance(event, h2.events.WindowUpdated):
+                        for stream_id, body in list(pending.items()):
+                            send_body(stream_id, body)
+                    elif isinstance(event, h2.events.StreamReset):
+                        pending.pop(event.stream_id, None)
+                    elif isinstance(event, h2.events.ConnectionTerminated):
+                        return
+                writer.write(conn.data_to_send())
+                await writer.drain()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+@contextlib.contextmanager
+def running_server(config: ServerConfig) -> Iterator[str]:
+    """Run a ``LocalServer`` on a background thread and yield its base URL."""
+    if config.protocol not in PROTOCOLS:
+        raise ValueError(f"protocol must be one of {PROTOCOLS}")
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    with tempfile.TemporaryDirectory() as tmp:
+        ssl_ctx = None
+        if config.protocol != "http":
+            cert, key = _self_signed_cert(Path(tmp))
+            ssl_ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            ssl_ctx.load_cert_chain(cert, key)
+            ssl_ctx.set_alpn_protocols(["h2"] if config.protocol == "h2" else ["http/1.1"])
+
+        server = LocalServer(config)
+        started = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(server.handle, "127.0.0.1", 0, ssl=ssl_ctx, backlog=1024), loop
+        )
+        srv = started.result(timeout=10)
+        port = srv.sockets[0].getsockname()[1]
+        scheme = "http" if ssl_ctx is None else "https"
+        try:
+            yield f"{scheme}://127.0.0.1:{port}"
+        finally:
+
+            async def shutdown() -> None:
+                srv.close()
+                await srv.wait_closed()
+
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout=10)
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+            loop.close()
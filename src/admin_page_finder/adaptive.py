@@ -0,0 +1,100 @@
+import asyncio
+import contextlib
+import time
+from collections import deque
+from typing import Optional
+
+# Answers that mean "you are going too fast" rather than "this path is absent".
+OVERLOAD_STATUSES = frozenset({429, 503})
+
+
+class AdaptiveLimiter:
+    """Per-host concurrency limit tuned by additive-increase/multiplicative-decrease.
+
+    Starts small and doubles every round trip (slow start) until the first
+    sign of overload, then grows by one slot per round trip. Timeouts,
+    connection errors, 429 and 503 shrink the limit by ``decrease``, at most
+    once per round trip. Latency well above the best seen pauses growth.
+    """
+
+    def __init__(
+        self,
+        initial: int = 2,
+        minimum: int = 1,
+        maximum: int = 64,
+        decrease: float = 0.5,
+        latency_factor: float = 3.0,
+    ) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self._limit = float(min(self.maximum, max(self.minimum, initial)))
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self._inflight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._slow_start = True
+        self._min_latency: Optional[float] = None
+        self._last_decrease = 0.0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    def locked(self) -> bool:
+        """Whether ``acquire`` would wait, like ``asyncio.Semaphore.locked``."""
+        return self._inflight >= self.limit or bool(self._waiters)
+
+    async def acquire(self) -> None:
+        if self._inflight < self.limit and not self._waiters:
+            self._inflight += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # The slot was handed over just as we were cancelled.
+                self._inflight -= 1
+                self._wake()
+            else:
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(fut)
+            raise
+
+    def release(self, *, latency: float, overloaded: bool = False) -> None:
+        self._inflight -= 1
+        if overloaded:
+            self._on_overload(latency)
+        else:
+            self._on_success(latency)
+        self._wake()
+
+    def _on_success(self, latency: float) -> None:
+        if self._min_latency is None or latency < self._min_latency:
+            self._min_latency = latency
+        if latency > self._min_latency * self.latency_factor:
+            return
+        step = 1.0 if self._slow_start else 1.0 / self._limit
+        self._limit = min(float(self.maximum), self._limit + step)
+
+    def _on_overload(self, latency: float) -> None:
+        self._slow_start = False
+        now = time.monotonic()
+        window = max(latency, self._min_latency or 0.0)
+        if now - self._last_decrease < window:
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.minimum), self._limit * self.decrease)
+
+    def _wake(self) -> None:
+        while self._waiters and self._inflight < self.limit:
+            fut = self._waiters.popleft()
+            if fut.done():
+                continue
+            self._inflight += 1
+            fut.set_result(None)
@@ -1,5 +1,15 @@
+import asyncio
+import contextlib
 import json
+import logging
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator, Mapping
 from pathlib import Path
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
 
 
 class JsonlCache:
@@ -30,10 +40,256 @@ class JsonlCache:
     def should_skip(self, path: str) -> bool:
         return path in self._seen
 
+    def iter_results(self) -> Iterator[dict]:
+        """Stored results, oldest first; unreadable lines are skipped."""
+        if not self.path.is_file():
+            return
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
     def append_result(self, result: dict) -> None:
+        self.add_many([result])
+
+    def add_many(self, results: Iterable[dict]) -> int:
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        count = 0
         with self.path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(result, ensure_ascii=False) + "\n")
-        p = result.get("path")
-        if p:
-            self._seen.add(p)
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+                p = result.get("path")
+                if p:
+                    self._seen.add(p)
+                count += 1
+        return count
+
+    def close(self) -> None:
+        return None
+
+
+class SqliteCache:
+    """Indexed result store keyed by (target, path, scan options).
+
+    Membership checks are single primary-key lookups, so resuming does not
+    depend on how many rows are stored. Results written with different scan
+    options (``options``) never satisfy each other, and rows older than
+    ``ttl`` seconds are ignored and purged.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        options: Optional[Mapping[str, object]] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        self.path = path
+        self.options_key = json.dumps(dict(options or {}), sort_keys=True)
+        self.ttl = ttl
+        self._local = threading.local()
+        self._conns: list[sqlite3.Connection] = []
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " target TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " options TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " data TEXT NOT NULL,"
+            " PRIMARY KEY (target, path, options)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.commit()
+        if ttl is not None:
+            self.expire()
+
+    def __getstate__(self) -> dict:
+        # Picklable for worker processes, which open their own connection.
+        return {"path": self.path, "options_key": self.options_key, "ttl": self.ttl}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._local = threading.local()
+        self._conns = []
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread, so CheckpointWriter can commit from a
+        # worker thread while lookups go on; in WAL mode they do not block.
+        conn: Optional[sqlite3.Connection] = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._conns.append(conn)
+        return conn
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl if self.ttl is not None else float("-inf")
+
+    def should_skip(self, target: str, path: str) -> bool:
+        row = self._conn.execute(
+            "SELECT 1 FROM results WHERE target = ? AND path = ? AND options = ? AND created >= ?",
+            (target, path, self.options_key, self._cutoff()),
+        ).fetchone()
+        return row is not None
+
+    def get(self, target: str, path: str) -> Optional[dict]:
+        """The stored result for ``target`` and ``path`` under these options."""
+        row = self._conn.execute(
+            "SELECT data FROM results"
+            " WHERE target = ? AND path = ? AND options = ? AND created >= ?",
+            (target, path, self.options_key, self._cutoff()),
+        ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def add_many(self, results: Iterable[dict]) -> int:
+        """Insert (or refresh) a batch of result dicts in one transaction."""
+        now = time.time()
+        rows = [
+            (
+                r.get("target", ""),
+                r.get("path", ""),
+                self.options_key,
+                now,
+                json.dumps(r, ensure_ascii=False),
+            )
+            for r in results
+        ]
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def iter_results(
+        self, target: Optional[str] = None, *, any_options: bool = False
+    ) -> Iterable[dict]:
+        """Stored results for these options (or, with ``any_options``, all of them)."""
+        query = "SELECT data FROM results WHERE created >= ?"
+        params: list[object] = [self._cutoff()]
+        if not any_options:
+            query += " AND options = ?"
+            params.append(self.options_key)
+        if target is not None:
+            query += " AND target = ?"
+            params.append(target)
+        for (data,) in self._conn.execute(query, params):
+            yield json.loads(data)
+
+    def expire(self) -> int:
+        """Delete rows older than the TTL; returns how many were removed."""
+        if self.ttl is None:
+            return 0
+        with self._conn:
+            cur = self._conn.execute("DELETE FROM results WHERE created < ?", (self._cutoff(),))
+        return cur.rowcount
+
+    def __len__(self) -> int:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        return int(count)
+
+    def close(self) -> None:
+        for conn in self._conns:
+            conn.close()
+        self._conns.clear()
+        self._local = threading.local()
+
+
+def open_cache(
+    path: Path,
+    *,
+    options: Optional[Mapping[str, object]] = None,
+    ttl: Optional[float] = None,
+) -> Union[JsonlCache, SqliteCache]:
+    """Open a JSONL cache for ``.jsonl`` files and a SQLite store for anything else."""
+    if path.suffix.lower() == ".jsonl":
+        return JsonlCache(path)
+    return SqliteCache(path, options=options, ttl=ttl)
+
+
+_STOP = object()
+
+
+class CheckpointWriter:
+    """Persist results to a cache from a background task while a scan runs.
+
+    Results are queued with ``put`` and written in batches of ``batch_size``
+    or every ``flush_interval`` seconds, whichever comes first, so a killed
+    scan loses at most one interval of work. The queue is bounded by
+    ``max_pending``; a slow disk applies backpressure instead of growing
+    memory.
+    """
+
+    def __init__(
+        self,
+        cache: Union[JsonlCache, SqliteCache],
+        *,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_pending: int = 10_000,
+    ) -> None:
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_pending))
+        self._task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "CheckpointWriter":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, result: dict) -> None:
+        await self._queue.put(result)
+
+    async def aclose(self) -> None:
+        """Flush everything queued so far and stop the writer."""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def _flush(self, batch: list[dict]) -> None:
+        if not batch:
+            return
+        try:
+            # Off the event loop: a commit on a slow disk must not stall the scan.
+            self.written += await asyncio.to_thread(self.cache.add_many, batch)
+        except Exception:
+            logger.exception("Failed to checkpoint %d results", len(batch))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        batch: list[dict] = []
+        deadline = loop.time() + self.flush_interval
+        while True:
+            item = None
+            with contextlib.suppress(asyncio.TimeoutError):
+                item = await asyncio.wait_for(self._queue.get(), max(0.0, deadline - loop.time()))
+            while item is not None and item is not _STOP:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    item = None
+            if item is _STOP:
+                await self._flush(batch)
+                return
+            if len(batch) >= self.batch_size or loop.time() >= deadline:
+                await self._flush(batch)
+                batch = []
+                deadline = loop.time() + self.flush_interval
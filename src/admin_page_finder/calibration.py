@@ -0,0 +1,109 @@
+import asyncio
+import hashlib
+import re
+import secrets
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urljoin, urlparse
+
+import httpx
+
+from .http import DEFAULT_PREFIX_BYTES, AsyncHttpClient, response_length
+
+# Volatile tokens (timestamps, ids, CSRF nonces) that differ between otherwise
+# identical error pages.
+_VOLATILE_RE = re.compile(rb"[0-9a-f]{8,}|\d+")
+_WS_RE = re.compile(rb"\s+")
+
+# Suffixes used for calibration probes; some stacks only soft-404 per extension.
+CALIBRATION_SUFFIXES = ("", ".php", "/")
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    status: int
+    length_bucket: int
+    body_hash: str
+
+
+@dataclass
+class HostBaseline:
+    """What the host answers for paths that certainly do not exist."""
+
+    fingerprints: set[Fingerprint] = field(default_factory=set)
+    wildcard: bool = False
+
+    @property
+    def statuses(self) -> set[int]:
+        return {fp.status for fp in self.fingerprints}
+
+    def matches(self, fp: Fingerprint) -> bool:
+        for base in self.fingerprints:
+            if base.status != fp.status:
+                continue
+            if base.body_hash and fp.body_hash:
+                if base.body_hash == fp.body_hash:
+                    return True
+            elif base.length_bucket == fp.length_bucket:
+                return True
+        return False
+
+
+def _length_bucket(length: int) -> int:
+    # Quarter-octave buckets: the bit length plus the two bits after the leading one.
+    bits = max(0, length).bit_length()
+    return bits * 4 + (length >> max(0, bits - 3)) % 4
+
+
+def _normalize_body(body: bytes, path: str) -> bytes:
+    text = body.lower()
+    tokens = {path, path.strip("/"), path.rstrip("/").rpartition("/")[2]}
+    for token in sorted(tokens, key=len, reverse=True):
+        if token:
+            text = text.replace(token.lower().encode("utf-8", "replace"), b"")
+    text = _VOLATILE_RE.sub(b"0", text)
+    return _WS_RE.sub(b" ", text).strip()
+
+
+def fingerprint_response(resp: httpx.Response, body: bytes, path: str) -> Fingerprint:
+    """Fingerprint a response by status, length bucket and normalized body prefix.
+
+    For redirects the target location stands in for the body. An empty
+    ``body`` (e.g. from a HEAD probe) yields an empty hash, in which case
+    only status and length bucket are compared.
+    """
+    if resp.is_redirect:
+        location = urlparse(resp.headers.get("location", "")).path
+        body = location.encode("utf-8", "replace")
+    digest = ""
+    if body:
+        digest = hashlib.sha1(_normalize_body(body, path)).hexdigest()
+    # A ranged probe's 206 is the same answer as a plain 200.
+    status = 200 if resp.status_code == 206 else resp.status_code
+    return Fingerprint(status, _length_bucket(response_length(resp)), digest)
+
+
+async def calibrate_host(
+    client: AsyncHttpClient,
+    base_url: str,
+    *,
+    max_bytes: int = DEFAULT_PREFIX_BYTES,
+) -> Optional[HostBaseline]:
+    """Probe a few random nonexistent paths and record how the host answers.
+
+    Returns ``None`` when calibration itself fails (e.g. the host is down).
+    """
+
+    async def sample(suffix: str) -> Fingerprint:
+        path = "/" + secrets.token_hex(12) + suffix
+        url = urljoin(base_url + "/", path.lstrip("/"))
+        resp, body = await client.get_prefix(url, max_bytes, follow_redirects=False)
+        return fingerprint_response(resp, body, path)
+
+    try:
+        fps = await asyncio.gather(*(sample(s) for s in CALIBRATION_SUFFIXES))
+    except Exception:
+        return None
+    # Every random path "exists": the host answers 200 for anything.
+    wildcard = all(fp.status == 200 for fp in fps)
+    return HostBaseline(fingerprints=set(fps), wildcard=wildcard)
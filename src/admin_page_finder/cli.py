@@ -1,58 +1,224 @@
 import asyncio
-import csv
-import json
+import contextlib
+import functools
+import itertools
+import tempfile
+from collections.abc import Callable, Iterable, Iterator, Mapping
 from pathlib import Path
-from typing import Optional
+from typing import Optional, TypedDict
 
 import typer
 from rich.console import Console
-from rich.progress import Progress
+from rich.live import Live
 
-from .cache import JsonlCache
-from .discovery import fetch_homepage_hints, fetch_robots_paths, fetch_sitemap_paths
-from .http import AsyncHttpClient
+from .cache import CheckpointWriter, JsonlCache, SqliteCache, open_cache
+from .crawler import CrawlBudget
+from .dashboard import ScanDashboard
+from .discovery import fetch_homepage, fetch_robots, fetch_sitemap_paths, homepage_hints
+from .http import DEFAULT_KEEPALIVE_EXPIRY
 from .logging_utils import configure_logging
-from .scanner import scan_admin_paths
+from .metrics import MetricsTextfileWriter, ScanMetrics, serve_metrics
+from .profiling import ScanProfiler
+from .ranking import HitHistory, PathRanker
+from .resolver import DEFAULT_DNS_TTL, DnsCache, load_hosts_file
+from .retry import RetryPolicy
+from .scanner import ABSENT_STATUSES, ScanResult, _normalize_base_url
+from .session import ScanSession
+from .sharding import iter_scan_sharded
+from .sinks import STDOUT, open_sink
+from .stats import ScanStats
+from .technology import StackFilter, TechProfile, detect_technologies
+from .wordlist import FingerprintSet, _fingerprint, count_wordlist, dedupe, iter_wordlist
+from .wordlist_index import INDEX_SUFFIX, WordlistIndex, compile_index, is_index
 
 app = typer.Typer(help="Admin Page Finder – async scanner for common admin paths")
+wordlist_app = typer.Typer(help="Compile and query wordlist indexes")
+app.add_typer(wordlist_app, name="wordlist")
 console = Console()
 
 
 WORDLIST_DIR = Path(__file__).parent / "wordlists"
 DEFAULT_WORDLIST = WORDLIST_DIR / "mega.txt"
+DEFAULT_INDEX = WORDLIST_DIR / f"wordlists{INDEX_SUFFIX}"
+# Built-in lists in index order; each list's tag is its file stem.
+BUILTIN_WORDLISTS = ["mega", "core", "php", "java", "node", "python"]
 
 
-def _load_wordlist(path: Optional[Path]) -> list[str]:
-    wl_path = path or DEFAULT_WORDLIST
-    if wl_path and wl_path.is_file():
-        lines = wl_path.read_text(encoding="utf-8").splitlines()
-        return [
-            line.strip()
-            for line in lines
-            if line.strip() and not line.startswith("#")
-        ]
-    return [
-        "admin/",
-        "administrator/",
-        "wp-admin/",
-        "wp-login.php",
-        "admin/login.php",
-        "login",
-    ]
+FALLBACK_PATHS = [
+    "admin/",
+    "administrator/",
+    "wp-admin/",
+    "wp-login.php",
+    "admin/login.php",
+    "login",
+]
+
+
+class _ScanOptions(TypedDict, total=False):
+    """Keyword arguments ``scan`` passes to ``iter_scan`` or ``iter_scan_sharded``."""
+
+    extra_paths: Optional[Mapping[str, Iterable[str]]]
+    skip: Optional[Callable[[str, str], bool]]
+    concurrency: int
+    per_host_concurrency: int
+    rate_limit: Optional[float]
+    rate_burst: int
+    timeout: float
+    verify_tls: bool
+    follow_redirects: bool
+    proxy: Optional[str]
+    headers: Optional[Mapping[str, str]]
+    cookies: Optional[Mapping[str, str]]
+    rotate_user_agents: bool
+    probe: str
+    calibrate: bool
+    wildcard_policy: str
+    adaptive: bool
+    stats: Optional[ScanStats]
+    per_host_rate: Optional[float]
+    retry_policy: Optional[RetryPolicy]
+    metrics: Optional[ScanMetrics]
+    http_version: str
+    pool_size: Optional[int]
+    keepalive_expiry: float
+    h2_max_streams: Optional[int]
+    resolver: Optional[DnsCache]
+    rank: Optional[Callable[[str, str], float]]
+    stop_after_hits: Optional[int]
+    host_time_budget: Optional[float]
+    tree: bool
+    cached_absent: Optional[Callable[[str, str], bool]]
+    crawl: Optional[CrawlBudget]
+
+
+def _split_tags(value: Optional[str]) -> list[str]:
+    return [t.strip() for t in (value or "").split(",") if t.strip()]
+
+
+def _default_index() -> Optional[Path]:
+    """The compiled built-in index, if it is newer than every built-in list."""
+    if not DEFAULT_INDEX.is_file():
+        return None
+    built = DEFAULT_INDEX.stat().st_mtime
+    sources = [WORDLIST_DIR / f"{name}.txt" for name in BUILTIN_WORDLISTS]
+    if any(p.is_file() and p.stat().st_mtime > built for p in sources):
+        return None
+    return DEFAULT_INDEX
+
+
+def _load_wordlist(
+    path: Optional[Path],
+    tags: Optional[list[str]] = None,
+    exclude_tags: Optional[list[str]] = None,
+    *,
+    resources: contextlib.ExitStack,
+) -> tuple[Iterator[str], int]:
+    """Return a lazy iterator over the wordlist and its entry count.
+
+    ``tags`` pick entries from a compiled index (``-w``, or the built-in one
+    from ``apf wordlist compile``); without an index they name built-in lists.
+    An index stays open until ``resources`` is closed.
+    """
+    if path is None:
+        path = _default_index()
+        tags = tags or ["mega"]
+    if path is not None and is_index(path):
+        index = resources.enter_context(WordlistIndex(path))
+        try:
+            return index.select(tags, exclude_tags=exclude_tags), index.count(
+                tags, exclude_tags=exclude_tags
+            )
+        except KeyError as exc:
+            raise typer.BadParameter(str(exc.args[0])) from exc
+    if path is not None:
+        if tags or exclude_tags:
+            raise typer.BadParameter("--tags needs a compiled index (apf wordlist compile)")
+        return iter_wordlist(path), count_wordlist(path)
+
+    lists = [WORDLIST_DIR / f"{tag}.txt" for tag in tags or ["mega"]]
+    missing = [p.stem for p in lists if not p.is_file()]
+    if missing == ["mega"]:
+        return iter(FALLBACK_PATHS), len(FALLBACK_PATHS)
+    if missing:
+        raise typer.BadParameter(f"no built-in wordlist for tag(s): {', '.join(missing)}")
+    excluded = FingerprintSet()
+    for tag in exclude_tags or []:
+        if (WORDLIST_DIR / f"{tag}.txt").is_file():
+            for e in iter_wordlist(WORDLIST_DIR / f"{tag}.txt"):
+                excluded.add(_fingerprint(e))
+    count = sum(count_wordlist(p) for p in lists)
+    entries = dedupe(itertools.chain.from_iterable(iter_wordlist(p) for p in lists), count)
+    return (e for e in entries if _fingerprint(e) not in excluded), count
+
+
+def _builtin_sources() -> list[tuple[Path, list[str]]]:
+    paths = [WORDLIST_DIR / f"{name}.txt" for name in BUILTIN_WORDLISTS]
+    return [(p, [p.stem]) for p in paths if p.is_file()]
+
+
+def _tag_index(wordlist: Optional[Path], cleanup: contextlib.ExitStack) -> Path:
+    """Index to look up path tags in: the scanned one, else the built-in lists'."""
+    if wordlist is not None and is_index(wordlist):
+        return wordlist
+    index = _default_index()
+    if index is None:
+        tmp = Path(cleanup.enter_context(tempfile.TemporaryDirectory(prefix="apf-")))
+        index = tmp / f"wordlists{INDEX_SUFFIX}"
+        compile_index(_builtin_sources(), index)
+    return index
+
+
+def _any_skip(skips: tuple, target: str, path: str) -> bool:
+    return any(skip(target, path) for skip in skips)
+
+
+def _path_seen(seen: frozenset[str], _target: str, path: str) -> bool:
+    return path in seen
+
+
+def _result_absent(result: Optional[Mapping]) -> bool:
+    return result is not None and (
+        result.get("status") in ABSENT_STATUSES or bool(result.get("soft_404"))
+    )
+
+
+def _cached_absent(cache: SqliteCache, target: str, path: str) -> bool:
+    return _result_absent(cache.get(target, path))
+
+
+def _no_phase(_name: str) -> contextlib.AbstractContextManager[None]:
+    return contextlib.nullcontext()
+
+
+def _load_targets(url: Optional[str], targets_file: Optional[Path]) -> list[str]:
+    targets: list[str] = [url] if url else []
+    if targets_file:
+        for line in targets_file.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#"):
+                targets.append(line)
+    if not targets:
+        raise typer.BadParameter("Provide a target URL or --targets-file")
+    return targets
 
 
 def _execute_scan(
-    url: str,
+    targets: list[str],
     *,
     wordlist: Optional[Path],
+    tags: Optional[str],
+    exclude_tags: Optional[str],
     discover: bool,
+    fingerprint: bool,
     concurrency: int,
     per_host: int,
     rate_limit: Optional[float],
     rate_burst: int,
+    per_host_rate: Optional[float],
     timeout: float,
     json_out: Optional[Path],
     csv_out: Optional[Path],
+    ndjson_out: Optional[Path],
     proxy: Optional[str],
     ua: Optional[str],
     rotate_ua: bool,
@@ -60,14 +226,53 @@ def _execute_scan(
     cookie: Optional[list[str]],
     no_verify: bool,
     no_redirects: bool,
+    probe: str,
+    calibrate: bool,
+    wildcard: str,
+    adaptive: bool,
+    retries: int,
+    retry_budget: float,
     cache_file: Optional[Path],
+    cache_ttl: Optional[float],
+    rank: bool,
+    history: Optional[list[Path]],
+    stop_after_hits: Optional[int],
+    host_budget: Optional[float],
+    tree: bool,
+    crawl: bool,
+    crawl_pages: int,
+    crawl_bytes: int,
+    metrics_port: Optional[int],
+    metrics_file: Optional[Path],
+    metrics_interval: float,
+    profile: bool,
+    profile_out: Optional[Path],
+    http_version: str,
+    pool_size: Optional[int],
+    keepalive: float,
+    h2_max_streams: Optional[int],
+    dns_prefetch: bool,
+    dns_ttl: float,
+    resolve: Optional[list[str]],
+    hosts_file: Optional[Path],
+    workers: int,
     log_level: str,
     log_json: bool,
     verbose: bool,
 ) -> None:
     configure_logging(log_level, json_mode=log_json)
 
-    base_paths = _load_wordlist(wordlist)
+    profiler = ScanProfiler() if profile or profile_out else None
+    phase = profiler.phase if profiler else _no_phase
+    if profiler:
+        profiler.start()
+
+    # Open for the whole scan: the wordlist is read lazily while it runs.
+    resources = contextlib.ExitStack()
+    with phase("wordlist"):
+        base_paths, base_count = _load_wordlist(
+            wordlist, _split_tags(tags), _split_tags(exclude_tags), resources=resources
+        )
 
     headers: dict[str, str] = {}
     if ua:
@@ -85,43 +290,166 @@ def _execute_scan(
                 k, v = c.split("=", 1)
                 cookies_dict[k.strip()] = v.strip()
 
-    cache = JsonlCache(cache_file) if cache_file else None
+    with phase("cache"):
+        cache = (
+            open_cache(
+                cache_file,
+                options={"probe": probe, "redirects": not no_redirects, "calibrate": calibrate},
+                ttl=cache_ttl,
+            )
+            if cache_file
+            else None
+        )
+        skip: Optional[Callable[[str, str], bool]] = None
+        # Lets --tree prune cached directories again instead of expanding them.
+        cached_absent: Optional[Callable[[str, str], bool]] = None
+        if isinstance(cache, JsonlCache):
+            # Partials rather than closures so --workers can pickle them.
+            skip = functools.partial(_path_seen, frozenset(cache.load_seen()))
+            if tree:
+                absent = frozenset(r["path"] for r in cache.iter_results() if _result_absent(r))
+                cached_absent = functools.partial(_path_seen, absent)
+        elif cache is not None:
+            skip = cache.should_skip
+            cached_absent = functools.partial(_cached_absent, cache)
+        # Past results, from the resume cache and any --history files, order the probes.
+        hit_history = (
+            HitHistory.load([p for p in [cache_file, *(history or [])] if p and p.is_file()])
+            if rank
+            else HitHistory()
+        )
+    static_hosts: dict[str, list[str]] = load_hosts_file(hosts_file) if hosts_file else {}
+    for entry in resolve or []:
+        host, sep, addr = entry.partition(":")
+        if not sep or not host or not addr:
+            raise typer.BadParameter(f"--resolve expects HOST:ADDRESS, got {entry!r}")
+        static_hosts.setdefault(host.lower(), []).append(addr.strip("[]"))
+    resolver = DnsCache(ttl=dns_ttl, hosts=static_hosts) if dns_prefetch or static_hosts else None
+
+    retry_policy = RetryPolicy(max_attempts=max(0, retries) + 1, budget_ratio=retry_budget)
+    stats = ScanStats()
+    # Always collected: the summary reports connection reuse from it.
+    metrics = ScanMetrics(stats)
+
+    outputs = {"json": json_out, "csv": csv_out, "ndjson": ndjson_out}
+    # Keep stdout clean for piping when a sink writes there.
+    out = console
+    if any(str(p) == STDOUT for p in outputs.values() if p):
+        out = Console(stderr=True)
 
-    with Progress(transient=not verbose) as progress:
-        task = progress.add_task("Scanning", total=0)
+    dashboard = ScanDashboard(stats)
+    with Live(dashboard, console=out, transient=not verbose, refresh_per_second=4):
 
         async def run():
-            all_paths = list(base_paths)
-            if discover:
-                client = AsyncHttpClient(
-                    timeout=timeout,
-                    verify_tls=not no_verify,
-                    follow_redirects=not no_redirects,
-                    proxy=proxy,
-                    headers=headers or None,
-                    cookies=cookies_dict or None,
+            metrics_server = None
+            metrics_writer = None
+            if metrics_port is not None:
+                metrics_server = await serve_metrics(metrics, port=metrics_port)
+            if metrics_file:
+                metrics_writer = MetricsTextfileWriter(
+                    metrics, metrics_file, interval=metrics_interval
                 )
-                robots, sitemap, homepage = await asyncio.gather(
-                    fetch_robots_paths(client, url),
-                    fetch_sitemap_paths(client, url),
-                    fetch_homepage_hints(client, url),
+                metrics_writer.start()
+            if profiler:
+                profiler.start_lag_monitor()
+            try:
+                await scan_all()
+            finally:
+                if profiler:
+                    await profiler.stop_lag_monitor()
+                if metrics_server is not None:
+                    metrics_server.close()
+                    await metrics_server.wait_closed()
+                if metrics_writer is not None:
+                    await metrics_writer.aclose()
+
+        async def scan_all():
+            # Discovery and the scan share one client, so each target's
+            # connections (TLS, HTTP/2) are set up once. Worker processes
+            # cannot share it and open their own for the scan.
+            async with ScanSession(
+                timeout=timeout,
+                verify_tls=not no_verify,
+                follow_redirects=not no_redirects,
+                proxy=proxy,
+                headers=headers or None,
+                cookies=cookies_dict or None,
+                rotate_user_agents=rotate_ua,
+                rate_limit=rate_limit,
+                rate_burst=rate_burst,
+                per_host_rate=per_host_rate,
+                retry_policy=retry_policy,
+                metrics=metrics,
+                http_version=http_version,
+                pool_size=pool_size or concurrency,
+                keepalive_expiry=keepalive,
+                h2_max_streams=h2_max_streams,
+                resolver=resolver,
+            ) as session:
+                await scan_session(session)
+
+        async def scan_session(session: ScanSession):
+            extra_paths: dict[str, list[str]] = {}
+            profiles: dict[str, TechProfile] = {}
+            if discover or fingerprint:
+                with phase("discovery"):
+                    client = session.client
+
+                    async def discover_target(url: str) -> None:
+                        # One homepage fetch serves both link hints and fingerprinting.
+                        if discover:
+                            # robots.txt also lists sitemaps; the crawl starts without it.
+                            robots = asyncio.ensure_future(fetch_robots(client, url))
+                            homepage, sitemap = await asyncio.gather(
+                                fetch_homepage(client, url),
+                                fetch_sitemap_paths(client, url, robots=robots),
+                            )
+                            extra_paths[url] = (
+                                (await robots).disallowed + sitemap + homepage_hints(homepage, url)
+                            )
+                        else:
+                            homepage = await fetch_homepage(client, url)
+                        if fingerprint and homepage is not None:
+                            profiles[url] = detect_technologies(homepage)
+
+                    await asyncio.gather(*(discover_target(t) for t in targets))
+            paths: Iterator[str] = dedupe(base_paths, base_count)
+
+            cleanup = contextlib.ExitStack()
+            scan_skip = skip
+            stack_filter: Optional[StackFilter] = None
+            for url, profile in profiles.items():
+                if profile.stacks:
+                    out.print(
+                        f"[dim]{url}: {', '.join(sorted(profile.stacks))} "
+                        f"({'; '.join(profile.evidence[:3])})[/dim]"
+                    )
+            if any(p.stacks for p in profiles.values()):
+                stack_filter = StackFilter(
+                    {_normalize_base_url(u): p.stacks for u, p in profiles.items()},
+                    index=_tag_index(wordlist, cleanup),
                 )
-                await client.aclose()
-                all_paths.extend(robots)
-                all_paths.extend(sitemap)
-                all_paths.extend(homepage)
-            seen = set()
-            paths = [p for p in all_paths if not (p in seen or seen.add(p))]
-
-            if cache:
-                seen_paths = cache.load_seen()
-                paths = [p for p in paths if p not in seen_paths]
-
-            progress.update(task, total=len(paths))
-
-            results = await scan_admin_paths(
-                url,
-                paths,
+                cleanup.callback(stack_filter.close)
+                scan_skip = (
+                    functools.partial(_any_skip, (skip, stack_filter)) if skip else stack_filter
+                )
+            ranker = (
+                PathRanker(hit_history, stack_filter)
+                if rank and (len(hit_history) or stack_filter)
+                else None
+            )
+
+            total = base_count * len(targets) + sum(len(ps) for ps in extra_paths.values())
+            dashboard.set_total(total)
+
+            hits: list[ScanResult] = []
+            sinks = [open_sink(kind, p) for kind, p in outputs.items() if p]
+            checkpoint = CheckpointWriter(cache) if cache is not None else None
+            if checkpoint:
+                checkpoint.start()
+            scan_options = _ScanOptions(
+                extra_paths=extra_paths,
+                skip=scan_skip,
                 concurrency=concurrency,
                 per_host_concurrency=per_host,
                 rate_limit=rate_limit,
@@ -133,74 +461,148 @@ def _execute_scan(
                 headers=headers or None,
                 cookies=cookies_dict or None,
                 rotate_user_agents=rotate_ua,
+                probe=probe,
+                calibrate=calibrate,
+                wildcard_policy=wildcard,
+                adaptive=adaptive,
+                stats=stats,
+                per_host_rate=per_host_rate,
+                retry_policy=retry_policy,
+                metrics=metrics,
+                http_version=http_version,
+                pool_size=pool_size,
+                keepalive_expiry=keepalive,
+                h2_max_streams=h2_max_streams,
+                resolver=resolver,
+                rank=ranker,
+                stop_after_hits=stop_after_hits,
+                host_time_budget=host_budget,
+                tree=tree,
+                cached_absent=cached_absent,
+                crawl=CrawlBudget(max_pages=crawl_pages, max_bytes=crawl_bytes) if crawl else None,
+            )
+            scan_iter = (
+                iter_scan_sharded(targets, paths, workers=workers, **scan_options)
+                if workers > 1
+                else session.scan(targets, paths, **scan_options)
             )
-            for r in results:
-                progress.update(task, advance=1)
-                if cache:
-                    cache.append_result(r.__dict__)
+            try:
+                with phase("scan"):
+                    async for r in scan_iter:
+                        if r.ok:
+                            hits.append(r)
+                        with phase("scan.output"):
+                            for sink in sinks:
+                                sink.write(r)
+                            if checkpoint:
+                                await checkpoint.put(r.__dict__)
+                        dashboard.advance()
+                dashboard.finish()
+            finally:
+                # Also runs on Ctrl-C, so whatever finished is durable for --cache resume.
+                with phase("finalize"):
+                    await scan_iter.aclose()
+                    for sink in sinks:
+                        sink.close()
+                    if checkpoint:
+                        await checkpoint.aclose()
+                    if cache is not None:
+                        cache.close()
+                    cleanup.close()
 
-            hits = [r for r in results if r.ok]
             if hits:
-                console.print(
-                    f"[bold green]{len(hits)} admin page(s) found[/bold green]"
-                )
+                out.print(f"[bold green]{len(hits)} admin page(s) found[/bold green]")
                 for r in hits:
-                    console.print(
+                    out.print(
                         f"[green]{r.status}[/green] {r.url} "
                         f"({r.elapsed_ms} ms, {r.content_length} bytes)"
                         f"{' [redirect]' if r.redirected else ''}"
                     )
             else:
-                console.print("[yellow]No admin pages found[/yellow]")
-            if json_out:
-                json_out.write_text(
-                    json.dumps([r.__dict__ for r in results], indent=2),
-                    encoding="utf-8",
+                out.print("[yellow]No admin pages found[/yellow]")
+            if stack_filter is not None:
+                for target, count in stack_filter.pruned.items():
+                    out.print(f"[dim]{target}: {count} paths skipped for other stacks[/dim]")
+            for host, count in stats.host_pruned.items():
+                out.print(f"[dim]{host}: {count} paths skipped under missing directories[/dim]")
+            for host, count in stats.host_retries.items():
+                out.print(f"[dim]{host}: {count} retries[/dim]")
+            for host, limit in stats.host_concurrency.items():
+                out.print(f"[dim]{host}: adaptive concurrency settled at {limit}[/dim]")
+            responses = sum(metrics.requests.values())
+            if responses:
+                versions = ", ".join(f"{v} {n}" for v, n in metrics.http_versions.most_common())
+                out.print(
+                    f"[dim]{responses} responses over {metrics.connections_opened} new "
+                    f"connection(s), {metrics.connection_reuse_ratio:.0%} reused ({versions})[/dim]"
                 )
-            if csv_out:
-                with csv_out.open("w", newline="", encoding="utf-8") as f:
-                    writer = csv.DictWriter(
-                        f,
-                        fieldnames=[
-                            "path",
-                            "url",
-                            "status",
-                            "ok",
-                            "redirected",
-                            "final_url",
-                            "elapsed_ms",
-                            "content_length",
-                        ],
-                    )
-                    writer.writeheader()
-                    for r in results:
-                        writer.writerow(r.__dict__)
-        asyncio.run(run())
+
+        try:
+            asyncio.run(run())
+        finally:
+            resources.close()
+            # Also on Ctrl-C: an interrupted slow scan is when the profile matters most.
+            if profiler:
+                profiler.stop()
+                if profile_out:
+                    profiler.dump(profile_out)
+                out.print(profiler.report(metrics))
+                if profile_out:
+                    out.print(f"[dim]cProfile data written to {profile_out}[/dim]")
 
 
 @app.command()
 def scan(
-    url: str = typer.Argument(..., help="Target base URL or hostname"),
+    url: Optional[str] = typer.Argument(None, help="Target base URL or hostname"),
+    targets_file: Optional[Path] = typer.Option(
+        None,
+        "--targets-file",
+        "-T",
+        exists=True,
+        readable=True,
+        help="File with one target per line, scanned together on one client",
+    ),
     wordlist: Optional[Path] = typer.Option(
         None,
         "--wordlist",
         "-w",
         exists=True,
         readable=True,
-        help="Path to wordlist file (defaults to built-in mega list)",
+        help="Wordlist file or compiled index (defaults to built-in mega list)",
+    ),
+    tags: Optional[str] = typer.Option(
+        None,
+        "--tags",
+        help="Comma-separated tags to scan from the index, e.g. core,php (built-in list names)",
+    ),
+    exclude_tags: Optional[str] = typer.Option(
+        None, "--exclude-tags", help="Comma-separated tags to leave out"
     ),
     discover: bool = typer.Option(
         True, "--discover/--no-discover", help="Include robots/sitemap/homepage hints"
     ),
+    fingerprint: bool = typer.Option(
+        True,
+        "--fingerprint/--no-fingerprint",
+        help="Detect each host's stack and skip paths specific to other stacks",
+    ),
     concurrency: int = typer.Option(100, "--concurrency", "-c", help="Max concurrent requests"),
     per_host: int = typer.Option(10, "--per-host", help="Per-host concurrency cap"),
     rate_limit: Optional[float] = typer.Option(
         None, "--rate", help="Global requests per second (float)"
     ),
     rate_burst: int = typer.Option(1, "--burst", help="Token bucket burst capacity"),
+    per_host_rate: Optional[float] = typer.Option(
+        None, "--per-host-rate", help="Requests per second per host (float)"
+    ),
     timeout: float = typer.Option(10.0, "--timeout", "-t", help="Request timeout (seconds)"),
-    json_out: Optional[Path] = typer.Option(None, "--json", help="Write results JSON to file"),
+    json_out: Optional[Path] = typer.Option(
+        None, "--json", help="Write results as a JSON array to file ('-' for stdout)"
+    ),
     csv_out: Optional[Path] = typer.Option(None, "--csv", help="Write results CSV to file"),
+    ndjson_out: Optional[Path] = typer.Option(
+        None, "--ndjson", help="Write results as NDJSON (one object per line)"
+    ),
     proxy: Optional[str] = typer.Option(
         None, "--proxy", help="Proxy URL (e.g. http://127.0.0.1:8080)"
     ),
@@ -214,24 +616,145 @@ def scan(
     ),
     no_verify: bool = typer.Option(False, "--no-verify", help="Disable TLS verification"),
     no_redirects: bool = typer.Option(False, "--no-redirects", help="Do not follow redirects"),
+    probe: str = typer.Option(
+        "range",
+        "--probe",
+        help="Probe method: range (capped ranged GET), head (HEAD, GET fallback), get (full GET)",
+    ),
+    calibrate: bool = typer.Option(
+        True,
+        "--calibrate/--no-calibrate",
+        help="Fingerprint each host's not-found answer first and flag soft-404 hits",
+    ),
+    wildcard: str = typer.Option(
+        "flag", "--wildcard", help="Hosts answering 200 for everything: flag or skip"
+    ),
+    adaptive: bool = typer.Option(
+        False,
+        "--adaptive",
+        help="Tune per-host concurrency automatically (AIMD), up to --per-host",
+    ),
+    retries: int = typer.Option(
+        2, "--retries", help="Retries per request for timeouts and 429/502/503/504"
+    ),
+    retry_budget: float = typer.Option(
+        0.1, "--retry-budget", help="Max share of extra requests spent on retries"
+    ),
     cache_file: Optional[Path] = typer.Option(
-        None, "--cache", help="JSONL cache file for resume"
+        None,
+        "--cache",
+        help="Result cache for resume: SQLite file, or .jsonl for the legacy format",
+    ),
+    cache_ttl: Optional[float] = typer.Option(
+        None, "--cache-ttl", help="Ignore and purge cached results older than this (seconds)"
+    ),
+    rank: bool = typer.Option(
+        True,
+        "--rank/--no-rank",
+        help="Probe paths by past hit rate (--cache, --history) and detected stack first",
+    ),
+    history: Optional[list[Path]] = typer.Option(
+        None,
+        "--history",
+        exists=True,
+        readable=True,
+        help="Past results to rank by: cache or --json/--csv/--ndjson output (repeatable)",
+    ),
+    stop_after_hits: Optional[int] = typer.Option(
+        None, "--stop-after-hits", min=1, help="Stop probing a host after N hits"
+    ),
+    host_budget: Optional[float] = typer.Option(
+        None, "--host-budget", help="Stop probing a host this many seconds after its first probe"
+    ),
+    tree: bool = typer.Option(
+        False,
+        "--tree/--no-tree",
+        help="Probe directories before their contents and skip those the host lacks",
+    ),
+    crawl: bool = typer.Option(
+        False,
+        "--crawl/--no-crawl",
+        help="Crawl each target's pages and scripts and probe admin routes found while scanning",
+    ),
+    crawl_pages: int = typer.Option(
+        CrawlBudget.max_pages, "--crawl-pages", min=1, help="Pages and scripts to fetch per target"
+    ),
+    crawl_bytes: int = typer.Option(
+        CrawlBudget.max_bytes, "--crawl-bytes", min=1, help="Body bytes to read per target crawl"
+    ),
+    metrics_port: Optional[int] = typer.Option(
+        None, "--metrics-port", help="Serve Prometheus metrics on 127.0.0.1:PORT/metrics"
+    ),
+    metrics_file: Optional[Path] = typer.Option(
+        None, "--metrics-file", help="Write Prometheus metrics to this file (textfile collector)"
+    ),
+    metrics_interval: float = typer.Option(
+        10.0, "--metrics-interval", help="Seconds between --metrics-file writes"
+    ),
+    profile: bool = typer.Option(
+        False, "--profile", help="Report per-phase timing, event-loop lag and hot functions"
+    ),
+    profile_out: Optional[Path] = typer.Option(
+        None, "--profile-out", help="Also write cProfile data here (implies --profile)"
+    ),
+    http_version: str = typer.Option(
+        "auto",
+        "--http",
+        help="Protocol: auto (per host, keeps HTTP/1.1 where faster), h1 or h2",
+    ),
+    pool_size: Optional[int] = typer.Option(
+        None, "--pool-size", help="Max open/keep-alive connections (default: sized to -c)"
+    ),
+    keepalive: float = typer.Option(
+        DEFAULT_KEEPALIVE_EXPIRY, "--keepalive", help="Seconds an idle connection is kept open"
+    ),
+    h2_max_streams: Optional[int] = typer.Option(
+        None, "--h2-max-streams", help="Max requests in flight per HTTP/2 host connection"
+    ),
+    dns_prefetch: bool = typer.Option(
+        True,
+        "--dns-prefetch/--no-dns-prefetch",
+        help="Resolve all targets concurrently up front and connect to the cached addresses",
+    ),
+    dns_ttl: float = typer.Option(
+        DEFAULT_DNS_TTL, "--dns-ttl", help="Seconds to cache resolved addresses"
+    ),
+    resolve: Optional[list[str]] = typer.Option(
+        None, "--resolve", help="Pin a host to an address, repeatable: HOST:ADDRESS"
+    ),
+    hosts_file: Optional[Path] = typer.Option(
+        None,
+        "--hosts-file",
+        exists=True,
+        readable=True,
+        help="Static hosts map (/etc/hosts format)",
+    ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        min=1,
+        help="Scan in N processes sharing the rate limits (by target, else by path)",
     ),
     log_level: str = typer.Option("INFO", "--log-level", help="Logging level"),
     log_json: bool = typer.Option(False, "--log-json", help="Log in JSON format"),
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose progress output"),
 ):
     _execute_scan(
-        url,
+        _load_targets(url, targets_file),
         wordlist=wordlist,
+        tags=tags,
+        exclude_tags=exclude_tags,
         discover=discover,
+        fingerprint=fingerprint,
         concurrency=concurrency,
         per_host=per_host,
         rate_limit=rate_limit,
         rate_burst=rate_burst,
+        per_host_rate=per_host_rate,
         timeout=timeout,
         json_out=json_out,
         csv_out=csv_out,
+        ndjson_out=ndjson_out,
         proxy=proxy,
         ua=ua,
         rotate_ua=rotate_ua,
@@ -239,13 +762,91 @@ def scan(
         cookie=cookie,
         no_verify=no_verify,
         no_redirects=no_redirects,
+        probe=probe,
+        calibrate=calibrate,
+        wildcard=wildcard,
+        adaptive=adaptive,
+        retries=retries,
+        retry_budget=retry_budget,
         cache_file=cache_file,
+        cache_ttl=cache_ttl,
+        rank=rank,
+        history=history,
+        stop_after_hits=stop_after_hits,
+        host_budget=host_budget,
+        tree=tree,
+        crawl=crawl,
+        crawl_pages=crawl_pages,
+        crawl_bytes=crawl_bytes,
+        metrics_port=metrics_port,
+        metrics_file=metrics_file,
+        metrics_interval=metrics_interval,
+        profile=profile,
+        profile_out=profile_out,
+        http_version=http_version,
+        pool_size=pool_size,
+        keepalive=keepalive,
+        h2_max_streams=h2_max_streams,
+        dns_prefetch=dns_prefetch,
+        dns_ttl=dns_ttl,
+        resolve=resolve,
+        hosts_file=hosts_file,
+        workers=workers,
         log_level=log_level,
         log_json=log_json,
         verbose=verbose,
     )
 
 
+@wordlist_app.command("compile")
+def wordlist_compile(
+    sources: Optional[list[Path]] = typer.Argument(
+        None,
+        exists=True,
+        readable=True,
+        help="Wordlists to compile, tagged by file name (default: the built-in lists)",
+    ),
+    output: Path = typer.Option(DEFAULT_INDEX, "--output", "-o", help="Index file to write"),
+):
+    """Compile wordlists into one deduplicated, tagged, memory-mappable index."""
+    tagged = [(p, [p.stem]) for p in sources] if sources else _builtin_sources()
+    try:
+        count = compile_index(tagged, output)
+    except (OSError, ValueError) as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    tags = ", ".join(t for _, ts in tagged for t in ts)
+    console.print(f"{count} entries tagged {tags} written to {output}")
+
+
+@wordlist_app.command("query")
+def wordlist_query(
+    index: Path = typer.Argument(DEFAULT_INDEX, exists=True, readable=True, help="Compiled index"),
+    tags: Optional[str] = typer.Option(None, "--tags", help="Comma-separated tags to include"),
+    exclude_tags: Optional[str] = typer.Option(
+        None, "--exclude-tags", help="Comma-separated tags to leave out"
+    ),
+    minus: Optional[Path] = typer.Option(
+        None, "--minus", exists=True, readable=True, help="Leave out entries of this index"
+    ),
+    count: bool = typer.Option(False, "--count", help="Print only the number of entries"),
+):
+    """Print the entries of an index, filtered by tags and set difference."""
+    with contextlib.ExitStack() as stack:
+        idx = stack.enter_context(WordlistIndex(index))
+        other = stack.enter_context(WordlistIndex(minus)) if minus else None
+        try:
+            entries = idx.select(
+                _split_tags(tags), exclude_tags=_split_tags(exclude_tags), exclude=other
+            )
+            if count:
+                typer.echo(sum(1 for _ in entries))
+            else:
+                for entry in entries:
+                    typer.echo(entry)
+        except KeyError as exc:
+            raise typer.BadParameter(str(exc.args[0])) from exc
+
+
 @app.callback()
 def root_callback() -> None:
     """Root command that shows help when no subcommand is provided."""
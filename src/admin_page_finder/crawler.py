@@ -0,0 +1,275 @@
+import asyncio
+import codecs
+import contextlib
+import logging
+import re
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import PurePosixPath
+from typing import Optional
+from urllib.parse import urljoin, urlparse
+
+from .discovery import ADMIN_HINT_RE
+from .http import AsyncHttpClient
+
+logger = logging.getLogger(__name__)
+
+# Links to these are never fetched: they are neither pages nor scripts.
+SKIP_EXTENSIONS = frozenset(
+    {
+        *(".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico", ".bmp"),
+        *(".css", ".map", ".woff", ".woff2", ".ttf", ".eot", ".otf"),
+        *(".pdf", ".zip", ".gz", ".tgz", ".rar", ".7z"),
+        *(".mp3", ".mp4", ".webm", ".avi", ".mov", ".xml", ".json", ".txt"),
+    }
+)
+SCRIPT_EXTENSIONS = frozenset({".js", ".mjs"})
+# Route literals may straddle a chunk boundary; this much text is rescanned.
+_JS_OVERLAP = 256
+
+# "/admin/users" as a string literal, and router configs' path: "admin".
+_JS_ABSOLUTE_RE = re.compile(r"""["'`](/[\w\-./~%:*]{1,200})["'`]""")
+_JS_ROUTE_RE = re.compile(r"""\bpath\s*:\s*["'`]([\w\-./~%:*]{1,200})["'`]""")
+
+
+@dataclass
+class CrawlBudget:
+    """How much of a site discovery crawls, per target.
+
+    ``max_pages`` counts every fetch, pages and scripts alike, and
+    ``max_bytes`` the body bytes read across them. At most ``concurrency``
+    fetches run at once, within the scan's per-host limit.
+    """
+
+    max_pages: int = 30
+    max_bytes: int = 5 * 1024 * 1024
+    concurrency: int = 2
+
+
+def _route_path(route: str) -> Optional[str]:
+    """``/admin/users/:id`` -> ``/admin/users``; None unless it looks like a route."""
+    suffix = PurePosixPath(route).suffix.lower()
+    if route.startswith("//") or suffix in SKIP_EXTENSIONS or suffix in SCRIPT_EXTENSIONS:
+        return None
+    kept = []
+    for segment in route.strip("/").split("/"):
+        if not segment or segment[0] in ":*" or segment in (".", ".."):
+            break
+        kept.append(segment)
+    return "/" + "/".join(kept) if kept else None
+
+
+def extract_js_routes(text: str) -> Iterator[str]:
+    """Admin-looking route paths named in JavaScript source."""
+    for m in _JS_ABSOLUTE_RE.finditer(text):
+        path = _route_path(m.group(1))
+        if path and ADMIN_HINT_RE.search(path):
+            yield path
+    for m in _JS_ROUTE_RE.finditer(text):
+        path = _route_path("/" + m.group(1).lstrip("/"))
+        if path and ADMIN_HINT_RE.search(path):
+            yield path
+
+
+class LinkExtractor(HTMLParser):
+    """Streaming HTML tokenizer that collects links, scripts and admin hints.
+
+    Feed it text as it arrives. ``pages`` and ``scripts`` are the URLs
+    linked; ``hints`` are same-origin paths that look like admin pages by
+    their URL or their link text, including routes named in inline scripts.
+    """
+
+    def __init__(self, page_url: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self.page_url = page_url
+        self._origin = urlparse(page_url)[:2]
+        self.pages: list[str] = []
+        self.scripts: list[str] = []
+        self.hints: list[str] = []
+        self._anchor: Optional[str] = None
+        self._anchor_text: list[str] = []
+        self._in_script = False
+        self._script_text = ""
+
+    def _url(self, value: Optional[str]) -> Optional[str]:
+        value = (value or "").strip()
+        if not value or value.startswith(("#", "javascript:", "mailto:", "tel:", "data:")):
+            return None
+        return urljoin(self.page_url, value).split("#", 1)[0]
+
+    def _link(self, value: Optional[str]) -> Optional[str]:
+        url = self._url(value)
+        if url is None:
+            return None
+        self.pages.append(url)
+        parsed = urlparse(url)
+        if parsed[:2] != self._origin:
+            return None
+        if ADMIN_HINT_RE.search(parsed.path):
+            self.hints.append(parsed.path)
+        return url
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        attr = dict(attrs)
+        if tag in ("a", "area"):
+            self._anchor = self._link(attr.get("href"))
+            self._anchor_text = []
+        elif tag in ("iframe", "frame"):
+            self._link(attr.get("src"))
+        elif tag == "form":
+            self._link(attr.get("action"))
+        elif tag == "script":
+            url = self._url(attr.get("src"))
+            if url is not None:
+                self.scripts.append(url)
+            else:
+                self._in_script = True
+        elif tag == "link" and "modulepreload" in (attr.get("rel") or "").lower().split():
+            url = self._url(attr.get("href"))
+            if url is not None:
+                self.scripts.append(url)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "a" and self._anchor is not None:
+            if ADMIN_HINT_RE.search("".join(self._anchor_text)):
+                self.hints.append(urlparse(self._anchor).path)
+            self._anchor = None
+        elif tag == "script" and self._in_script:
+            self.hints.extend(extract_js_routes(self._script_text))
+            self._in_script = False
+            self._script_text = ""
+
+    def handle_data(self, data: str) -> None:
+        if self._in_script:
+            self._script_text += data
+        elif self._anchor is not None:
+            self._anchor_text.append(data)
+
+    def take(self) -> tuple[list[str], list[str], list[str]]:
+        """Pages, scripts and hints found since the last call."""
+        found = self.pages, self.scripts, self.hints
+        self.pages, self.scripts, self.hints = [], [], []
+        return found
+
+
+class SiteCrawler:
+    """Breadth-first crawl of one site for admin-looking paths.
+
+    Starts at ``base_url`` and visits same-origin pages and scripts within
+    the ``budget``. HTML goes through ``LinkExtractor`` and JavaScript
+    (bundles included) through ``extract_js_routes``, chunk by chunk as
+    bodies stream in. Each new path is passed to ``found`` as soon as it is
+    seen, so a running scan can probe it right away. ``slot`` (the scan's
+    per-host limit) is held around every fetch.
+    """
+
+    def __init__(
+        self,
+        client: AsyncHttpClient,
+        base_url: str,
+        found: Callable[[str], None],
+        *,
+        budget: Optional[CrawlBudget] = None,
+        slot: Optional[Callable[[], contextlib.AbstractAsyncContextManager]] = None,
+    ) -> None:
+        self.client = client
+        self.base_url = base_url
+        self.found = found
+        self.budget = budget or CrawlBudget()
+        self.slot = slot
+        self._origin = urlparse(base_url)[:2]
+        # Scripts go first: that is where single-page apps keep their routes.
+        self._scripts: deque[str] = deque()
+        self._pages: deque[str] = deque([base_url + "/"])
+        self._seen = {base_url + "/"}
+        self._reported: set[str] = set()
+        self.fetched = 0
+        self.bytes_read = 0
+
+    def _report(self, paths: list[str]) -> None:
+        for path in paths:
+            if path not in self._reported:
+                self._reported.add(path)
+                self.found(path)
+
+    def _enqueue(self, urls: list[str], script: bool) -> None:
+        for url in urls:
+            parsed = urlparse(url)
+            if parsed[:2] != self._origin or url in self._seen:
+                continue
+            suffix = PurePosixPath(parsed.path).suffix.lower()
+            if suffix in SKIP_EXTENSIONS:
+                continue
+            self._seen.add(url)
+            (self._scripts if script or suffix in SCRIPT_EXTENSIONS else self._pages).append(url)
+
+    @contextlib.asynccontextmanager
+    async def _held(self) -> AsyncIterator[None]:
+        if self.slot is None:
+            yield
+        else:
+            async with self.slot():
+                yield
+
+    async def _fetch(self, url: str, script: bool) -> None:
+        async with self._held(), self.client.stream(url) as resp:
+            if resp.status_code != 200:
+                return
+            if str(resp.url) != url and urlparse(str(resp.url))[:2] != self._origin:
+                return  # redirected off-site
+            content_type = resp.headers.get("content-type", "").lower()
+            if "html" in content_type:
+                if script:
+                    return  # an app's catch-all page, not the script
+                parser: Optional[LinkExtractor] = LinkExtractor(str(resp.url))
+            elif script or "javascript" in content_type or "ecmascript" in content_type:
+                parser = None
+            else:
+                return
+            decoder = codecs.getincrementaldecoder(resp.charset_encoding or "utf-8")("replace")
+            tail = ""
+            async for chunk in resp.aiter_bytes():
+                chunk = chunk[: max(0, self.budget.max_bytes - self.bytes_read)]
+                self.bytes_read += len(chunk)
+                text = decoder.decode(chunk)
+                if parser is not None:
+                    parser.feed(text)
+                    pages, scripts, hints = parser.take()
+                    self._report(hints)
+                    self._enqueue(pages, script=False)
+                    self._enqueue(scripts, script=True)
+                else:
+                    window = tail + text
+                    self._report(list(extract_js_routes(window)))
+                    tail = window[-_JS_OVERLAP:]
+                if self.bytes_read >= self.budget.max_bytes:
+                    break
+
+    async def _visit(self, url: str, script: bool) -> None:
+        try:
+            await self._fetch(url, script)
+        except Exception as exc:
+            logger.debug("Crawl of %s failed: %s", url, exc)
+
+    async def run(self) -> None:
+        running: set[asyncio.Task] = set()
+        try:
+            while True:
+                while (
+                    (self._scripts or self._pages)
+                    and len(running) < max(1, self.budget.concurrency)
+                    and self.fetched < self.budget.max_pages
+                    and self.bytes_read < self.budget.max_bytes
+                ):
+                    script = bool(self._scripts)
+                    url = (self._scripts if script else self._pages).popleft()
+                    self.fetched += 1
+                    running.add(asyncio.ensure_future(self._visit(url, script)))
+                if not running:
+                    break
+                _, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in running:
+                task.cancel()
@@ -0,0 +1,109 @@
+from typing import Optional
+
+from rich.console import Group, RenderableType
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    TaskID,
+    TextColumn,
+    TimeRemainingColumn,
+)
+from rich.table import Table
+from rich.text import Text
+
+from .stats import ScanStats
+
+MAX_HOST_ROWS = 5
+
+
+def _ms(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.0f} ms"
+
+
+class ScanDashboard:
+    """Progress bar plus live throughput, latency and per-host error figures.
+
+    Rendering only reads ``ScanStats``; the scan advances the bar with
+    ``advance`` as probes complete, and jobs the stats count as unprobed
+    come off the total. Meant to be wrapped in ``rich.live.Live``, which
+    redraws it on its own timer so the event loop never waits on it.
+    """
+
+    def __init__(self, stats: ScanStats, total: Optional[int] = None) -> None:
+        self.stats = stats
+        self.total = total
+        self.progress = Progress(
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeRemainingColumn(),
+        )
+        self.task: TaskID = self.progress.add_task("Scanning", total=total)
+
+    def set_total(self, total: int) -> None:
+        self.total = total
+        self._update_total()
+
+    def advance(self, n: int = 1) -> None:
+        self.progress.advance(self.task, n)
+
+    def finish(self) -> None:
+        """Close the bar at what completed, e.g. after hosts stopped early."""
+        self.total = None
+        self.progress.update(self.task, total=self.progress.tasks[self.task].completed)
+
+    def _update_total(self) -> None:
+        if self.total is None:
+            return
+        completed = self.progress.tasks[self.task].completed
+        # Probes of paths found while scanning (crawl) can outrun the estimate.
+        total = max(self.total - self.stats.unprobed, completed)
+        self.progress.update(self.task, total=total)
+
+    def _summary(self) -> RenderableType:
+        stats = self.stats
+        lat = stats.latency
+        throughput = "  ".join(
+            [
+                f"[bold]{stats.rate():.1f}[/bold] req/s",
+                f"in-flight [bold]{stats.inflight}[/bold]",
+                f"p50 {_ms(lat.percentile(50))}",
+                f"p95 {_ms(lat.percentile(95))}",
+                f"p99 {_ms(lat.percentile(99))}",
+                f"errors [red]{stats.errors}[/red]",
+                f"retries [yellow]{stats.retries}[/yellow]",
+            ]
+        )
+        statuses = sorted(dict(stats.status_counts).items())
+        codes = "  ".join(f"{code or 'err'}:{n}" for code, n in statuses) or "-"
+        return Group(Text.from_markup(throughput), Text(f"status {codes}", style="dim"))
+
+    def _hosts(self) -> Optional[Table]:
+        errors = dict(self.stats.host_errors)
+        retries = dict(self.stats.host_retries)
+        hosts = sorted(
+            set(errors) | set(retries),
+            key=lambda h: (errors.get(h, 0), retries.get(h, 0)),
+            reverse=True,
+        )[:MAX_HOST_ROWS]
+        if not hosts:
+            return None
+        table = Table("host", "errors", "retries", "concurrency", box=None, padding=(0, 2))
+        limits = dict(self.stats.host_concurrency)
+        for host in hosts:
+            table.add_row(
+                host,
+                str(errors.get(host, 0)),
+                str(retries.get(host, 0)),
+                str(limits.get(host, "-")),
+            )
+        return table
+
+    def __rich__(self) -> RenderableType:
+        self._update_total()
+        parts: list[RenderableType] = [self.progress, self._summary()]
+        hosts = self._hosts()
+        if hosts is not None:
+            parts.append(hosts)
+        return Group(*parts)
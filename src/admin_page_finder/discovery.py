@@ -1,77 +1,128 @@
 import re
+from collections.abc import Awaitable
+from dataclasses import dataclass, field
 from html import unescape
+from typing import Optional
 from urllib.parse import urljoin, urlparse
 
+import httpx
+
 from .http import AsyncHttpClient
+from .sitemap import (
+    SITEMAP_CONCURRENCY,
+    SITEMAP_MAX_BYTES,
+    SITEMAP_MAX_DEPTH,
+    SITEMAP_MAX_FILES,
+    SitemapCrawler,
+)
 
 ADMIN_HINT_RE = re.compile(r"(admin|login|wp-admin|wp-login|cpanel|dashboard)", re.I)
 
 
-async def fetch_robots_paths(client: AsyncHttpClient, base_url: str) -> list[str]:
+@dataclass
+class RobotsTxt:
+    """What discovery takes from a ``robots.txt``."""
+
+    disallowed: list[str] = field(default_factory=list)  # admin-looking Disallow paths
+    sitemaps: list[str] = field(default_factory=list)
+
+
+def parse_robots(text: str) -> RobotsTxt:
+    robots = RobotsTxt()
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        field_name, value = line.split(":", 1)
+        field_name, value = field_name.strip().lower(), value.strip()
+        if field_name == "disallow" and value and ADMIN_HINT_RE.search(value):
+            robots.disallowed.append(value)
+        elif field_name == "sitemap" and value:
+            robots.sitemaps.append(value)
+    return robots
+
+
+async def fetch_robots(client: AsyncHttpClient, base_url: str) -> RobotsTxt:
     robots_url = urljoin(base_url + "/", "robots.txt")
     try:
         resp = await client.get(robots_url)
         if resp.status_code != 200:
-            return []
-        lines = resp.text.splitlines()
-        paths: list[str] = []
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            if line.lower().startswith("disallow:"):
-                _, value = line.split(":", 1)
-                p = value.strip()
-                if p and ADMIN_HINT_RE.search(p):
-                    paths.append(p)
-        return paths
+            return RobotsTxt()
+        return parse_robots(resp.text)
     except Exception:
-        return []
+        return RobotsTxt()
+
+
+async def fetch_robots_paths(client: AsyncHttpClient, base_url: str) -> list[str]:
+    return (await fetch_robots(client, base_url)).disallowed
 
 
-async def fetch_sitemap_paths(client: AsyncHttpClient, base_url: str) -> list[str]:
-    candidates = [
-        urljoin(base_url + "/", "sitemap.xml"),
-        urljoin(base_url + "/", "sitemap_index.xml"),
-    ]
-    discovered: list[str] = []
-    for url in candidates:
-        try:
-            resp = await client.get(url)
-            if resp.status_code != 200:
-                continue
-            text = resp.text
-            for m in re.finditer(r"<loc>(.*?)</loc>", text, re.I | re.S):
-                loc = unescape(m.group(1)).strip()
-                if not loc:
+async def fetch_sitemap_paths(
+    client: AsyncHttpClient,
+    base_url: str,
+    *,
+    robots: Optional[Awaitable[RobotsTxt]] = None,
+    max_depth: int = SITEMAP_MAX_DEPTH,
+    max_files: int = SITEMAP_MAX_FILES,
+    max_bytes: int = SITEMAP_MAX_BYTES,
+    concurrency: int = SITEMAP_CONCURRENCY,
+) -> list[str]:
+    """Admin-looking paths from the site's sitemaps.
+
+    ``sitemap.xml``, ``sitemap_index.xml`` and the ``Sitemap:`` entries of
+    ``robots.txt`` are fetched concurrently, and indexes are followed; see
+    ``SitemapCrawler`` for the caps. Pass ``robots`` (e.g. a task running
+    ``fetch_robots``) to reuse a ``robots.txt`` fetch made for other reasons.
+    """
+    crawler = SitemapCrawler(
+        client,
+        base_url,
+        lambda path: bool(ADMIN_HINT_RE.search(path)),
+        max_depth=max_depth,
+        max_files=max_files,
+        max_bytes=max_bytes,
+        concurrency=concurrency,
+    )
+    crawler.add("sitemap.xml")
+    crawler.add("sitemap_index.xml")
+
+    async def robots_sitemaps() -> list[str]:
+        return (await (robots if robots is not None else fetch_robots(client, base_url))).sitemaps
+
+    crawler.add_later(robots_sitemaps())
+    return await crawler.run()
+
+
+async def fetch_homepage(client: AsyncHttpClient, base_url: str) -> Optional[httpx.Response]:
+    """GET the homepage once for both link hints and stack fingerprinting."""
+    try:
+        return await client.get(base_url)
+    except Exception:
+        return None
+
+
+def homepage_hints(resp: Optional[httpx.Response], base_url: str) -> list[str]:
+    if resp is None or resp.status_code != 200:
+        return []
+    html = resp.text
+    paths: list[str] = []
+    for m in re.finditer(r"<a\s+[^>]*href=\"([^\"]+)\"[^>]*>(.*?)</a>", html, re.I | re.S):
+        href = unescape(m.group(1)).strip()
+        text = unescape(m.group(2) or "").strip()
+        if ADMIN_HINT_RE.search(href) or ADMIN_HINT_RE.search(text):
+            parsed = urlparse(href)
+            if parsed.scheme or parsed.netloc:
+                base_host = urlparse(base_url).netloc
+                if parsed.netloc and parsed.netloc != base_host:
                     continue
-                parsed = urlparse(loc)
-                if ADMIN_HINT_RE.search(parsed.path):
-                    discovered.append(parsed.path)
-        except Exception:
-            continue
-    return discovered
+                paths.append(parsed.path)
+            else:
+                paths.append(href)
+    return list({p for p in paths if p})
 
 
 async def fetch_homepage_hints(client: AsyncHttpClient, base_url: str) -> list[str]:
     try:
-        resp = await client.get(base_url)
-        if resp.status_code != 200:
-            return []
-        html = resp.text
-        paths: list[str] = []
-        for m in re.finditer(r"<a\s+[^>]*href=\"([^\"]+)\"[^>]*>(.*?)</a>", html, re.I | re.S):
-            href = unescape(m.group(1)).strip()
-            text = unescape(m.group(2) or "").strip()
-            if ADMIN_HINT_RE.search(href) or ADMIN_HINT_RE.search(text):
-                parsed = urlparse(href)
-                if parsed.scheme or parsed.netloc:
-                    base_host = urlparse(base_url).netloc
-                    if parsed.netloc and parsed.netloc != base_host:
-                        continue
-                    paths.append(parsed.path)
-                else:
-                    paths.append(href)
-        return list({p for p in paths if p})
+        return homepage_hints(await fetch_homepage(client, base_url), base_url)
     except Exception:
         return []
@@ -1,17 +1,37 @@
+import asyncio
+import contextlib
+import logging
+import math
 import random
-from collections.abc import Iterable, Mapping
-from typing import Optional
+import ssl
+import statistics
+import time
+from collections.abc import AsyncIterator, Callable, Iterable, Mapping
+from typing import TYPE_CHECKING, Optional, Union
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential_jitter
 
 from .rate_limit import AsyncRateLimiter
+from .resolver import DnsCache, ResolvingTransport
+from .retry import RetryBudgets, RetryPolicy, note_retry, parse_retry_after
+
+if TYPE_CHECKING:
+    from .metrics import ScanMetrics
 
 DEFAULT_HEADERS = {
     "User-Agent": "AdminPageFinder/0.1 (+https://github.com/GeekLord/Admin-Page-Finder)",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
 }
 
+DEFAULT_PREFIX_BYTES = 4096
+
+HTTP_VERSIONS = ("auto", "h1", "h2")
+DEFAULT_POOL_SIZE = 20
+POOL_SHARD_CONNECTIONS = 4
+DEFAULT_KEEPALIVE_EXPIRY = 5.0
+
+logger = logging.getLogger(__name__)
+
 DEFAULT_UAS = [
     DEFAULT_HEADERS["User-Agent"],
     (
@@ -29,7 +49,123 @@ DEFAULT_UAS = [
 ]
 
 
+def response_length(resp: httpx.Response) -> int:
+    """Full body length from headers, looking through ranged (206) answers."""
+    total = resp.headers.get("content-range", "").rpartition("/")[2]
+    if resp.status_code == 206 and total.isdigit():
+        return int(total)
+    try:
+        return int(resp.headers.get("content-length", 0) or 0)
+    except ValueError:
+        return 0
+
+
+class ProtocolChooser:
+    """Pick HTTP/1.1 or HTTP/2 per host from the host's first responses.
+
+    Requests to a host that negotiates HTTP/2 alternate between HTTP/1.1
+    pools and HTTP/2 until each side has ``samples`` timings of the
+    request/response exchange. The host then stays on HTTP/1.1 only if its
+    median beats HTTP/2's by more than ``h2_bias``; ties go to HTTP/2 and
+    its fewer connections.
+    """
+
+    def __init__(self, samples: int = 8, h2_bias: float = 1.1) -> None:
+        self.samples = samples
+        self.h2_bias = h2_bias
+        self.choice: dict[str, str] = {}
+        self._timings: dict[str, dict[str, list[float]]] = {}
+        self._routed: dict[str, dict[str, int]] = {}
+
+    def route(self, host: str) -> str:
+        """``h1`` or ``h2``: the pool the next request to ``host`` should use."""
+        chosen = self.choice.get(host)
+        if chosen is not None:
+            return chosen
+        routed = self._routed.get(host)
+        if routed is None:
+            # Nothing known yet: let ALPN tell us whether h2 is on the table.
+            return "h2"
+        side = "h1" if routed["h1"] < routed["h2"] else "h2"
+        routed[side] += 1
+        return side
+
+    def record(self, host: str, route: str, http_version: str, seconds: float) -> None:
+        if host in self.choice:
+            return
+        if route == "h2" and http_version != "HTTP/2":
+            # No h2 offered; the HTTP/2-capable pool speaks HTTP/1.1 already.
+            self.choice[host] = "h2"
+            return
+        timings = self._timings.setdefault(host, {"h1": [], "h2": []})
+        self._routed.setdefault(host, {"h1": 0, "h2": 1})
+        timings[route].append(seconds)
+        if min(len(timings["h1"]), len(timings["h2"])) < self.samples:
+            return
+        h1 = statistics.median(timings["h1"])
+        h2 = statistics.median(timings["h2"])
+        self.choice[host] = "h1" if h1 * self.h2_bias < h2 else "h2"
+        logger.info(
+            "%s: using %s (median %.1f ms on HTTP/1.1, %.1f ms on HTTP/2)",
+            host,
+            "HTTP/1.1" if self.choice[host] == "h1" else "HTTP/2",
+            h1 * 1000,
+            h2 * 1000,
+        )
+
+
+class PoolSet:
+    """Several small httpx pools used as one, least busy first.
+
+    httpcore's pool does bookkeeping over every connection it holds on each
+    request event, which turns quadratic once a single pool keeps dozens of
+    connections; pools of a few connections each stay cheap.
+    """
+
+    def __init__(self, make: Callable[[], httpx.AsyncClient], connections: int) -> None:
+        shards = max(1, math.ceil(connections / POOL_SHARD_CONNECTIONS))
+        self.clients = [make() for _ in range(shards)]
+        self.inflight = [0] * shards
+        # Hosts pinned to each pool, so pinned hosts spread over all of them.
+        self.homes: dict[str, int] = {}
+        self._pinned = [0] * shards
+
+    def home(self, host: str) -> int:
+        """The pool ``host`` is pinned to: the one with the fewest hosts when first seen."""
+        index = self.homes.get(host)
+        if index is None:
+            index = self.homes[host] = min(range(len(self.clients)), key=self._pinned.__getitem__)
+            self._pinned[index] += 1
+        return index
+
+    def pick(self, limit: Optional[int] = None, host: Optional[str] = None) -> int:
+        """Index of the least busy pool, out of ``limit`` of them.
+
+        With a ``host`` those are its home pool and the ones after it;
+        otherwise the first ``limit``.
+        """
+        n = len(self.clients)
+        start = self.home(host) if host is not None else 0
+        candidates = [(start + i) % n for i in range(min(limit or n, n))]
+        return min(candidates, key=self.inflight.__getitem__)
+
+    async def aclose(self) -> None:
+        for client in self.clients:
+            await client.aclose()
+
+
 class AsyncHttpClient:
+    """HTTP client for probing, with rate limiting, retries and pool control.
+
+    ``http_version`` is ``h1`` (HTTP/1.1 only), ``h2`` (HTTP/2 only; prior
+    knowledge on plain ``http://``) or ``auto``, which negotiates per host
+    and keeps HTTP/1.1 for hosts where it measures faster. ``pool_size``
+    caps open and keep-alive connections. HTTP/2 hosts share one connection
+    per host unless ``h2_max_streams`` is set, in which case requests are
+    spread over enough connections to keep each near that many streams.
+    With a ``resolver``, connections go to its cached addresses.
+    """
+
     def __init__(
         self,
         timeout: float = 10.0,
@@ -41,29 +177,112 @@ class AsyncHttpClient:
         rate_limiter: Optional[AsyncRateLimiter] = None,
         rotate_user_agents: bool = False,
         user_agents: Optional[Iterable[str]] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        metrics: Optional["ScanMetrics"] = None,
+        http_version: str = "auto",
+        pool_size: Optional[int] = None,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        h2_max_streams: Optional[int] = None,
+        resolver: Optional[DnsCache] = None,
     ) -> None:
+        if http_version not in HTTP_VERSIONS:
+            raise ValueError(f"http_version must be one of {', '.join(HTTP_VERSIONS)}")
         merged_headers = dict(DEFAULT_HEADERS)
         if headers:
             merged_headers.update(headers)
         self._rotate_uas = rotate_user_agents
         self._user_agents = list(user_agents) if user_agents else DEFAULT_UAS
         self._rate_limiter = rate_limiter
-        self._client = httpx.AsyncClient(
-            timeout=timeout,
-            headers=merged_headers,
-            verify=verify_tls,
-            http2=True,
-            follow_redirects=follow_redirects,
-            proxy=proxy,
-            cookies=cookies,
+        self.follow_redirects = follow_redirects
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_budgets = RetryBudgets(self.retry_policy)
+        self.metrics = metrics
+        self.http_version = http_version
+        self.protocols = ProtocolChooser() if http_version == "auto" else None
+        self.pool_size = pool_size or DEFAULT_POOL_SIZE
+        # Pools an HTTP/2 host may use; one pool means one connection.
+        self._h2_pools = math.ceil(self.pool_size / h2_max_streams) if h2_max_streams else 1
+        self._h1_hosts: set[str] = set()
+        self._h2_hosts: set[str] = set()
+        per_pool = min(self.pool_size, POOL_SHARD_CONNECTIONS)
+        limits = httpx.Limits(
+            max_connections=per_pool,
+            max_keepalive_connections=per_pool,
+            keepalive_expiry=keepalive_expiry,
+        )
+        # Loading CA certificates is slow, so every pool of a kind shares one
+        # context. httpcore sets ALPN on it per connection, hence one per kind.
+        ssl_contexts: dict[bool, ssl.SSLContext] = {}
+        # Cookies a server sets must reach it again whichever pool is used.
+        cookie_jar = httpx.Cookies(dict(cookies) if cookies else None).jar
+
+        def make_client(http1: bool, http2: bool) -> httpx.AsyncClient:
+            if http2 not in ssl_contexts:
+                ssl_contexts[http2] = httpx.create_ssl_context(verify=verify_tls)
+            client = httpx.AsyncClient(
+                timeout=timeout,
+                headers=merged_headers,
+                verify=ssl_contexts[http2],
+                http1=http1,
+                http2=http2,
+                follow_redirects=follow_redirects,
+                proxy=proxy,
+                limits=limits,
+                event_hooks=metrics.event_hooks() if metrics else None,
+                transport=(
+                    ResolvingTransport(
+                        resolver,
+                        ssl_context=ssl_contexts[http2],
+                        http1=http1,
+                        http2=http2,
+                        limits=limits,
+                    )
+                    if resolver is not None and proxy is None
+                    else None
+                ),
+            )
+            client.cookies.jar = cookie_jar
+            return client
+
+        self._pools = PoolSet(
+            lambda: make_client(http1=http_version != "h2", http2=http_version != "h1"),
+            self.pool_size,
         )
+        self._client = self._pools.clients[0]
+        # Auto mode's HTTP/1.1 pools, only opened for hosts that offer h2.
+        self._h1_pools: Optional[PoolSet] = None
+        self._make_client = make_client
 
     async def aclose(self) -> None:
-        await self._client.aclose()
+        await self._pools.aclose()
+        if self._h1_pools is not None:
+            await self._h1_pools.aclose()
+
+    def _pools_for(self, host: str) -> tuple[str, PoolSet, int]:
+        """Route, pool set and pool index for the next request to ``host``."""
+        if self.protocols is None or self.protocols.route(host) == "h2":
+            if self.http_version == "h1" or host in self._h1_hosts:
+                limit = None
+            elif self.http_version == "h2" or host in self._h2_hosts:
+                limit = self._h2_pools
+            else:
+                # Protocol not known yet: do not open a connection in every
+                # pool for what may turn out to be a single h2 connection.
+                limit = 1
+            # An HTTP/2 host keeps to its own pools, so hosts do not evict
+            # each other's connections from one shared pool.
+            return "h2", self._pools, self._pools.pick(limit, host if limit else None)
+        if self._h1_pools is None:
+            self._h1_pools = PoolSet(
+                lambda: self._make_client(http1=True, http2=False), self.pool_size
+            )
+        return "h1", self._h1_pools, self._h1_pools.pick()
 
-    async def _maybe_wait(self) -> None:
+    async def _maybe_wait(self, url: Union[str, httpx.URL]) -> None:
         if self._rate_limiter:
-            await self._rate_limiter.acquire()
+            waited = await self._rate_limiter.acquire(httpx.URL(url).netloc.decode("ascii"))
+            if self.metrics and waited:
+                self.metrics.observe_rate_limit_wait(waited)
 
     def _maybe_rotate_headers(self) -> dict:
         if self._rotate_uas:
@@ -73,8 +292,192 @@ class AsyncHttpClient:
             return headers
         return dict(self._client.headers)
 
-    @retry(wait=wait_exponential_jitter(initial=0.2, max=10), stop=stop_after_attempt(3))
-    async def get(self, url: str) -> httpx.Response:
-        await self._maybe_wait()
-        headers = self._maybe_rotate_headers()
-        return await self._client.get(url, headers=headers)
+    def _follow_flag(self, follow_redirects: Optional[bool]) -> bool:
+        return self.follow_redirects if follow_redirects is None else follow_redirects
+
+    async def _send(
+        self,
+        request: httpx.Request,
+        *,
+        follow_redirects: bool,
+        max_bytes: Optional[int] = None,
+    ) -> tuple[httpx.Response, bytes]:
+        host = request.url.netloc.decode("ascii")
+        route, pools, index = self._pools_for(host)
+        pools.inflight[index] += 1
+        try:
+            return await self._send_on(
+                pools.clients[index], host, route, request, follow_redirects, max_bytes
+            )
+        finally:
+            pools.inflight[index] -= 1
+
+    async def _send_on(
+        self,
+        client: httpx.AsyncClient,
+        host: str,
+        route: str,
+        request: httpx.Request,
+        follow_redirects: bool,
+        max_bytes: Optional[int],
+    ) -> tuple[httpx.Response, bytes]:
+        sent: list[float] = []
+        probing = self.protocols is not None and host not in self.protocols.choice
+        if probing:
+            # Time the exchange from the moment headers go out, so pool waits
+            # and handshakes on a cold HTTP/1.1 pool do not count against it.
+            async def trace(name: str, info: dict) -> None:
+                if name.endswith("send_request_headers.started") and not sent:
+                    sent.append(time.monotonic())
+
+            request.extensions["trace"] = trace
+        resp = await client.send(
+            request, follow_redirects=follow_redirects, stream=max_bytes is not None
+        )
+        (self._h2_hosts if resp.http_version == "HTTP/2" else self._h1_hosts).add(host)
+        if probing and sent and self.protocols is not None:
+            self.protocols.record(host, route, resp.http_version, time.monotonic() - sent[0])
+        if max_bytes is None:
+            if self.metrics:
+                self.metrics.observe_bytes(resp.num_bytes_downloaded)
+            return resp, resp.content
+        # Stream the body and hang up once we have enough of it.
+        buf = bytearray()
+        try:
+            if max_bytes > 0:
+                async for chunk in resp.aiter_bytes():
+                    buf += chunk
+                    if len(buf) >= max_bytes:
+                        break
+        finally:
+            await resp.aclose()
+            if self.metrics:
+                self.metrics.observe_bytes(resp.num_bytes_downloaded)
+        return resp, bytes(buf[:max_bytes])
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        follow_redirects: Optional[bool] = None,
+        extra_headers: Optional[Mapping[str, str]] = None,
+        max_bytes: Optional[int] = None,
+    ) -> tuple[httpx.Response, bytes]:
+        """Send a request, retrying transient failures as the retry policy allows."""
+        policy = self.retry_policy
+        host = httpx.URL(url).netloc.decode("ascii")
+        self.retry_budgets.record_request(host)
+        attempt = 0
+        while True:
+            await self._maybe_wait(url)
+            headers = self._maybe_rotate_headers()
+            if extra_headers:
+                headers.update(extra_headers)
+            request = self._client.build_request(method, url, headers=headers)
+            try:
+                resp, body = await self._send(
+                    request,
+                    follow_redirects=self._follow_flag(follow_redirects),
+                    max_bytes=max_bytes,
+                )
+            except Exception as exc:
+                if not (
+                    policy.is_retryable_error(exc)
+                    and attempt + 1 < policy.max_attempts
+                    and self.retry_budgets.try_spend(host)
+                ):
+                    raise
+                delay = policy.backoff(attempt)
+            else:
+                if resp.status_code not in policy.retry_statuses:
+                    return resp, body
+                retry_after = parse_retry_after(resp.headers.get("retry-after"))
+                if (
+                    attempt + 1 >= policy.max_attempts
+                    or (retry_after is not None and retry_after > policy.max_retry_after)
+                    or not self.retry_budgets.try_spend(host)
+                ):
+                    return resp, body
+                delay = max(policy.backoff(attempt), retry_after or 0.0)
+            attempt += 1
+            note_retry()
+            if self.metrics:
+                self.metrics.observe_retry()
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, *, follow_redirects: Optional[bool] = None) -> httpx.Response:
+        resp, _ = await self._request("GET", url, follow_redirects=follow_redirects)
+        return resp
+
+    async def head(self, url: str, *, follow_redirects: Optional[bool] = None) -> httpx.Response:
+        resp, _ = await self._request("HEAD", url, follow_redirects=follow_redirects)
+        return resp
+
+    @contextlib.asynccontextmanager
+    async def stream(
+        self, url: str, *, follow_redirects: Optional[bool] = None
+    ) -> AsyncIterator[httpx.Response]:
+        """GET ``url`` and hand over the response with its body unread.
+
+        Read it with ``aiter_bytes``; it is closed on leaving the block.
+        Rate limited like any request but never retried, since a body that
+        was partly consumed cannot be replayed.
+        """
+        host = httpx.URL(url).netloc.decode("ascii")
+        self.retry_budgets.record_request(host)
+        await self._maybe_wait(url)
+        request = self._client.build_request("GET", url, headers=self._maybe_rotate_headers())
+        _, pools, index = self._pools_for(host)
+        pools.inflight[index] += 1
+        try:
+            resp = await pools.clients[index].send(
+                request, follow_redirects=self._follow_flag(follow_redirects), stream=True
+            )
+            (self._h2_hosts if resp.http_version == "HTTP/2" else self._h1_hosts).add(host)
+            try:
+                yield resp
+            finally:
+                await resp.aclose()
+                if self.metrics:
+                    self.metrics.observe_bytes(resp.num_bytes_downloaded)
+        finally:
+            pools.inflight[index] -= 1
+
+    async def get_prefix(
+        self,
+        url: str,
+        max_bytes: int = DEFAULT_PREFIX_BYTES,
+        *,
+        ranged: bool = True,
+        follow_redirects: Optional[bool] = None,
+    ) -> tuple[httpx.Response, bytes]:
+        """GET at most ``max_bytes`` of the body and drop the rest of the stream.
+
+        With ``ranged`` a ``Range`` header is sent too, so servers that honour
+        it answer 206 and keep the connection reusable. The returned response
+        is already closed; the body prefix is returned alongside it.
+        """
+        extra = {"Range": f"bytes=0-{max(0, max_bytes - 1)}"} if ranged else None
+        return await self._request(
+            "GET",
+            url,
+            follow_redirects=follow_redirects,
+            extra_headers=extra,
+            max_bytes=max_bytes,
+        )
+
+    async def follow(
+        self, response: httpx.Response, *, max_bytes: Optional[int] = None
+    ) -> httpx.Response:
+        """Follow the redirect chain of a response that was fetched unfollowed.
+
+        ``max_bytes`` caps how much of the final body is read, as in
+        ``get_prefix``; ``0`` reads headers only.
+        """
+        request = response.next_request
+        if request is None:
+            return response
+        await self._maybe_wait(request.url)
+        resp, _ = await self._send(request, follow_redirects=True, max_bytes=max_bytes)
+        return resp
@@ -0,0 +1,231 @@
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+from .stats import ScanStats
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class ScanMetrics:
+    """Prometheus-style counters for the HTTP layer of a scan.
+
+    ``AsyncHttpClient`` feeds it through httpx event hooks (requests, status
+    codes, latency to response headers), the httpcore ``trace`` extension
+    (new TCP connections and TLS handshakes, hence pool reuse) and direct
+    calls for body bytes, retries and rate-limiter waits. Gauges for
+    in-flight and queued probes come from the scan's ``ScanStats``.
+    """
+
+    def __init__(self, stats: Optional[ScanStats] = None) -> None:
+        self.stats = stats
+        self.requests: Counter[tuple[str, int]] = Counter()
+        self.http_versions: Counter[str] = Counter()
+        self.response_bytes = 0
+        self.duration_buckets = [0] * len(DURATION_BUCKETS)
+        self.duration_sum = 0.0
+        self.duration_count = 0
+        self.retries = 0
+        self.rate_limit_wait_seconds = 0.0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self.tls_handshake_seconds = 0.0
+
+    # -- hooks -------------------------------------------------------------
+
+    def event_hooks(self) -> dict[str, list[Any]]:
+        return {"request": [self._on_request], "response": [self._on_response]}
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        request.extensions["apf_started"] = time.monotonic()
+        tls_started: list[float] = []
+        previous = request.extensions.get("trace")
+
+        async def trace(name: str, info: dict[str, Any]) -> None:
+            if previous is not None:
+                await previous(name, info)
+            if name == "connection.connect_tcp.complete":
+                self.connections_opened += 1
+            elif name == "connection.start_tls.started":
+                tls_started.append(time.monotonic())
+            elif name == "connection.start_tls.complete" and tls_started:
+                self.tls_handshakes += 1
+                self.tls_handshake_seconds += time.monotonic() - tls_started.pop()
+
+        request.extensions["trace"] = trace
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        request = response.request
+        self.requests[(request.method, response.status_code)] += 1
+        self.http_versions[response.http_version] += 1
+        started = request.extensions.get("apf_started")
+        if started is not None:
+            self.observe_duration(time.monotonic() - started)
+
+    def observe_duration(self, seconds: float) -> None:
+        self.duration_sum += seconds
+        self.duration_count += 1
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                self.duration_buckets[i] += 1
+                break
+
+    def observe_bytes(self, n: int) -> None:
+        self.response_bytes += n
+
+    def observe_retry(self) -> None:
+        self.retries += 1
+
+    def observe_rate_limit_wait(self, seconds: float) -> None:
+        self.rate_limit_wait_seconds += seconds
+
+    def merge(self, other: "ScanMetrics") -> None:
+        """Add another scan's counters, e.g. one sent back by a worker process."""
+        self.requests.update(other.requests)
+        self.http_versions.update(other.http_versions)
+        self.response_bytes += other.response_bytes
+        self.duration_buckets = [
+            a + b for a, b in zip(self.duration_buckets, other.duration_buckets)
+        ]
+        self.duration_sum += other.duration_sum
+        self.duration_count += other.duration_count
+        self.retries += other.retries
+        self.rate_limit_wait_seconds += other.rate_limit_wait_seconds
+        self.connections_opened += other.connections_opened
+        self.tls_handshakes += other.tls_handshakes
+        self.tls_handshake_seconds += other.tls_handshake_seconds
+
+    @property
+    def connection_reuse_ratio(self) -> float:
+        """Share of requests that went out on an already-open connection."""
+        total = sum(self.requests.values())
+        if not total:
+            return 0.0
+        return max(0.0, 1.0 - self.connections_opened / total)
+
+    # -- exposition --------------------------------------------------------
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: list[str] = []
+
+        def metric(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        metric("apf_requests_total", "counter", "HTTP responses received.")
+        for (method, code), n in sorted(self.requests.items()):
+            lines.append(f'apf_requests_total{{method="{method}",code="{code}"}} {n}')
+        metric("apf_responses_by_version_total", "counter", "HTTP responses by protocol.")
+        for version, n in sorted(self.http_versions.items()):
+            lines.append(f'apf_responses_by_version_total{{version="{version}"}} {n}')
+        metric("apf_response_bytes_total", "counter", "Response body bytes read.")
+        lines.append(f"apf_response_bytes_total {self.response_bytes}")
+        metric("apf_request_duration_seconds", "histogram", "Time to response headers.")
+        cumulative = 0
+        for bound, n in zip(DURATION_BUCKETS, self.duration_buckets):
+            cumulative += n
+            lines.append(f'apf_request_duration_seconds_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'apf_request_duration_seconds_bucket{{le="+Inf"}} {self.duration_count}')
+        lines.append(f"apf_request_duration_seconds_sum {self.duration_sum:.6f}")
+        lines.append(f"apf_request_duration_seconds_count {self.duration_count}")
+        metric("apf_retries_total", "counter", "Requests retried.")
+        lines.append(f"apf_retries_total {self.retries}")
+        metric("apf_rate_limit_wait_seconds_total", "counter", "Time spent waiting on limiters.")
+        lines.append(f"apf_rate_limit_wait_seconds_total {self.rate_limit_wait_seconds:.6f}")
+        metric("apf_connections_opened_total", "counter", "New TCP connections opened.")
+        lines.append(f"apf_connections_opened_total {self.connections_opened}")
+        metric("apf_tls_handshakes_total", "counter", "TLS handshakes completed.")
+        lines.append(f"apf_tls_handshakes_total {self.tls_handshakes}")
+        metric("apf_tls_handshake_seconds_total", "counter", "Time spent in TLS handshakes.")
+        lines.append(f"apf_tls_handshake_seconds_total {self.tls_handshake_seconds:.6f}")
+        if self.stats is not None:
+            metric("apf_probes_completed_total", "counter", "Probes finished.")
+            lines.append(f"apf_probes_completed_total {self.stats.completed}")
+            metric("apf_probes_inflight", "gauge", "Probes currently running.")
+            lines.append(f"apf_probes_inflight {self.stats.inflight}")
+            metric("apf_probes_queued", "gauge", "Probes waiting for a per-host slot.")
+            lines.append(f"apf_probes_queued {self.stats.queued}")
+        return "\n".join(lines) + "\n"
+
+
+async def serve_metrics(
+    metrics: ScanMetrics, host: str = "127.0.0.1", port: int = 9464
+) -> asyncio.AbstractServer:
+    """Serve ``GET /metrics`` on a small local HTTP endpoint; close the returned server."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                body = metrics.render().encode("utf-8")
+                status = "200 OK"
+            else:
+                body, status = b"not found\n", "404 Not Found"
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode("latin-1")
+                + body
+            )
+            await writer.drain()
+        except Exception:
+            logger.debug("metrics request failed", exc_info=True)
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+class MetricsTextfileWriter:
+    """Periodically write metrics to a file for node_exporter's textfile collector.
+
+    Each write goes to a temporary file that is then renamed over ``path``,
+    so the collector never reads a partial file.
+    """
+
+    def __init__(self, metrics: ScanMetrics, path: Path, interval: float = 10.0) -> None:
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def write(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(self.metrics.render(), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.write()
+            except OSError:
+                logger.exception("Failed to write metrics to %s", self.path)
+
+    async def aclose(self) -> None:
+        """Stop the writer and write the final values."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self.write()
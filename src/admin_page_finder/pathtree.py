@@ -0,0 +1,137 @@
+from collections import deque
+from collections.abc import Callable, Iterable
+from typing import Optional, Union
+
+# A directory is probed on its own before its contents once it gates at least
+# this many entries; for fewer, probing the entries directly costs no more.
+MIN_SUBTREE = 2
+
+
+class PathNode:
+    __slots__ = ("path", "entries", "children", "count")
+
+    def __init__(self, path: str) -> None:
+        self.path = path  # "/admin" for the directory admin/
+        self.entries: list[str] = []  # wordlist entries naming this node
+        self.children: dict[str, PathNode] = {}
+        self.count = 0  # entries in this subtree, own included
+
+    @property
+    def dir_entry(self) -> Optional[str]:
+        """The node's own entry that probes it as a directory, if listed."""
+        for entry in self.entries:
+            if entry.rstrip().endswith("/"):
+                return entry
+        return None
+
+    def gate(self) -> Optional[str]:
+        """Path to probe before expanding this subtree, or None to expand directly."""
+        below = self.count - len(self.entries)
+        if below == 0:
+            return None
+        entry = self.dir_entry
+        if entry is not None:
+            return entry
+        return self.path.lstrip("/") + "/" if below >= MIN_SUBTREE else None
+
+
+class PathTree:
+    """Wordlist entries arranged as a prefix trie of path segments.
+
+    Query strings and fragments do not start segments, so ``admin/#/login``
+    belongs to ``admin/``.
+    """
+
+    def __init__(self, entries: Iterable[str]) -> None:
+        self.root = PathNode("")
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry: str) -> None:
+        location = entry.strip().split("?", 1)[0].split("#", 1)[0]
+        node = self.root
+        node.count += 1
+        for segment in location.strip("/").split("/"):
+            if not segment:
+                continue
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = PathNode(f"{node.path}/{segment}")
+            node = child
+            node.count += 1
+        node.entries.append(entry)
+
+    def __len__(self) -> int:
+        return self.root.count
+
+    def walk(self, score: Optional[Callable[[str], float]] = None) -> "TreeWalk":
+        return TreeWalk(self, score)
+
+
+class TreeWalk:
+    """Parents-first traversal of a ``PathTree`` for one host.
+
+    ``pop`` hands out the next path to probe; a path returned with its node
+    is a directory gate, and the subtree behind it waits until ``settle``
+    reports whether the directory exists. Absent directories are pruned
+    with everything under them. ``score`` orders siblings, highest first.
+    """
+
+    def __init__(self, tree: PathTree, score: Optional[Callable[[str], float]] = None) -> None:
+        self._score = score
+        self._ready: deque[Union[str, PathNode]] = deque()
+        self._gated: dict[int, list[str]] = {}
+        self.in_flight = 0
+        self.pruned = 0
+        self._expand(tree.root, list(tree.root.entries))
+
+    def _order(self, items: list[Union[str, PathNode]]) -> list[Union[str, PathNode]]:
+        if self._score is None:
+            return items
+        score = self._score
+
+        def key(item: Union[str, PathNode]) -> float:
+            if isinstance(item, PathNode):
+                return -score(item.gate() or (item.entries or [item.path])[0])
+            return -score(item)
+
+        return sorted(items, key=key)
+
+    def _expand(self, node: PathNode, entries: list[str], *, front: bool = False) -> None:
+        items = self._order([*entries, *node.children.values()])
+        if front:
+            self._ready.extendleft(reversed(items))
+        else:
+            self._ready.extend(items)
+
+    @property
+    def done(self) -> bool:
+        return not self._ready and not self.in_flight
+
+    def pop(self) -> Optional[tuple[str, Optional[PathNode]]]:
+        while self._ready:
+            item = self._ready.popleft()
+            if isinstance(item, str):
+                return item, None
+            gate = item.gate()
+            if gate is None:
+                # Nothing to wait for: its contents take its place in line.
+                self._expand(item, item.entries, front=True)
+                continue
+            self._gated[id(item)] = [e for e in item.entries if e is not gate]
+            self.in_flight += 1
+            return gate, item
+        return None
+
+    def settle(self, node: PathNode, absent: bool) -> None:
+        """Record the gate probe's outcome and release or prune the subtree."""
+        self.in_flight -= 1
+        held = self._gated.pop(id(node))
+        if absent:
+            self.pruned += len(held) + node.count - len(node.entries)
+        else:
+            self._expand(node, held)
+
+    def close(self) -> None:
+        """Drop everything not yet handed out (the host was stopped)."""
+        self._ready.clear()
@@ -0,0 +1,131 @@
+import asyncio
+import contextlib
+import cProfile
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from rich.console import Group
+from rich.table import Table
+from rich.text import Text
+
+from .metrics import ScanMetrics
+from .stats import LatencyHistogram
+
+
+@dataclass
+class PhaseTiming:
+    wall: float = 0.0
+    cpu: float = 0.0
+    calls: int = 0
+
+
+class ScanProfiler:
+    """Per-phase wall/CPU timing, event-loop lag and a cProfile of one scan.
+
+    Phases accumulate, so a phase entered once per result (output writing)
+    reports its total. Dotted names (``scan.output``) are part of their
+    parent phase's time.
+    """
+
+    def __init__(self, *, lag_interval: float = 0.05) -> None:
+        self.phases: dict[str, PhaseTiming] = {}
+        self.lag = LatencyHistogram()
+        self.max_lag = 0.0
+        self.lag_interval = lag_interval
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._profile = cProfile.Profile()
+        self._lag_task: Optional[asyncio.Task] = None
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        timing = self.phases.setdefault(name, PhaseTiming())
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            timing.wall += time.perf_counter() - wall
+            timing.cpu += time.process_time() - cpu
+            timing.calls += 1
+
+    def start(self) -> None:
+        """Start collecting cProfile data."""
+        self._profile.enable()
+
+    def stop(self) -> None:
+        self._profile.disable()
+
+    def start_lag_monitor(self) -> None:
+        """Measure how late the event loop wakes a periodic sleeper."""
+        if self._lag_task is None:
+            self._lag_task = asyncio.create_task(self._watch_lag())
+
+    async def _watch_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            lag = max(0.0, loop.time() - expected)
+            self.lag.record(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    async def stop_lag_monitor(self) -> None:
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._lag_task
+            self._lag_task = None
+
+    def dump(self, path: Path) -> None:
+        """Write the cProfile data for ``python -m pstats`` or snakeviz."""
+        self._profile.dump_stats(str(path))
+
+    def hot_functions(self, limit: int = 15) -> list[tuple[str, int, float, float]]:
+        """Top functions by own time: (location, calls, tottime, cumtime)."""
+        self._profile.create_stats()
+        rows: list[tuple[str, int, float, float]] = []
+        entries = self._profile.stats.items()
+        for (filename, line, func), (_, calls, tottime, cumtime, _) in entries:
+            location = f"{Path(filename).name}:{line}({func})" if line else func
+            rows.append((location, calls, tottime, cumtime))
+        rows.sort(key=lambda r: r[2], reverse=True)
+        return rows[:limit]
+
+    def report(self, metrics: Optional[ScanMetrics] = None, *, top: int = 15) -> Group:
+        total_wall = time.perf_counter() - self._wall_start
+        total_cpu = time.process_time() - self._cpu_start
+
+        phases = Table(title="Phases", title_justify="left", box=None)
+        for col in ("phase", "wall s", "cpu s", "% wall", "calls"):
+            phases.add_column(col, justify="left" if col == "phase" else "right")
+        for name, t in self.phases.items():
+            label = "  " * name.count(".") + name.rsplit(".", 1)[-1]
+            share = 100 * t.wall / total_wall if total_wall else 0.0
+            phases.add_row(label, f"{t.wall:.3f}", f"{t.cpu:.3f}", f"{share:.1f}", str(t.calls))
+        phases.add_row("total", f"{total_wall:.3f}", f"{total_cpu:.3f}", "100.0", "")
+
+        lines = []
+        if self.lag.count:
+            p99 = (self.lag.percentile(99) or 0.0) * 1000
+            lines.append(
+                f"event-loop lag: p50 {(self.lag.percentile(50) or 0.0) * 1000:.1f} ms  "
+                f"p99 {p99:.1f} ms  max {self.max_lag * 1000:.1f} ms"
+            )
+        if metrics is not None:
+            lines.append(
+                f"rate-limit waits (summed): {metrics.rate_limit_wait_seconds:.3f} s  "
+                f"TLS handshakes: {metrics.tls_handshakes} "
+                f"({metrics.tls_handshake_seconds:.3f} s)  "
+                f"connections opened: {metrics.connections_opened}"
+            )
+
+        hot = Table(title="Hot functions (own time)", title_justify="left", box=None)
+        for col in ("function", "calls", "tottime s", "cumtime s"):
+            hot.add_column(col, justify="left" if col == "function" else "right")
+        for location, calls, tottime, cumtime in self.hot_functions(top):
+            hot.add_row(location, str(calls), f"{tottime:.3f}", f"{cumtime:.3f}")
+
+        return Group(phases, Text("\n".join(lines), style="dim"), hot)
@@ -0,0 +1,112 @@
+import csv
+import json
+import logging
+import sqlite3
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import Any, Optional
+
+from .technology import STACK_TAGS, StackFilter
+
+logger = logging.getLogger(__name__)
+
+# Smoothing: an unseen path scores PRIOR_RATE, and it takes about
+# PRIOR_WEIGHT probes of evidence to move a path far from it.
+PRIOR_RATE = 0.02
+PRIOR_WEIGHT = 10.0
+# Score multipliers for paths tagged with the host's stack, or only others.
+STACK_MATCH = 2.0
+STACK_MISMATCH = 0.5
+
+
+def _norm(path: str) -> str:
+    return "/" + path.strip().lstrip("/")
+
+
+def _iter_result_file(path: Path) -> Iterator[Mapping[str, Any]]:
+    suffix = path.suffix.lower()
+    if suffix in (".jsonl", ".ndjson"):
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+    elif suffix == ".json":
+        yield from json.loads(path.read_text(encoding="utf-8"))
+    elif suffix == ".csv":
+        with path.open(newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield {**row, "ok": row.get("ok") == "True"}
+    else:
+        # A result cache; opened read-only so that no other file gets a schema.
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            for (data,) in conn.execute("SELECT data FROM results"):
+                yield json.loads(data)
+        finally:
+            conn.close()
+
+
+class HitHistory:
+    """Per-path probe and hit counts from past scan results."""
+
+    def __init__(self) -> None:
+        self.probes: Counter[str] = Counter()
+        self.hits: Counter[str] = Counter()
+
+    def add(self, path: str, ok: bool) -> None:
+        path = _norm(path)
+        self.probes[path] += 1
+        if ok:
+            self.hits[path] += 1
+
+    def add_results(self, results: Iterable[Mapping[str, Any]]) -> None:
+        for r in results:
+            if r.get("path") and r.get("status"):
+                self.add(r["path"], bool(r.get("ok")))
+
+    @classmethod
+    def load(cls, paths: Iterable[Path]) -> "HitHistory":
+        """Read result caches (SQLite or JSONL) and --json/--csv/--ndjson outputs."""
+        history = cls()
+        for path in paths:
+            try:
+                history.add_results(_iter_result_file(path))
+            except (OSError, ValueError, sqlite3.Error) as exc:
+                logger.warning("Ignoring scan history %s: %s", path, exc)
+        return history
+
+    def __len__(self) -> int:
+        return len(self.probes)
+
+    def rate(self, path: str) -> float:
+        """Smoothed hit rate of ``path`` across past scans."""
+        path = _norm(path)
+        return (self.hits[path] + PRIOR_RATE * PRIOR_WEIGHT) / (self.probes[path] + PRIOR_WEIGHT)
+
+
+class PathRanker:
+    """``rank(target, path)`` score for ordering probes, higher first.
+
+    The history hit rate, scaled up for paths tagged with the target's
+    detected stack and down for paths tagged only with other stacks.
+    Picklable, so it works with ``--workers``.
+    """
+
+    def __init__(self, history: HitHistory, stack_filter: Optional[StackFilter] = None) -> None:
+        self.history = history
+        self.stack_filter = stack_filter
+
+    def __call__(self, target: str, path: str) -> float:
+        score = self.history.rate(path)
+        stacks = self.stack_filter.stacks.get(target) if self.stack_filter else None
+        if stacks:
+            tags = self.stack_filter.path_tags(path) & STACK_TAGS  # type: ignore[union-attr]
+            if tags & stacks:
+                score *= STACK_MATCH
+            elif tags:
+                score *= STACK_MISMATCH
+        return score
@@ -1,8 +1,19 @@
 import asyncio
+import multiprocessing
 import time
+from collections.abc import Mapping
+from typing import Optional
 
 
-class AsyncRateLimiter:
+class TokenBucket:
+    """Token bucket that hands out reservations instead of blocking.
+
+    ``reserve`` takes a token immediately, letting the balance go negative,
+    and returns how long the caller must wait before using it. Since there is
+    no ``await`` between reading and updating the balance, no lock is needed
+    and waiters sleep concurrently rather than queueing behind one another.
+    """
+
     def __init__(self, rate_per_sec: float, burst: int = 1) -> None:
         if rate_per_sec <= 0:
             raise ValueError("rate_per_sec must be > 0")
@@ -10,17 +21,101 @@ class AsyncRateLimiter:
         self.capacity = max(1, int(burst))
         self._tokens = float(self.capacity)
         self._last = time.monotonic()
-        self._lock = asyncio.Lock()
-
-    async def acquire(self) -> None:
-        async with self._lock:
-            now = time.monotonic()
-            elapsed = now - self._last
-            self._last = now
-            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
-            if self._tokens < 1.0:
-                need = 1.0 - self._tokens
-                await asyncio.sleep(need / self.rate)
-                self._tokens = 0.0
-            else:
-                self._tokens -= 1.0
+
+    def reserve(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        self._tokens -= 1.0
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def refund(self) -> None:
+        """Give back a reserved token that will not be used."""
+        self._tokens = min(self.capacity, self._tokens + 1.0)
+
+
+class SharedTokenBucket(TokenBucket):
+    """``TokenBucket`` whose balance lives in shared memory.
+
+    Pass it to worker processes (as a ``Process`` argument) so they draw
+    from one budget. Reservations take a process-shared lock for a few
+    microseconds; ``time.monotonic`` is system-wide, so timestamps from
+    different processes agree.
+    """
+
+    def __init__(self, rate_per_sec: float, burst: int = 1, *, ctx=None) -> None:
+        super().__init__(rate_per_sec, burst)
+        ctx = ctx or multiprocessing.get_context()
+        self._state = ctx.RawArray("d", [self._tokens, self._last])
+        self._lock = ctx.Lock()
+
+    def reserve(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, last = self._state
+            tokens = min(self.capacity, tokens + max(0.0, now - last) * self.rate) - 1.0
+            self._state[0], self._state[1] = tokens, max(now, last)
+        return 0.0 if tokens >= 0 else -tokens / self.rate
+
+    def refund(self) -> None:
+        with self._lock:
+            self._state[0] = min(self.capacity, self._state[0] + 1.0)
+
+
+class AsyncRateLimiter:
+    """Global token bucket plus optional independent per-host buckets.
+
+    ``acquire(host)`` reserves a token from the global bucket and from the
+    host's bucket, then sleeps until both are available. Pre-built buckets
+    (``bucket``, ``host_buckets``) replace the ones made from the rates,
+    e.g. to share them between processes.
+    """
+
+    def __init__(
+        self,
+        rate_per_sec: Optional[float],
+        burst: int = 1,
+        *,
+        per_host_rate: Optional[float] = None,
+        per_host_burst: int = 1,
+        bucket: Optional[TokenBucket] = None,
+        host_buckets: Optional[Mapping[str, TokenBucket]] = None,
+    ) -> None:
+        if rate_per_sec is None and per_host_rate is None:
+            raise ValueError("rate_per_sec or per_host_rate is required")
+        if bucket is None and rate_per_sec is not None:
+            bucket = TokenBucket(rate_per_sec, burst)
+        self._global = bucket
+        if per_host_rate is not None and per_host_rate <= 0:
+            raise ValueError("per_host_rate must be > 0")
+        self.per_host_rate = per_host_rate
+        self.per_host_burst = per_host_burst
+        self._hosts: dict[str, TokenBucket] = dict(host_buckets or {})
+
+    @property
+    def rate(self) -> Optional[float]:
+        return self._global.rate if self._global else None
+
+    def _buckets(self, host: Optional[str]) -> list[TokenBucket]:
+        buckets = [self._global] if self._global else []
+        if host is not None and self.per_host_rate is not None:
+            bucket = self._hosts.get(host)
+            if bucket is None:
+                bucket = self._hosts[host] = TokenBucket(self.per_host_rate, self.per_host_burst)
+            buckets.append(bucket)
+        return buckets
+
+    async def acquire(self, host: Optional[str] = None) -> float:
+        """Wait for a slot and return the time spent waiting, in seconds."""
+        buckets = self._buckets(host)
+        now = time.monotonic()
+        delay = max((b.reserve(now) for b in buckets), default=0.0)
+        if delay <= 0:
+            return 0.0
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            for b in buckets:
+                b.refund()
+            raise
+        return delay
@@ -0,0 +1,283 @@
+import asyncio
+import contextlib
+import ipaddress
+import socket
+import ssl
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+import httpcore
+import httpx
+
+DEFAULT_DNS_TTL = 300.0
+NEGATIVE_TTL = 30.0
+MAX_CONCURRENT_LOOKUPS = 32
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+    except ValueError:
+        return False
+    return True
+
+
+def load_hosts_file(path: Path) -> dict[str, list[str]]:
+    """Parse an /etc/hosts style file into ``{hostname: [address, ...]}``."""
+    hosts: dict[str, list[str]] = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        fields = line.split("#", 1)[0].split()
+        if len(fields) < 2 or not _is_ip(fields[0]):
+            continue
+        for name in fields[1:]:
+            hosts.setdefault(name.lower(), []).append(fields[0])
+    return hosts
+
+
+@dataclass
+class _Entry:
+    addresses: list[str]
+    expires: float
+    error: Optional[OSError] = None
+
+
+class DnsCache:
+    """Async resolver with an in-memory TTL cache and a static hosts map.
+
+    Lookups go through the event loop's ``getaddrinfo`` at most once per
+    host per ``ttl`` (failures are remembered for ``negative_ttl``), and
+    concurrent lookups for the same host share one query. ``getaddrinfo``
+    does not report record TTLs, so ``ttl`` applies to every answer;
+    ``hosts`` entries never expire.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float = DEFAULT_DNS_TTL,
+        negative_ttl: float = NEGATIVE_TTL,
+        hosts: Optional[Mapping[str, Union[str, Iterable[str]]]] = None,
+    ) -> None:
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hosts: dict[str, list[str]] = {}
+        for name, addrs in (hosts or {}).items():
+            self.hosts[name.lower()] = [addrs] if isinstance(addrs, str) else list(addrs)
+        self._entries: dict[str, _Entry] = {}
+        self._pending: dict[str, asyncio.Future] = {}
+        self.lookups = 0
+
+    def cached(self, host: str) -> Optional[list[str]]:
+        """Fresh addresses for ``host`` without resolving, or None."""
+        host = host.lower()
+        if host in self.hosts:
+            return self.hosts[host]
+        entry = self._entries.get(host)
+        if entry is None or entry.error or entry.expires <= time.monotonic():
+            return None
+        return entry.addresses
+
+    async def resolve(self, host: str) -> list[str]:
+        """Addresses for ``host``, raising ``OSError`` if it does not resolve."""
+        host = host.lower()
+        if host in self.hosts:
+            return self.hosts[host]
+        if _is_ip(host):
+            return [host.strip("[]")]
+        entry = self._entries.get(host)
+        if entry is not None and entry.expires > time.monotonic():
+            if entry.error is not None:
+                raise entry.error
+            return entry.addresses
+        pending = self._pending.get(host)
+        if pending is None:
+            pending = asyncio.ensure_future(self._lookup(host))
+            self._pending[host] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(host, None))
+        return await asyncio.shield(pending)
+
+    async def _lookup(self, host: str) -> list[str]:
+        self.lookups += 1
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except OSError as exc:
+            self._entries[host] = _Entry([], time.monotonic() + self.negative_ttl, exc)
+            raise
+        addresses = list(dict.fromkeys(str(info[4][0]) for info in infos))
+        self._entries[host] = _Entry(addresses, time.monotonic() + self.ttl)
+        return addresses
+
+    async def prefetch(self, hosts: Iterable[str]) -> dict[str, Optional[OSError]]:
+        """Resolve ``hosts`` concurrently; map each to None or its lookup error."""
+        sem = asyncio.Semaphore(MAX_CONCURRENT_LOOKUPS)
+        names = list(dict.fromkeys(h.lower() for h in hosts if h))
+
+        async def one(host: str) -> Optional[OSError]:
+            async with sem:
+                try:
+                    await self.resolve(host)
+                except OSError as exc:
+                    return exc
+            return None
+
+        errors = await asyncio.gather(*(one(h) for h in names))
+        return dict(zip(names, errors))
+
+
+class ResolvingBackend(httpcore.AsyncNetworkBackend):
+    """httpcore network backend that dials addresses from a ``DnsCache``.
+
+    Only the TCP connect target changes: httpcore still takes the TLS server
+    name and the Host header from the request URL.
+    """
+
+    def __init__(
+        self, cache: DnsCache, backend: Optional[httpcore.AsyncNetworkBackend] = None
+    ) -> None:
+        self.cache = cache
+        self._backend = backend or httpcore.AnyIOBackend()
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[Iterable] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await self.cache.resolve(host)
+        except OSError as exc:
+            raise httpcore.ConnectError(str(exc)) from exc
+        error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address,
+                    port,
+                    timeout=timeout,
+                    local_address=local_address,
+                    socket_options=socket_options,
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as exc:
+                error = exc
+        raise error or httpcore.ConnectError(f"no addresses for {host}")
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: Optional[float] = None,
+        socket_options: Optional[Iterable] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options
+        )
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+# httpcore errors and the httpx errors they surface as. A subclass is looked
+# up before its bases, so each error maps to the most specific match.
+_HTTPX_ERRORS: dict[type[Exception], type[httpx.TransportError]] = {
+    httpcore.TimeoutException: httpx.TimeoutException,
+    httpcore.ConnectTimeout: httpx.ConnectTimeout,
+    httpcore.ReadTimeout: httpx.ReadTimeout,
+    httpcore.WriteTimeout: httpx.WriteTimeout,
+    httpcore.PoolTimeout: httpx.PoolTimeout,
+    httpcore.NetworkError: httpx.NetworkError,
+    httpcore.ConnectError: httpx.ConnectError,
+    httpcore.ReadError: httpx.ReadError,
+    httpcore.WriteError: httpx.WriteError,
+    httpcore.ProxyError: httpx.ProxyError,
+    httpcore.UnsupportedProtocol: httpx.UnsupportedProtocol,
+    httpcore.ProtocolError: httpx.ProtocolError,
+    httpcore.LocalProtocolError: httpx.LocalProtocolError,
+    httpcore.RemoteProtocolError: httpx.RemoteProtocolError,
+}
+
+
+@contextlib.contextmanager
+def _httpx_errors() -> Iterator[None]:
+    try:
+        yield
+    except Exception as exc:
+        for cls in type(exc).__mro__:
+            mapped = _HTTPX_ERRORS.get(cls)
+            if mapped is not None:
+                raise mapped(str(exc)) from exc
+        raise
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream: AsyncIterable[bytes]) -> None:
+        self._stream = stream
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with _httpx_errors():
+            async for part in self._stream:
+                yield part
+
+    async def aclose(self) -> None:
+        aclose = getattr(self._stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+class ResolvingTransport(httpx.AsyncBaseTransport):
+    """httpx transport whose connections go to addresses from a ``DnsCache``.
+
+    httpx has no resolver hook, so this wraps an httpcore connection pool
+    built on ``ResolvingBackend`` and translates requests, responses and
+    errors the way httpx's own transport does. Proxies are not supported.
+    """
+
+    def __init__(
+        self,
+        cache: DnsCache,
+        *,
+        ssl_context: ssl.SSLContext,
+        http1: bool = True,
+        http2: bool = False,
+        limits: httpx.Limits,
+    ) -> None:
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=ssl_context,
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=http1,
+            http2=http2,
+            network_backend=ResolvingBackend(cache),
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        assert isinstance(request.stream, httpx.AsyncByteStream)
+        req = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _httpx_errors():
+            resp = await self._pool.handle_async_request(req)
+        assert isinstance(resp.stream, AsyncIterable)
+        return httpx.Response(
+            status_code=resp.status,
+            headers=resp.headers,
+            stream=_ResponseStream(resp.stream),
+            extensions=resp.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
@@ -0,0 +1,130 @@
+import contextlib
+import random
+import time
+from collections.abc import Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+# Transient failures worth another attempt. ConnectError is deliberately
+# absent: DNS failures, refused connections and TLS errors will not succeed
+# on retry.
+RETRYABLE_EXCEPTIONS: tuple[type[BaseException], ...] = (
+    httpx.TimeoutException,
+    httpx.RemoteProtocolError,
+    httpx.ReadError,
+    httpx.WriteError,
+)
+
+
+@dataclass
+class RetryPolicy:
+    """Which failures are retried, how long to back off, and how many retries to allow.
+
+    Retries are capped per request (``max_attempts``) and by a budget: at most
+    ``budget_ratio`` extra requests on top of the first attempts, globally and
+    per host, plus ``budget_min`` retries of slack for small scans.
+    """
+
+    max_attempts: int = 3
+    backoff_initial: float = 0.2
+    backoff_max: float = 10.0
+    retry_statuses: frozenset[int] = frozenset({429, 502, 503, 504})
+    retry_exceptions: tuple[type[BaseException], ...] = RETRYABLE_EXCEPTIONS
+    max_retry_after: float = 60.0
+    budget_ratio: float = 0.1
+    budget_min: int = 10
+
+    def is_retryable_error(self, exc: BaseException) -> bool:
+        return isinstance(exc, self.retry_exceptions)
+
+    def backoff(self, attempt: int) -> float:
+        base = min(self.backoff_max, self.backoff_initial * (2**attempt))
+        return base + random.uniform(0, base / 2)
+
+
+@dataclass
+class RetryBudget:
+    ratio: float = 0.1
+    minimum: int = 10
+    requests: int = 0
+    retries: int = 0
+
+    def can_retry(self) -> bool:
+        return self.retries < self.minimum + self.ratio * self.requests
+
+
+@dataclass
+class RetryBudgets:
+    """The global budget plus one budget per host."""
+
+    policy: RetryPolicy
+    total: RetryBudget = field(init=False)
+    hosts: dict[str, RetryBudget] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.total = self._new()
+
+    def _new(self) -> RetryBudget:
+        return RetryBudget(self.policy.budget_ratio, self.policy.budget_min)
+
+    def _host(self, host: str) -> RetryBudget:
+        budget = self.hosts.get(host)
+        if budget is None:
+            budget = self.hosts[host] = self._new()
+        return budget
+
+    def record_request(self, host: str) -> None:
+        self.total.requests += 1
+        self._host(host).requests += 1
+
+    def try_spend(self, host: str) -> bool:
+        budget = self._host(host)
+        if not (self.total.can_retry() and budget.can_retry()):
+            return False
+        self.total.retries += 1
+        budget.retries += 1
+        return True
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, when.timestamp() - now)
+
+
+@dataclass
+class RetryTally:
+    count: int = 0
+
+
+_current_tally: ContextVar[Optional[RetryTally]] = ContextVar("apf_retry_tally", default=None)
+
+
+@contextlib.contextmanager
+def count_retries() -> Iterator[RetryTally]:
+    """Count the retries the client performs inside this block (in this task)."""
+    tally = RetryTally()
+    token = _current_tally.set(tally)
+    try:
+        yield tally
+    finally:
+        _current_tally.reset(token)
+
+
+def note_retry() -> None:
+    tally = _current_tally.get()
+    if tally is not None:
+        tally.count += 1
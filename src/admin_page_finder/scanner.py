@@ -1,13 +1,36 @@
 import asyncio
-from collections.abc import Iterable, Mapping
+import contextlib
+import itertools
+import logging
+import time
+from array import array
+from collections import Counter, deque
+from collections.abc import AsyncGenerator, AsyncIterator, Callable, Iterable, Iterator, Mapping
 from dataclasses import dataclass
-from typing import Optional
+from functools import partial
+from typing import TYPE_CHECKING, Optional, Union
 from urllib.parse import urljoin, urlparse
 
 import httpx
 
-from .http import AsyncHttpClient
+from .adaptive import OVERLOAD_STATUSES, AdaptiveLimiter
+from .calibration import HostBaseline, calibrate_host, fingerprint_response
+from .crawler import CrawlBudget, SiteCrawler
+from .http import (
+    DEFAULT_KEEPALIVE_EXPIRY,
+    DEFAULT_PREFIX_BYTES,
+    AsyncHttpClient,
+    response_length,
+)
+from .metrics import ScanMetrics
+from .pathtree import PathNode, PathTree, TreeWalk
 from .rate_limit import AsyncRateLimiter
+from .resolver import DnsCache
+from .retry import RetryPolicy, count_retries
+from .stats import ScanStats
+
+if TYPE_CHECKING:
+    from .session import ScanSession
 
 
 @dataclass
@@ -20,6 +43,9 @@ class ScanResult:
     final_url: str
     elapsed_ms: int
     content_length: int
+    soft_404: bool = False
+    retries: int = 0
+    target: str = ""
 
 
 def _normalize_base_url(base_url: str) -> str:
@@ -28,10 +54,47 @@ def _normalize_base_url(base_url: str) -> str:
     return base_url.rstrip("/")
 
 
-async def _probe_path(
+logger = logging.getLogger(__name__)
+
+PROBE_METHODS = ("range", "head", "get")
+WILDCARD_POLICIES = ("flag", "skip")
+
+# HEAD answers that are not trusted as-is and are re-checked with a GET.
+# 405/501 additionally mark the host as not supporting HEAD at all.
+HEAD_RECHECK_STATUSES = frozenset({400, 403, 405, 501})
+
+
+async def _first_hop(
+    client: AsyncHttpClient,
+    url: str,
+    probe: str,
+    head_blocked: Optional[set[str]],
+) -> tuple[httpx.Response, bytes]:
+    host = urlparse(url).netloc
+    if probe == "head" and (head_blocked is None or host not in head_blocked):
+        resp = await client.head(url, follow_redirects=False)
+        if resp.status_code not in HEAD_RECHECK_STATUSES:
+            return resp, b""
+        if resp.status_code in (405, 501) and head_blocked is not None:
+            head_blocked.add(host)
+    if probe == "get":
+        resp = await client.get(url, follow_redirects=False)
+        return resp, resp.content[:DEFAULT_PREFIX_BYTES]
+    resp, body = await client.get_prefix(url, follow_redirects=False)
+    if resp.status_code == 416:
+        # Empty resources cannot satisfy a range; ask again without one.
+        resp, body = await client.get_prefix(url, ranged=False, follow_redirects=False)
+    return resp, body
+
+
+async def _probe_path_once(
     client: AsyncHttpClient,
     base_url: str,
     path: str,
+    *,
+    probe: str = "range",
+    head_blocked: Optional[set[str]] = None,
+    baseline: Optional[HostBaseline] = None,
 ) -> ScanResult:
     path_clean = path.strip()
     if not path_clean:
@@ -49,17 +112,35 @@ async def _probe_path(
         path_clean = "/" + path_clean
     url = urljoin(base_url + "/", path_clean.lstrip("/"))
     try:
-        resp: httpx.Response = await client.get(url)
-        content_length = int(resp.headers.get("content-length", 0) or 0)
+        # The first hop decides the status; following the redirect is best-effort.
+        resp, body = await _first_hop(client, url, probe, head_blocked)
+        status = 200 if resp.status_code == 206 else resp.status_code
+        soft_404 = False
+        if baseline is not None and status != 404:
+            if not body and status in baseline.statuses and not resp.is_redirect:
+                # A HEAD answer looks like the not-found page; confirm on the body.
+                resp, body = await client.get_prefix(url, follow_redirects=False)
+            soft_404 = baseline.matches(fingerprint_response(resp, body, path_clean))
+        final = resp
+        final_url = url
+        if resp.is_redirect:
+            final_url = str(resp.next_request.url) if resp.next_request else url
+            if client.follow_redirects:
+                try:
+                    final = await client.follow(resp, max_bytes=None if probe == "get" else 0)
+                    final_url = str(final.url)
+                except Exception:
+                    pass
         return ScanResult(
             path=path_clean,
             url=url,
-            status=resp.status_code,
-            ok=resp.status_code == 200,
-            redirected=len(resp.history) > 0,
-            final_url=str(resp.url),
+            status=status,
+            ok=status == 200 and not soft_404,
+            redirected=resp.is_redirect,
+            final_url=final_url,
             elapsed_ms=int(resp.elapsed.total_seconds() * 1000),
-            content_length=content_length,
+            content_length=response_length(final),
+            soft_404=soft_404,
         )
     except Exception:
         return ScanResult(
@@ -74,10 +155,63 @@ async def _probe_path(
         )
 
 
-async def scan_admin_paths(
+async def _probe_path(
+    client: AsyncHttpClient,
     base_url: str,
+    path: str,
+    *,
+    probe: str = "range",
+    head_blocked: Optional[set[str]] = None,
+    baseline: Optional[HostBaseline] = None,
+) -> ScanResult:
+    with count_retries() as tally:
+        res = await _probe_path_once(
+            client, base_url, path, probe=probe, head_blocked=head_blocked, baseline=baseline
+        )
+    res.retries = tally.count
+    res.target = base_url
+    return res
+
+
+def _host_key(base_url: str) -> str:
+    return urlparse(base_url).netloc
+
+
+def _normalize_path(path: str) -> str:
+    return "/" + path.strip().lstrip("/")
+
+
+# Statuses that say a directory is not there, as opposed to merely guarded.
+ABSENT_STATUSES = frozenset({404, 410})
+
+
+def _is_absent(res: ScanResult, baseline: Optional[HostBaseline]) -> bool:
+    """Whether a directory probe says the directory does not exist.
+
+    A 404/410 counts only when the host's baseline answers nonexistent
+    paths the same way (or there is no baseline); a soft 404 always does.
+    Errors, redirects, 401/403 and other answers count as present.
+    """
+    if res.soft_404:
+        return True
+    if res.status not in ABSENT_STATUSES:
+        return False
+    return baseline is None or not baseline.fingerprints or res.status in baseline.statuses
+
+
+_DONE = object()
+# Jobs held back for hosts with no free slot, across all hosts of a scan.
+MAX_PARKED_JOBS = 100_000
+# Wordlist entries ranked together; a ranked scan reorders within each window.
+RANK_WINDOW = 4096
+
+
+async def _iter_scan_indexed(
+    targets: Union[str, Iterable[str]],
     paths: Iterable[str],
     *,
+    extra_paths: Optional[Mapping[str, Iterable[str]]] = None,
+    skip: Optional[Callable[[str, str], bool]] = None,
     concurrency: int = 100,
     per_host_concurrency: int = 10,
     rate_limit: Optional[float] = None,
@@ -89,42 +223,747 @@ async def scan_admin_paths(
     headers: Optional[Mapping[str, str]] = None,
     cookies: Optional[Mapping[str, str]] = None,
     rotate_user_agents: bool = False,
-) -> list[ScanResult]:
-    base_url_norm = _normalize_base_url(base_url)
-    global_sem = asyncio.Semaphore(max(1, concurrency))
-    per_host_sems: dict[str, asyncio.Semaphore] = {}
+    probe: str = "range",
+    calibrate: bool = False,
+    wildcard_policy: str = "flag",
+    adaptive: bool = False,
+    stats: Optional[ScanStats] = None,
+    metrics: Optional[ScanMetrics] = None,
+    http_version: str = "auto",
+    pool_size: Optional[int] = None,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    h2_max_streams: Optional[int] = None,
+    resolver: Optional[DnsCache] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    per_host_rate: Optional[float] = None,
+    rate_limiter: Optional[AsyncRateLimiter] = None,
+    rank: Optional[Callable[[str, str], float]] = None,
+    stop_after_hits: Optional[int] = None,
+    host_time_budget: Optional[float] = None,
+    tree: bool = False,
+    cached_absent: Optional[Callable[[str, str], bool]] = None,
+    crawl: Optional[CrawlBudget] = None,
+    session: Optional["ScanSession"] = None,
+) -> AsyncGenerator[tuple[tuple[int, int], ScanResult], None]:
+    if probe not in PROBE_METHODS:
+        raise ValueError(f"probe must be one of {', '.join(PROBE_METHODS)}")
+    if wildcard_policy not in WILDCARD_POLICIES:
+        raise ValueError(f"wildcard_policy must be one of {', '.join(WILDCARD_POLICIES)}")
+    if isinstance(targets, str):
+        targets = [targets]
+    bases = list(dict.fromkeys(_normalize_base_url(t) for t in targets))
+    if session is not None:
+        resolver, proxy = session.resolver, session.proxy
+    if resolver is not None and proxy is None:
+        # Resolve every target up front and concurrently; a target that does
+        # not resolve would only fail each of its probes.
+        errors = await resolver.prefetch(urlparse(b).hostname or "" for b in bases)
+        unresolved = set()
+        for base in bases:
+            error = errors.get((urlparse(base).hostname or "").lower())
+            if error is not None:
+                logger.warning("Skipping %s: cannot resolve host (%s)", base, error)
+                unresolved.add(base)
+        bases = [b for b in bases if b not in unresolved]
+    if not bases:
+        return
+    extras: dict[str, dict[str, str]] = {}
+    for t, ps in (extra_paths or {}).items():
+        per_base = extras.setdefault(_normalize_base_url(t), {})
+        for p in ps:
+            per_base.setdefault(_normalize_path(p), p)
+
+    # Each host is capped by a static semaphore or, in adaptive mode, by an
+    # AIMD limiter that uses per_host_concurrency as its ceiling. A session
+    # keeps them, so the caps also hold across its concurrent scans.
+    per_host_sems: dict[str, asyncio.Semaphore] = session.per_host_sems if session else {}
+    adaptive_limiters: dict[str, AdaptiveLimiter] = session.adaptive_limiters if session else {}
+    for base in bases:
+        host = _host_key(base)
+        if adaptive:
+            adaptive_limiters.setdefault(host, AdaptiveLimiter(maximum=per_host_concurrency))
+        else:
+            per_host_sems.setdefault(host, asyncio.Semaphore(max(1, per_host_concurrency)))
+    n_workers = max(1, min(concurrency, per_host_concurrency * len(bases)))
+
+    limiter = rate_limiter or (
+        AsyncRateLimiter(rate_limit, rate_burst, per_host_rate=per_host_rate)
+        if rate_limit or per_host_rate
+        else None
+    )
+
+    client = (
+        session.client
+        if session is not None
+        else AsyncHttpClient(
+            timeout=timeout,
+            verify_tls=verify_tls,
+            follow_redirects=follow_redirects,
+            proxy=proxy,
+            headers=headers,
+            cookies=cookies,
+            rate_limiter=limiter,
+            rotate_user_agents=rotate_user_agents,
+            retry_policy=retry_policy,
+            metrics=metrics,
+            http_version=http_version,
+            # One connection per worker covers HTTP/1.1; HTTP/2 needs fewer.
+            pool_size=pool_size or n_workers,
+            keepalive_expiry=keepalive_expiry,
+            h2_max_streams=h2_max_streams,
+            resolver=resolver,
+        )
+    )
+
+    host_hits: Counter[str] = Counter()
+    host_started: dict[str, float] = {}
+    stopped: set[str] = set()
+
+    def stop_host(base: str, reason: str) -> None:
+        if base not in stopped:
+            stopped.add(base)
+            logger.info("Stopping %s: %s", base, reason)
+
+    def host_done(base: str) -> bool:
+        if base in stopped:
+            return True
+        if host_time_budget is not None:
+            started = host_started.setdefault(base, time.monotonic())
+            if time.monotonic() - started >= host_time_budget:
+                stop_host(base, f"time budget of {host_time_budget:g}s used")
+                return True
+        return False
+
+    def unprobed() -> None:
+        if stats is not None:
+            stats.skipped += 1
+
+    def note_hit(base: str) -> None:
+        host_hits[base] += 1
+        if stop_after_hits is not None and host_hits[base] >= stop_after_hits:
+            stop_host(base, f"{host_hits[base]} hit(s) found")
+
+    def host_paths() -> Iterator[tuple[int, str, str]]:
+        if rank is None:
+            for p in paths:
+                norm = _normalize_path(p)
+                for i in range(len(bases)):
+                    yield i, p, norm
+            return
+        # Ranking works on windows of the list so that probing starts at once
+        # and memory stays bounded; each host gets its own order per window,
+        # stored as compact index arrays, and the hosts take turns.
+        it = iter(paths)
+        while window := list(itertools.islice(it, RANK_WINDOW)):
+            orders = [
+                (i, array("I", sorted(range(len(window)), key=lambda k: -rank(base, window[k]))))
+                for i, base in enumerate(bases)
+                if base not in stopped
+            ]
+            for k in range(len(window)):
+                for i, order in orders:
+                    p = window[order[k]]
+                    yield i, p, _normalize_path(p)
+
+    def jobs() -> Iterator[tuple[int, str, str]]:
+        # Per-target extras (usually discovery hits) go first; the shared
+        # wordlist is then consumed exactly once and fanned out to every host.
+        for i, base in enumerate(bases):
+            for norm, p in extras.get(base, {}).items():
+                if skip is None or not skip(base, norm):
+                    yield i, base, p
+                else:
+                    unprobed()
+        for i, p, norm in host_paths():
+            base = bases[i]
+            if base in stopped:
+                if len(stopped) == len(bases):
+                    return
+                unprobed()
+                continue
+            if norm in extras.get(base, ()) or (skip is not None and skip(base, norm)):
+                unprobed()
+                continue
+            yield i, base, p
+
+    # Tree mode: each host walks the wordlist trie parents-first, and a
+    # directory's entries are only queued once the directory answered.
+    walks: list[TreeWalk] = []
+    tree_wake = asyncio.Event()
+
+    async def tree_jobs() -> AsyncIterator[tuple[int, str, str, Optional[PathNode]]]:
+        for i, base in enumerate(bases):
+            for norm, p in extras.get(base, {}).items():
+                if skip is None or not skip(base, norm):
+                    yield i, base, p, None
+                else:
+                    unprobed()
+        path_tree = PathTree(paths)
+        for base in bases:
+            walks.append(path_tree.walk(partial(rank, base) if rank is not None else None))
+        while True:
+            tree_wake.clear()
+            idle = True
+            for i, walk in enumerate(walks):
+                base = bases[i]
+                if base in stopped:
+                    walk.close()
+                    continue
+                item = walk.pop()
+                if item is None:
+                    continue
+                idle = False
+                p, node = item
+                norm = _normalize_path(p)
+                if norm in extras.get(base, ()) or (skip is not None and skip(base, norm)):
+                    unprobed()
+                    # Not probed by this walk: prune only what a past scan found missing.
+                    if node is not None:
+                        settle_walk(
+                            i, node, cached_absent is not None and cached_absent(base, norm)
+                        )
+                    continue
+                yield i, base, p, node
+            if idle:
+                if all(walk.done for walk in walks):
+                    return
+                await tree_wake.wait()
+
+    def settle_walk(i: int, node: PathNode, absent: bool) -> None:
+        walk = walks[i]
+        pruned = walk.pruned
+        walk.settle(node, absent=absent)
+        if stats is not None and walk.pruned > pruned:
+            host = _host_key(bases[i])
+            stats.host_pruned[host] = stats.host_pruned.get(host, 0) + walk.pruned - pruned
+
+    def settle(i: int, node: PathNode, res: Optional[ScanResult]) -> None:
+        baseline = None
+        host = _host_key(bases[i])
+        if host in baselines and baselines[host].done() and not baselines[host].cancelled():
+            baseline = baselines[host].result()
+        settle_walk(i, node, res is None or _is_absent(res, baseline))
+        tree_wake.set()
+
+    head_blocked: set[str] = session.head_blocked if session else set()
+    baselines: dict[str, asyncio.Task] = session.baselines if session else {}
+    wildcard_hosts: set[str] = session.wildcard_hosts if session else set()
+
+    async def baseline_for(base: str) -> Optional[HostBaseline]:
+        host = _host_key(base)
+        if host not in baselines:
+            baselines[host] = asyncio.ensure_future(calibrate_host(client, base))
+        baseline = await baselines[host]
+        if baseline is not None and baseline.wildcard and host not in wildcard_hosts:
+            wildcard_hosts.add(host)
+            logger.warning(
+                "%s answers 200 for nonexistent paths (wildcard host)%s",
+                host,
+                "; skipping it" if wildcard_policy == "skip" else "",
+            )
+        return baseline
+
+    async def probe_one(base: str, p: str) -> Optional[ScanResult]:
+        baseline = await baseline_for(base) if calibrate else None
+        if baseline is not None and baseline.wildcard and wildcard_policy == "skip":
+            return None
+        if stats is None:
+            return await _probe_path(
+                client, base, p, probe=probe, head_blocked=head_blocked, baseline=baseline
+            )
+        stats.inflight += 1
+        started = time.monotonic()
+        try:
+            res = await _probe_path(
+                client, base, p, probe=probe, head_blocked=head_blocked, baseline=baseline
+            )
+        finally:
+            stats.inflight -= 1
+        stats.record(_host_key(base), res.status, time.monotonic() - started, res.retries)
+        return res
+
+    def slot_for(base: str) -> Union[asyncio.Semaphore, AdaptiveLimiter]:
+        host = _host_key(base)
+        return adaptive_limiters.get(host) or per_host_sems[host]
+
+    async def run_job(base: str, p: str) -> Optional[ScanResult]:
+        host = _host_key(base)
+        slot = slot_for(base)
+        if stats is not None:
+            stats.queued += 1
+        try:
+            await slot.acquire()
+        finally:
+            if stats is not None:
+                stats.queued -= 1
+        if isinstance(slot, asyncio.Semaphore):
+            try:
+                return await probe_one(base, p)
+            finally:
+                slot.release()
+        started = time.monotonic()
+        res: Optional[ScanResult] = None
+        try:
+            res = await probe_one(base, p)
+            return res
+        finally:
+            overloaded = res is not None and (res.status == 0 or res.status in OVERLOAD_STATUSES)
+            slot.release(latency=time.monotonic() - started, overloaded=overloaded)
+            if stats is not None:
+                stats.host_concurrency[host] = slot.limit
+
+    @contextlib.asynccontextmanager
+    async def host_slot(base: str) -> AsyncIterator[None]:
+        # Crawl fetches count against the same per-host limit as probes.
+        slot = slot_for(base)
+        await slot.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            if isinstance(slot, asyncio.Semaphore):
+                slot.release()
+            else:
+                slot.release(latency=time.monotonic() - started)
+
+    # Crawl mode: what the crawlers find is queued ahead of the wordlist as
+    # soon as it is found. Paths the wordlist has already listed are left to
+    # it, and the wordlist skips paths the crawl got to first.
+    found_q: deque[tuple[int, str, str]] = deque()
+    found_paths: dict[str, set[str]] = {base: set() for base in bases}
+    listed: set[str] = set()
+    crawl_wake = asyncio.Event()
+    crawl_tasks: list[asyncio.Task] = []
+
+    def found(i: int, p: str) -> None:
+        base = bases[i]
+        norm = _normalize_path(p)
+        if base in stopped or norm in listed or norm in found_paths[base]:
+            return
+        if norm in extras.get(base, ()) or (skip is not None and skip(base, norm)):
+            return
+        found_paths[base].add(norm)
+        found_q.append((i, base, p))
+        crawl_wake.set()
+
+    async def list_jobs() -> AsyncIterator[tuple[int, str, str, Optional[PathNode]]]:
+        for i, base, p in jobs():
+            yield i, base, p, None
+
+    job_q: asyncio.Queue = asyncio.Queue(maxsize=n_workers * 2)
+    result_q: asyncio.Queue = asyncio.Queue(maxsize=n_workers * 2)
+
+    async def feeder() -> None:
+        cancelled = False
+        seq = 0
+
+        async def put(i: int, base: str, p: str, node: Optional[PathNode]) -> None:
+            nonlocal seq
+            await job_q.put(((i, seq), base, p, node))
+            seq += 1
+
+        async def put_found() -> None:
+            while found_q:
+                await put(*found_q.popleft(), None)
+
+        try:
+            async for i, base, p, node in tree_jobs() if tree else list_jobs():
+                if crawl is not None:
+                    await put_found()
+                    norm = _normalize_path(p)
+                    if norm in found_paths[base]:
+                        unprobed()
+                        if node is not None:
+                            walks[i].settle(node, absent=False)
+                            tree_wake.set()
+                        continue
+                    listed.add(norm)
+                await put(i, base, p, node)
+            # The wordlist is done; keep feeding what the crawlers still find.
+            while True:
+                crawl_wake.clear()
+                await put_found()
+                if all(task.done() for task in crawl_tasks) and not found_q:
+                    break
+                if not found_q:
+                    await crawl_wake.wait()
+        except asyncio.CancelledError:
+            # Workers are being cancelled too; nobody would drain the stop markers.
+            cancelled = True
+            raise
+        finally:
+            if not cancelled:
+                for _ in range(n_workers):
+                    await job_q.put(_DONE)
+
+    # With several targets, a job for a host with no free slot is parked
+    # instead of holding its worker, so a slow host cannot keep the workers
+    # from the other hosts; the host's parked jobs run as its own probes
+    # finish. Past MAX_PARKED_JOBS in all, workers wait for the slot instead.
+    parked: dict[str, deque] = {}
+    n_parked = 0
+    park_limit = MAX_PARKED_JOBS if len(bases) > 1 else 0
+
+    def unpark(base: str) -> tuple:
+        nonlocal n_parked
+        queue = parked[base]
+        job = queue.popleft()
+        if not queue:
+            del parked[base]
+        n_parked -= 1
+        if stats is not None:
+            stats.queued -= 1
+        return job
 
-    parsed = urlparse(base_url_norm)
-    host_key = parsed.netloc
-    per_host_sems[host_key] = asyncio.Semaphore(max(1, per_host_concurrency))
+    async def process(job: tuple) -> None:
+        key, base, p, node = job
+        res = None
+        try:
+            if not host_done(base):
+                res = await run_job(base, p)
+        finally:
+            if node is not None:
+                settle(key[0], node, res)
+        if res is None:
+            unprobed()
+        else:
+            if res.ok:
+                note_hit(base)
+            await result_q.put((key, res))
 
-    results: list[ScanResult] = []
+    async def worker() -> None:
+        nonlocal n_parked
+        while True:
+            job = await job_q.get()
+            if job is _DONE:
+                break
+            base = job[1]
+            if n_parked < park_limit and (base in parked or slot_for(base).locked()):
+                parked.setdefault(base, deque()).append(job)
+                n_parked += 1
+                if stats is not None:
+                    stats.queued += 1
+                if slot_for(base).locked():
+                    continue
+                job = unpark(base)
+            await process(job)
+            while base in parked and not slot_for(base).locked():
+                await process(unpark(base))
+        # No new jobs are coming: run what is still parked, waiting for slots.
+        while parked:
+            await process(unpark(next(iter(parked))))
+        await result_q.put(_DONE)
 
-    limiter = AsyncRateLimiter(rate_limit, rate_burst) if rate_limit else None
+    if crawl is not None:
+        for i, base in enumerate(bases):
+            crawler = SiteCrawler(
+                client, base, partial(found, i), budget=crawl, slot=partial(host_slot, base)
+            )
+            crawl_tasks.append(asyncio.create_task(crawler.run()))
+            crawl_tasks[-1].add_done_callback(lambda _: crawl_wake.set())
+    tasks = [asyncio.create_task(feeder())]
+    tasks.extend(asyncio.create_task(worker()) for _ in range(n_workers))
+    try:
+        remaining = n_workers
+        while remaining:
+            item = await result_q.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            yield item
+        await tasks[0]
+    finally:
+        pending = tasks + crawl_tasks
+        for host, task in list(baselines.items()):
+            # A session keeps finished baselines for its next scans.
+            if session is None or not task.done():
+                pending.append(task)
+                if session is not None:
+                    del baselines[host]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if session is None:
+            await client.aclose()
+
+
+async def iter_scan(
+    targets: Union[str, Iterable[str]],
+    paths: Iterable[str],
+    *,
+    extra_paths: Optional[Mapping[str, Iterable[str]]] = None,
+    skip: Optional[Callable[[str, str], bool]] = None,
+    concurrency: int = 100,
+    per_host_concurrency: int = 10,
+    rate_limit: Optional[float] = None,
+    rate_burst: int = 1,
+    timeout: float = 10.0,
+    verify_tls: bool = True,
+    follow_redirects: bool = True,
+    proxy: Optional[str] = None,
+    headers: Optional[Mapping[str, str]] = None,
+    cookies: Optional[Mapping[str, str]] = None,
+    rotate_user_agents: bool = False,
+    probe: str = "range",
+    calibrate: bool = False,
+    wildcard_policy: str = "flag",
+    adaptive: bool = False,
+    stats: Optional[ScanStats] = None,
+    metrics: Optional[ScanMetrics] = None,
+    http_version: str = "auto",
+    pool_size: Optional[int] = None,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    h2_max_streams: Optional[int] = None,
+    resolver: Optional[DnsCache] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    per_host_rate: Optional[float] = None,
+    rate_limiter: Optional[AsyncRateLimiter] = None,
+    rank: Optional[Callable[[str, str], float]] = None,
+    stop_after_hits: Optional[int] = None,
+    host_time_budget: Optional[float] = None,
+    tree: bool = False,
+    cached_absent: Optional[Callable[[str, str], bool]] = None,
+    crawl: Optional[CrawlBudget] = None,
+    session: Optional["ScanSession"] = None,
+) -> AsyncGenerator[ScanResult, None]:
+    """Yield scan results as they complete.
+
+    ``paths`` is consumed lazily, exactly once, by a fixed pool of workers
+    fed through bounded queues, so memory stays flat regardless of wordlist
+    size. ``targets`` may be a single URL or an iterable of them; jobs for a
+    host at its per-host limit are set aside (up to ``MAX_PARKED_JOBS``) so
+    that a slow host does not hold up the others.
+    ``skip(target, path)`` is consulted per job, with the normalized base URL
+    and ``/``-prefixed path, to leave out work that is already done.
+    A ready-made ``rate_limiter`` takes precedence over ``rate_limit`` and
+    ``per_host_rate``.
+
+    With ``rank(target, path)`` each target probes its paths highest score
+    first within each window of ``RANK_WINDOW`` entries, so the wordlist is
+    still streamed. A target stops getting new
+    probes after ``stop_after_hits`` hits or ``host_time_budget`` seconds
+    from its first probe.
+
+    With ``tree`` the wordlist is read into a prefix trie and scanned
+    parents-first: a directory with several entries under it is probed
+    first (as ``dir/``) and its subtree is dropped if the answer matches
+    the host's not-found baseline. ``rank`` then orders siblings. A
+    directory that ``skip`` leaves out is expanded unless
+    ``cached_absent(target, path)`` says a past scan found it missing.
 
-    client = AsyncHttpClient(
+    With a ``crawl`` budget each target is also crawled, on the scan's
+    client and within its per-host limit, and the admin-looking paths found
+    in its pages and scripts are probed while the wordlist scan runs.
+
+    With a ``session`` (``ScanSession``) the scan runs on the session's
+    client and shares its per-host state with other scans; the connection
+    options, rate limits, ``retry_policy``, ``metrics`` and ``resolver``
+    are then the session's, and those given here are ignored.
+    """
+    async for _, res in _iter_scan_indexed(
+        targets,
+        paths,
+        extra_paths=extra_paths,
+        skip=skip,
+        concurrency=concurrency,
+        per_host_concurrency=per_host_concurrency,
+        rate_limit=rate_limit,
+        rate_burst=rate_burst,
         timeout=timeout,
         verify_tls=verify_tls,
         follow_redirects=follow_redirects,
         proxy=proxy,
         headers=headers,
         cookies=cookies,
-        rate_limiter=limiter,
         rotate_user_agents=rotate_user_agents,
-    )
+        probe=probe,
+        calibrate=calibrate,
+        wildcard_policy=wildcard_policy,
+        adaptive=adaptive,
+        stats=stats,
+        metrics=metrics,
+        http_version=http_version,
+        pool_size=pool_size,
+        keepalive_expiry=keepalive_expiry,
+        h2_max_streams=h2_max_streams,
+        resolver=resolver,
+        retry_policy=retry_policy,
+        per_host_rate=per_host_rate,
+        rate_limiter=rate_limiter,
+        rank=rank,
+        stop_after_hits=stop_after_hits,
+        host_time_budget=host_time_budget,
+        tree=tree,
+        cached_absent=cached_absent,
+        crawl=crawl,
+        session=session,
+    ):
+        yield res
 
-    async def worker(p: str) -> None:
-        async with global_sem, per_host_sems[host_key]:
-            res = await _probe_path(client, base_url_norm, p)
-            results.append(res)
 
-    try:
-        await asyncio.gather(*(worker(p) for p in paths))
-    finally:
-        await client.aclose()
+async def scan_targets(
+    targets: Iterable[str],
+    paths: Iterable[str],
+    *,
+    extra_paths: Optional[Mapping[str, Iterable[str]]] = None,
+    skip: Optional[Callable[[str, str], bool]] = None,
+    concurrency: int = 100,
+    per_host_concurrency: int = 10,
+    rate_limit: Optional[float] = None,
+    rate_burst: int = 1,
+    timeout: float = 10.0,
+    verify_tls: bool = True,
+    follow_redirects: bool = True,
+    proxy: Optional[str] = None,
+    headers: Optional[Mapping[str, str]] = None,
+    cookies: Optional[Mapping[str, str]] = None,
+    rotate_user_agents: bool = False,
+    probe: str = "range",
+    calibrate: bool = False,
+    wildcard_policy: str = "flag",
+    adaptive: bool = False,
+    stats: Optional[ScanStats] = None,
+    metrics: Optional[ScanMetrics] = None,
+    http_version: str = "auto",
+    pool_size: Optional[int] = None,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    h2_max_streams: Optional[int] = None,
+    resolver: Optional[DnsCache] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    per_host_rate: Optional[float] = None,
+    rate_limiter: Optional[AsyncRateLimiter] = None,
+    rank: Optional[Callable[[str, str], float]] = None,
+    stop_after_hits: Optional[int] = None,
+    host_time_budget: Optional[float] = None,
+    tree: bool = False,
+    cached_absent: Optional[Callable[[str, str], bool]] = None,
+    crawl: Optional[CrawlBudget] = None,
+    session: Optional["ScanSession"] = None,
+) -> list[ScanResult]:
+    """Scan ``paths`` on every target using one client and one event loop.
+
+    Probes are interleaved across hosts so that a per-host cap on one target
+    never leaves the worker pool idle. ``extra_paths`` maps a target (as
+    given) to additional paths only probed on that target. Results are
+    returned grouped by target, in probe order.
+    """
+    indexed = [
+        item
+        async for item in _iter_scan_indexed(
+            targets,
+            paths,
+            extra_paths=extra_paths,
+            skip=skip,
+            concurrency=concurrency,
+            per_host_concurrency=per_host_concurrency,
+            rate_limit=rate_limit,
+            rate_burst=rate_burst,
+            timeout=timeout,
+            verify_tls=verify_tls,
+            follow_redirects=follow_redirects,
+            proxy=proxy,
+            headers=headers,
+            cookies=cookies,
+            rotate_user_agents=rotate_user_agents,
+            probe=probe,
+            calibrate=calibrate,
+            wildcard_policy=wildcard_policy,
+            adaptive=adaptive,
+            stats=stats,
+            metrics=metrics,
+            http_version=http_version,
+            pool_size=pool_size,
+            keepalive_expiry=keepalive_expiry,
+            h2_max_streams=h2_max_streams,
+            resolver=resolver,
+            retry_policy=retry_policy,
+            per_host_rate=per_host_rate,
+            rate_limiter=rate_limiter,
+            rank=rank,
+            stop_after_hits=stop_after_hits,
+            host_time_budget=host_time_budget,
+            tree=tree,
+            cached_absent=cached_absent,
+            crawl=crawl,
+            session=session,
+        )
+    ]
+    indexed.sort(key=lambda item: item[0])
+    return [res for _, res in indexed]
 
-    path_index = {path: i for i, path in enumerate(paths)}
-    return sorted(
-        results,
-        key=lambda r: path_index.get(r.path.lstrip("/"), path_index.get(r.path, 0)),
+
+async def scan_admin_paths(
+    base_url: str,
+    paths: Iterable[str],
+    *,
+    skip: Optional[Callable[[str, str], bool]] = None,
+    concurrency: int = 100,
+    per_host_concurrency: int = 10,
+    rate_limit: Optional[float] = None,
+    rate_burst: int = 1,
+    timeout: float = 10.0,
+    verify_tls: bool = True,
+    follow_redirects: bool = True,
+    proxy: Optional[str] = None,
+    headers: Optional[Mapping[str, str]] = None,
+    cookies: Optional[Mapping[str, str]] = None,
+    rotate_user_agents: bool = False,
+    probe: str = "range",
+    calibrate: bool = False,
+    wildcard_policy: str = "flag",
+    adaptive: bool = False,
+    stats: Optional[ScanStats] = None,
+    metrics: Optional[ScanMetrics] = None,
+    http_version: str = "auto",
+    pool_size: Optional[int] = None,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+    h2_max_streams: Optional[int] = None,
+    resolver: Optional[DnsCache] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    per_host_rate: Optional[float] = None,
+    rate_limiter: Optional[AsyncRateLimiter] = None,
+    rank: Optional[Callable[[str, str], float]] = None,
+    stop_after_hits: Optional[int] = None,
+    host_time_budget: Optional[float] = None,
+    tree: bool = False,
+    cached_absent: Optional[Callable[[str, str], bool]] = None,
+    crawl: Optional[CrawlBudget] = None,
+    session: Optional["ScanSession"] = None,
+) -> list[ScanResult]:
+    return await scan_targets(
+        [base_url],
+        paths,
+        skip=skip,
+        concurrency=concurrency,
+        per_host_concurrency=per_host_concurrency,
+        rate_limit=rate_limit,
+        rate_burst=rate_burst,
+        timeout=timeout,
+        verify_tls=verify_tls,
+        follow_redirects=follow_redirects,
+        proxy=proxy,
+        headers=headers,
+        cookies=cookies,
+        rotate_user_agents=rotate_user_agents,
+        probe=probe,
+        calibrate=calibrate,
+        wildcard_policy=wildcard_policy,
+        adaptive=adaptive,
+        stats=stats,
+        metrics=metrics,
+        http_version=http_version,
+        pool_size=pool_size,
+        keepalive_expiry=keepalive_expiry,
+        h2_max_streams=h2_max_streams,
+        resolver=resolver,
+        retry_policy=retry_policy,
+        per_host_rate=per_host_rate,
+        rate_limiter=rate_limiter,
+        rank=rank,
+        stop_after_hits=stop_after_hits,
+        host_time_budget=host_time_budget,
+        tree=tree,
+        cached_absent=cached_absent,
+        crawl=crawl,
+        session=session,
     )
@@ -0,0 +1,123 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncGenerator, Iterable, Mapping
+from typing import Any, Optional, Union
+from urllib.parse import urlparse
+
+from .adaptive import AdaptiveLimiter
+from .http import DEFAULT_KEEPALIVE_EXPIRY, AsyncHttpClient
+from .metrics import ScanMetrics
+from .rate_limit import AsyncRateLimiter
+from .resolver import DnsCache
+from .retry import RetryPolicy
+from .scanner import ScanResult, _normalize_base_url, iter_scan
+
+
+class ScanSession:
+    """A client, rate limiter and per-host state shared by many scans.
+
+    Discovery (pass ``session.client`` to the ``discovery`` functions) and
+    every ``scan`` run on the same connection pools, so each target's TCP
+    and TLS handshakes and HTTP/2 setup happen once per session rather than
+    once per step. What scans learn about a host carries over to the next:
+    its calibration baseline, whether it answers HEAD, its adaptive
+    concurrency, and the per-host limits, which also hold across scans
+    running at the same time. Idle connections are kept for
+    ``keepalive_expiry`` seconds; raise it for long-running processes
+    that scan the same hosts again.
+
+    Use it from one event loop, as ``async with ScanSession(...) as s``,
+    or call ``aclose`` when done.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: float = 10.0,
+        verify_tls: bool = True,
+        follow_redirects: bool = True,
+        proxy: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        cookies: Optional[Mapping[str, str]] = None,
+        rotate_user_agents: bool = False,
+        rate_limit: Optional[float] = None,
+        rate_burst: int = 1,
+        per_host_rate: Optional[float] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        metrics: Optional[ScanMetrics] = None,
+        http_version: str = "auto",
+        pool_size: Optional[int] = None,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        h2_max_streams: Optional[int] = None,
+        resolver: Optional[DnsCache] = None,
+    ) -> None:
+        self.proxy = proxy
+        self.resolver = resolver
+        self.metrics = metrics
+        self.rate_limiter = rate_limiter or (
+            AsyncRateLimiter(rate_limit, rate_burst, per_host_rate=per_host_rate)
+            if rate_limit or per_host_rate
+            else None
+        )
+        self.client = AsyncHttpClient(
+            timeout=timeout,
+            verify_tls=verify_tls,
+            follow_redirects=follow_redirects,
+            proxy=proxy,
+            headers=headers,
+            cookies=cookies,
+            rate_limiter=self.rate_limiter,
+            rotate_user_agents=rotate_user_agents,
+            retry_policy=retry_policy,
+            metrics=metrics,
+            http_version=http_version,
+            pool_size=pool_size,
+            keepalive_expiry=keepalive_expiry,
+            h2_max_streams=h2_max_streams,
+            resolver=resolver,
+        )
+        # Per-host state, keyed by host:port; filled in by the scans.
+        self.per_host_sems: dict[str, asyncio.Semaphore] = {}
+        self.adaptive_limiters: dict[str, AdaptiveLimiter] = {}
+        self.head_blocked: set[str] = set()
+        self.baselines: dict[str, asyncio.Task] = {}
+        self.wildcard_hosts: set[str] = set()
+
+    async def __aenter__(self) -> "ScanSession":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
+
+    async def warm_up(self, targets: Union[str, Iterable[str]]) -> None:
+        """Resolve and connect to ``targets`` ahead of the first scan.
+
+        One HEAD per target opens its connection (and negotiates the
+        protocol), concurrently; failures are left for the scan to report.
+        """
+        if isinstance(targets, str):
+            targets = [targets]
+        bases = list(dict.fromkeys(_normalize_base_url(t) for t in targets))
+        if self.resolver is not None and self.proxy is None:
+            await self.resolver.prefetch(urlparse(b).hostname or "" for b in bases)
+
+        async def connect(base: str) -> None:
+            with contextlib.suppress(Exception):
+                await self.client.head(base + "/", follow_redirects=False)
+
+        await asyncio.gather(*(connect(b) for b in bases))
+
+    async def scan(
+        self, targets: Union[str, Iterable[str]], paths: Iterable[str], **options: Any
+    ) -> AsyncGenerator[ScanResult, None]:
+        """``iter_scan`` on this session; ``options`` are its scan options."""
+        async for res in iter_scan(targets, paths, session=self, **options):
+            yield res
+
+    async def aclose(self) -> None:
+        for task in self.baselines.values():
+            task.cancel()
+        await asyncio.gather(*self.baselines.values(), return_exceptions=True)
+        self.baselines.clear()
+        await self.client.aclose()
@@ -0,0 +1,206 @@
+import asyncio
+import itertools
+import math
+import multiprocessing
+import os
+import queue
+import signal
+import tempfile
+import time
+from collections.abc import AsyncGenerator, Iterable, Mapping
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from .metrics import ScanMetrics
+from .rate_limit import AsyncRateLimiter, SharedTokenBucket
+from .scanner import ScanResult, _host_key, _normalize_base_url, iter_scan
+from .stats import ScanStats
+from .wordlist import iter_wordlist
+
+# Results travel to the parent in batches, flushed when full or this old.
+SHARD_BATCH = 64
+FLUSH_INTERVAL = 0.1
+POLL_INTERVAL = 0.2
+
+
+def _write_paths(paths: Iterable[str], path: Path) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        for p in paths:
+            f.write(p.strip() + "\n")
+
+
+def _shard_worker(
+    shard: int,
+    workers: int,
+    by_path: bool,
+    targets: list[str],
+    paths_file: Path,
+    extra_paths: dict[str, list[str]],
+    options: dict[str, Any],
+    out_q: Any,
+) -> None:
+    # Ctrl-C reaches the whole process group; the parent decides what stops.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    paths: Iterable[str] = iter_wordlist(paths_file)
+    if by_path:
+        paths = itertools.islice(paths, shard, None, workers)
+    metrics = ScanMetrics()
+    stats = ScanStats()
+
+    async def run() -> None:
+        batch: list[ScanResult] = []
+        flushed = time.monotonic()
+        sent_unprobed = 0
+
+        def flush() -> None:
+            nonlocal batch, flushed, sent_unprobed
+            unprobed = stats.unprobed
+            out_q.put(("results", batch, unprobed - sent_unprobed))
+            batch = []
+            flushed = time.monotonic()
+            sent_unprobed = unprobed
+
+        async for res in iter_scan(
+            targets, paths, extra_paths=extra_paths, metrics=metrics, stats=stats, **options
+        ):
+            batch.append(res)
+            if len(batch) >= SHARD_BATCH or time.monotonic() - flushed >= FLUSH_INTERVAL:
+                flush()
+        if batch or stats.unprobed > sent_unprobed:
+            flush()
+
+    try:
+        asyncio.run(run())
+    except BaseException as exc:
+        out_q.put(("error", shard, f"{type(exc).__name__}: {exc}"))
+    else:
+        out_q.put(("done", shard, metrics))
+
+
+async def iter_scan_sharded(
+    targets: Union[str, Iterable[str]],
+    paths: Iterable[str],
+    *,
+    workers: int,
+    extra_paths: Optional[Mapping[str, Iterable[str]]] = None,
+    concurrency: int = 100,
+    per_host_concurrency: int = 10,
+    rate_limit: Optional[float] = None,
+    rate_burst: int = 1,
+    per_host_rate: Optional[float] = None,
+    stats: Optional[ScanStats] = None,
+    metrics: Optional[ScanMetrics] = None,
+    **options: Any,
+) -> AsyncGenerator[ScanResult, None]:
+    """Run ``iter_scan`` in ``workers`` processes and yield their results.
+
+    With at least as many targets as workers each process scans a share of
+    the targets; otherwise every process scans all targets with every
+    ``workers``-th path, and per-host concurrency is split between them.
+    ``concurrency`` is split either way, and the rate limits are token
+    buckets in shared memory, so the totals hold across processes.
+
+    ``stats`` and ``metrics`` are kept in this process from what the
+    workers send back. ``options`` go to ``iter_scan`` in each worker and
+    must be picklable, including ``skip``; a ``session`` cannot be passed.
+    """
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+    if options.get("session") is not None:
+        raise ValueError("a ScanSession cannot be shared with worker processes")
+    if isinstance(targets, str):
+        targets = [targets]
+    bases = list(dict.fromkeys(_normalize_base_url(t) for t in targets))
+    if not bases:
+        return
+    extras = {_normalize_base_url(t): list(ps) for t, ps in (extra_paths or {}).items()}
+    by_path = len(bases) < workers
+
+    ctx = multiprocessing.get_context("spawn")
+    if rate_limit or per_host_rate:
+        options["rate_limiter"] = AsyncRateLimiter(
+            rate_limit,
+            rate_burst,
+            per_host_rate=per_host_rate,
+            bucket=SharedTokenBucket(rate_limit, rate_burst, ctx=ctx) if rate_limit else None,
+            host_buckets=(
+                {_host_key(b): SharedTokenBucket(per_host_rate, ctx=ctx) for b in bases}
+                if per_host_rate
+                else None
+            ),
+        )
+    options["concurrency"] = math.ceil(concurrency / workers)
+    options["per_host_concurrency"] = (
+        math.ceil(per_host_concurrency / workers) if by_path else per_host_concurrency
+    )
+
+    fd, name = tempfile.mkstemp(prefix="apf-paths-", suffix=".txt")
+    os.close(fd)
+    paths_file = Path(name)
+    out_q = ctx.Queue()
+    procs: list[Any] = []
+    try:
+        await asyncio.to_thread(_write_paths, paths, paths_file)
+        for shard in range(workers):
+            shard_options = options
+            if by_path:
+                shard_targets = bases
+                shard_extras = {t: ps[shard::workers] for t, ps in extras.items()}
+                if shard and options.get("crawl") is not None:
+                    # Every shard scans every target; one crawl of each is enough.
+                    shard_options = {**options, "crawl": None}
+            else:
+                shard_targets = bases[shard::workers]
+                shard_extras = {t: extras[t] for t in shard_targets if t in extras}
+            proc = ctx.Process(
+                target=_shard_worker,
+                args=(
+                    shard,
+                    workers,
+                    by_path,
+                    shard_targets,
+                    paths_file,
+                    shard_extras,
+                    shard_options,
+                    out_q,
+                ),
+                daemon=True,
+            )
+            proc.start()
+            procs.append(proc)
+
+        running = set(range(workers))
+        while running:
+            try:
+                msg = await asyncio.to_thread(out_q.get, True, POLL_INTERVAL)
+            except queue.Empty:
+                # A worker that exits cleanly has flushed its messages first.
+                for shard in running:
+                    code = procs[shard].exitcode
+                    if code not in (None, 0):
+                        raise RuntimeError(f"scan worker {shard} exited with code {code}") from None
+                continue
+            if msg[0] == "results":
+                if stats is not None:
+                    # Skipped and pruned jobs arrive as one count, for progress totals.
+                    stats.skipped += msg[2]
+                for res in msg[1]:
+                    if stats is not None:
+                        stats.record(
+                            _host_key(res.target), res.status, res.elapsed_ms / 1000, res.retries
+                        )
+                    yield res
+            elif msg[0] == "done":
+                running.discard(msg[1])
+                if metrics is not None:
+                    metrics.merge(msg[2])
+            else:
+                raise RuntimeError(f"scan worker {msg[1]} failed: {msg[2]}")
+    finally:
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+        for proc in procs:
+            proc.join()
+        out_q.close()
+        paths_file.unlink(missing_ok=True)
@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+import sys
+import textwrap
+import time
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import IO, Union
+
+from .scanner import ScanResult
+
+STDOUT = "-"
+
+FIELDNAMES = [f.name for f in fields(ScanResult)]
+
+
+class StreamSink:
+    """Writes results as they arrive, buffering ``batch_size`` rows or
+    ``flush_interval`` seconds per write. ``-`` as the path means stdout.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.to_stdout = str(path) == STDOUT
+        self._fh: IO[str] = (
+            sys.stdout if self.to_stdout else Path(path).open("w", newline="", encoding="utf-8")  # noqa: SIM115
+        )
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.count = 0
+        self._buffer: list[str] = []
+        self._last_flush = time.monotonic()
+        self._write_raw(self.header())
+
+    def header(self) -> str:
+        return ""
+
+    def footer(self) -> str:
+        return ""
+
+    def format(self, result: ScanResult) -> str:
+        raise NotImplementedError
+
+    def _write_raw(self, text: str) -> None:
+        if text:
+            self._fh.write(text)
+
+    def write(self, result: ScanResult) -> None:
+        self._buffer.append(self.format(result))
+        self.count += 1
+        now = time.monotonic()
+        if len(self._buffer) >= self.batch_size or now - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._fh.write("".join(self._buffer))
+            self._buffer.clear()
+        self._fh.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        self.flush()
+        self._write_raw(self.footer())
+        self._fh.flush()
+        if not self.to_stdout:
+            self._fh.close()
+
+
+class NdjsonSink(StreamSink):
+    def format(self, result: ScanResult) -> str:
+        return json.dumps(asdict(result), ensure_ascii=False) + "\n"
+
+
+class CsvSink(StreamSink):
+    def header(self) -> str:
+        return ",".join(FIELDNAMES) + "\r\n"
+
+    def format(self, result: ScanResult) -> str:
+        buf = io.StringIO()
+        csv.DictWriter(buf, fieldnames=FIELDNAMES).writerow(asdict(result))
+        return buf.getvalue()
+
+
+class JsonArraySink(StreamSink):
+    """A JSON array written element by element; valid once closed."""
+
+    def header(self) -> str:
+        return "["
+
+    def format(self, result: ScanResult) -> str:
+        item = textwrap.indent(json.dumps(asdict(result), indent=2), "  ")
+        return ("\n" if self.count == 0 else ",\n") + item
+
+    def footer(self) -> str:
+        return "\n]\n" if self.count else "]\n"
+
+
+SINKS: dict[str, type[StreamSink]] = {
+    "json": JsonArraySink,
+    "ndjson": NdjsonSink,
+    "csv": CsvSink,
+}
+
+
+def open_sink(
+    kind: str,
+    path: Union[str, Path],
+    *,
+    batch_size: int = 100,
+    flush_interval: float = 1.0,
+) -> StreamSink:
+    try:
+        sink_cls = SINKS[kind]
+    except KeyError:
+        raise ValueError(f"unknown sink {kind!r}; expected one of {', '.join(SINKS)}") from None
+    return sink_cls(path, batch_size=batch_size, flush_interval=flush_interval)
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import zlib
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Optional
+from urllib.parse import urljoin, urlparse
+from xml.etree import ElementTree
+
+from .http import AsyncHttpClient
+
+logger = logging.getLogger(__name__)
+
+# Index -> child index -> urlset is as deep as real sites go.
+SITEMAP_MAX_DEPTH = 2
+SITEMAP_MAX_FILES = 50
+# The sitemap protocol's own cap on an uncompressed file.
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024
+SITEMAP_CONCURRENCY = 4
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _same_site(host: str, base_host: str) -> bool:
+    """``host`` is ``base_host``, a subdomain of it, or its parent domain (www.).
+
+    The parent is only the domain one label up, and never a bare TLD, so a
+    sitemap on ``www.example.co.uk`` cannot pull in ``co.uk`` or ``uk``.
+    """
+    if host == base_host or host.endswith("." + base_host):
+        return True
+    parent = base_host.partition(".")[2]
+    return host == parent and "." in parent
+
+
+class _SitemapTarget:
+    """Parser target that keeps each entry's ``<loc>`` and builds no tree."""
+
+    def __init__(self) -> None:
+        self.locs: list[str] = []
+        self.is_index = False
+        self._text: Optional[list[str]] = None
+        self._loc = ""
+
+    def start(self, tag: str, attrib: dict) -> None:
+        if _local_name(tag) == "loc":
+            self._text = []
+
+    def data(self, text: str) -> None:
+        if self._text is not None:
+            self._text.append(text)
+
+    def end(self, tag: str) -> None:
+        name = _local_name(tag)
+        if name == "loc" and self._text is not None:
+            self._loc = "".join(self._text).strip()
+            self._text = None
+        elif name in ("url", "sitemap"):
+            self.is_index = name == "sitemap"
+            if self._loc:
+                self.locs.append(self._loc)
+            self._loc = ""
+
+    def close(self) -> None:
+        pass
+
+
+class SitemapParser:
+    """Incremental sitemap parser: feed body chunks, get ``<loc>`` values back.
+
+    Gzipped bodies are recognised by their magic bytes and inflated as they
+    arrive, whatever the URL or content type says. No element tree is
+    built, so memory does not grow with the sitemap. At most ``max_bytes``
+    of XML are read; ``done`` is set once that is reached.
+    """
+
+    def __init__(self, max_bytes: int = SITEMAP_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.done = False
+        self._target = _SitemapTarget()
+        self._xml = ElementTree.XMLParser(target=self._target)
+        self._head: Optional[bytes] = b""
+        self._gunzip: Optional[zlib._Decompress] = None
+
+    @property
+    def is_index(self) -> bool:
+        """True for a sitemap index, whose locations are other sitemaps."""
+        return self._target.is_index
+
+    def feed(self, chunk: bytes) -> list[str]:
+        if self.done:
+            return []
+        if self._head is not None:
+            # Wait for enough bytes to tell gzip from XML.
+            self._head += chunk
+            if len(self._head) < len(_GZIP_MAGIC):
+                return []
+            chunk, self._head = self._head, None
+            if chunk.startswith(_GZIP_MAGIC):
+                self._gunzip = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        remaining = self.max_bytes - self.size
+        if remaining <= 0:
+            # zlib reads a max_length of 0 as "no limit".
+            self.done = True
+            return []
+        if self._gunzip is not None:
+            chunk = self._gunzip.decompress(chunk, remaining)
+            if self._gunzip.unconsumed_tail:
+                self.done = True
+        elif len(chunk) >= remaining:
+            chunk = chunk[:remaining]
+            self.done = True
+        self.size += len(chunk)
+        self._xml.feed(chunk)
+        locs, self._target.locs = self._target.locs, []
+        return locs
+
+
+class SitemapCrawler:
+    """Fetch a site's sitemaps concurrently and collect matching page paths.
+
+    Sitemap indexes are followed ``max_depth`` levels deep, up to
+    ``max_files`` sitemaps in all, and only to hosts of the same site.
+    Bodies are streamed through ``SitemapParser``, so neither a 50k-URL
+    sitemap nor its gzipped form is ever held in memory. Paths for which
+    ``keep(path)`` is true are returned in discovery order, deduplicated.
+    """
+
+    def __init__(
+        self,
+        client: AsyncHttpClient,
+        base_url: str,
+        keep: Callable[[str], bool],
+        *,
+        max_depth: int = SITEMAP_MAX_DEPTH,
+        max_files: int = SITEMAP_MAX_FILES,
+        max_bytes: int = SITEMAP_MAX_BYTES,
+        concurrency: int = SITEMAP_CONCURRENCY,
+    ) -> None:
+        self.client = client
+        self.base_url = base_url
+        self.keep = keep
+        self.max_depth = max_depth
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self._host = (urlparse(base_url).hostname or "").lower()
+        self._sem = asyncio.Semaphore(max(1, concurrency))
+        self._seen: set[str] = set()
+        self._tasks: list[asyncio.Future] = []
+        self.paths: dict[str, None] = {}
+
+    def add(self, url: str, depth: int = 0) -> None:
+        """Queue a sitemap URL; duplicates and URLs past the caps are ignored."""
+        url = urljoin(self.base_url + "/", url.strip())
+        if url in self._seen or depth > self.max_depth or len(self._seen) >= self.max_files:
+            return
+        host = (urlparse(url).hostname or "").lower()
+        if not _same_site(host, self._host):
+            logger.debug("Not following sitemap on another site: %s", url)
+            return
+        self._seen.add(url)
+        self._tasks.append(asyncio.ensure_future(self._fetch(url, depth)))
+
+    def add_later(self, urls: Awaitable[Iterable[str]]) -> None:
+        """Queue sitemap URLs that are still being found (``robots.txt``)."""
+
+        async def wait() -> None:
+            for url in await urls:
+                self.add(url)
+
+        self._tasks.append(asyncio.ensure_future(wait()))
+
+    async def _fetch(self, url: str, depth: int) -> None:
+        async with self._sem:
+            parser = SitemapParser(self.max_bytes)
+            try:
+                async with self.client.stream(url) as resp:
+                    if resp.status_code != 200:
+                        return
+                    async for chunk in resp.aiter_bytes():
+                        for loc in parser.feed(chunk):
+                            if parser.is_index:
+                                self.add(urljoin(url, loc), depth + 1)
+                                continue
+                            path = urlparse(loc).path
+                            if path and self.keep(path):
+                                self.paths.setdefault(path)
+                        if parser.done:
+                            logger.debug("Sitemap %s cut off at %d bytes", url, parser.size)
+                            break
+            except ElementTree.ParseError as exc:
+                logger.debug("Sitemap %s is not valid XML past %d bytes: %s", url, parser.size, exc)
+            except Exception as exc:
+                logger.debug("Could not fetch sitemap %s: %s", url, exc)
+
+    async def run(self) -> list[str]:
+        try:
+            while self._tasks:
+                tasks, self._tasks = self._tasks, []
+                await asyncio.gather(*tasks)
+        finally:
+            for task in self._tasks:
+                task.cancel()
+        return list(self.paths)
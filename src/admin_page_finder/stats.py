@@ -0,0 +1,106 @@
+import math
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+RATE_WINDOW = 5
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram: O(1) inserts, percentiles within ~5%."""
+
+    GROWTH = 1.1
+
+    def __init__(self) -> None:
+        self._buckets: Counter[int] = Counter()
+        self.count = 0
+
+    def _index(self, seconds: float) -> int:
+        ms = max(seconds * 1000.0, 0.0)
+        return int(math.log(ms + 1.0, self.GROWTH))
+
+    def record(self, seconds: float) -> None:
+        self._buckets[self._index(seconds)] += 1
+        self.count += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Approximate ``q``-th percentile (0-100) in seconds, or None if empty."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * q / 100.0))
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                # Upper edge of the bucket, back in seconds.
+                return (self.GROWTH ** (index + 1) - 1.0) / 1000.0
+        return None
+
+    def buckets(self) -> dict[float, int]:
+        """Counts keyed by each bucket's upper bound in seconds."""
+        return {
+            (self.GROWTH ** (i + 1) - 1.0) / 1000.0: n for i, n in sorted(self._buckets.items())
+        }
+
+
+@dataclass
+class ScanStats:
+    """Counters a running scan keeps up to date.
+
+    Pass an instance to the scan functions to observe a scan while it runs
+    or to inspect it afterwards. Updates are O(1) per completed probe so
+    rendering them never competes with the scan itself.
+    """
+
+    started: float = field(default_factory=time.monotonic)
+    completed: int = 0
+    inflight: int = 0
+    queued: int = 0
+    status_counts: Counter = field(default_factory=Counter)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    host_errors: dict[str, int] = field(default_factory=dict)
+    host_concurrency: dict[str, int] = field(default_factory=dict)
+    host_retries: dict[str, int] = field(default_factory=dict)
+    # Paths left unprobed because their parent directory was absent.
+    host_pruned: dict[str, int] = field(default_factory=dict)
+    # Other jobs settled without a probe: left out by ``skip``, already
+    # probed another way, or for a host that was stopped or skipped.
+    skipped: int = 0
+    # (whole second, completions in it) for the recent-throughput window.
+    _per_second: deque = field(default_factory=lambda: deque(maxlen=RATE_WINDOW + 1))
+
+    def record(self, host: str, status: int, seconds: float, retries: int = 0) -> None:
+        now = int(time.monotonic())
+        if self._per_second and self._per_second[-1][0] == now:
+            self._per_second[-1][1] += 1
+        else:
+            self._per_second.append([now, 1])
+        self.completed += 1
+        self.status_counts[status] += 1
+        self.latency.record(seconds)
+        if status == 0:
+            self.host_errors[host] = self.host_errors.get(host, 0) + 1
+        if retries:
+            self.host_retries[host] = self.host_retries.get(host, 0) + retries
+
+    @property
+    def errors(self) -> int:
+        return sum(self.host_errors.values())
+
+    @property
+    def retries(self) -> int:
+        return sum(self.host_retries.values())
+
+    @property
+    def unprobed(self) -> int:
+        """Jobs settled without a probe, pruned ones included."""
+        return self.skipped + sum(self.host_pruned.values())
+
+    def rate(self) -> float:
+        """Completions per second over the last few seconds."""
+        now = time.monotonic()
+        cutoff = int(now) - RATE_WINDOW
+        recent = sum(n for sec, n in list(self._per_second) if sec >= cutoff)
+        span = min(float(RATE_WINDOW), now - self.started)
+        return recent / span if span > 0 else 0.0
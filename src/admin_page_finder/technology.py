@@ -0,0 +1,224 @@
+import re
+from collections import Counter
+from collections.abc import Collection, Mapping
+from dataclasses import dataclass, field
+from html import unescape
+from pathlib import Path, PurePosixPath
+from typing import Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from .wordlist_index import WordlistIndex
+
+# Stacks the detector can report. Wordlist entries tagged with one of these
+# (by the index, or by file extension) are ranked up on hosts running it.
+STACK_TAGS = frozenset({"php", "java", "node", "python", "aspnet", "coldfusion"})
+# Entries with these tags are probed on every host, whatever their extension.
+GENERIC_TAGS = frozenset({"core"})
+
+_HEADER_RULES = [
+    ("php", re.compile(r"\bphp\b", re.I)),
+    (
+        "java",
+        re.compile(
+            r"tomcat|coyote|jetty|jboss|wildfly|glassfish|servlet|jsp|weblogic|websphere", re.I
+        ),
+    ),
+    ("node", re.compile(r"express|next\.js|nuxt|\bkoa\b|\bnode", re.I)),
+    (
+        "python",
+        re.compile(
+            r"python|gunicorn|uvicorn|hypercorn|werkzeug|django|flask|tornado|cherrypy|wsgi", re.I
+        ),
+    ),
+    ("aspnet", re.compile(r"asp\.net|microsoft-iis", re.I)),
+    ("coldfusion", re.compile(r"coldfusion|lucee", re.I)),
+]
+_STACK_HEADERS = ("server", "x-powered-by", "x-generator", "x-runtime")
+_MARKER_HEADERS = {
+    "x-aspnet-version": "aspnet",
+    "x-aspnetmvc-version": "aspnet",
+    "x-drupal-cache": "php",
+    "x-pingback": "php",
+}
+
+_COOKIE_RULES = [
+    (
+        "php",
+        re.compile(r"^(phpsessid|laravel_session|ci_session|wordpress_|wp-settings|joomla)", re.I),
+    ),
+    ("java", re.compile(r"^(jsessionid|jspsessionid)$", re.I)),
+    ("node", re.compile(r"^(connect\.sid|express:sess|koa[.:]sess)", re.I)),
+    ("python", re.compile(r"^(csrftoken|django_language)$", re.I)),
+    ("aspnet", re.compile(r"^(asp\.net_sessionid|\.aspxauth|aspsessionid)", re.I)),
+    ("coldfusion", re.compile(r"^(cfid|cftoken)$", re.I)),
+]
+
+_GENERATOR_RULES = [
+    (
+        "php",
+        re.compile(r"wordpress|joomla|drupal|typo3|magento|prestashop|mediawiki|phpbb|craft", re.I),
+    ),
+    ("java", re.compile(r"liferay|adobe experience manager|magnolia|hippo|confluence", re.I)),
+    ("node", re.compile(r"ghost|next\.js|nuxt", re.I)),
+    ("python", re.compile(r"django|plone|wagtail", re.I)),
+    ("aspnet", re.compile(r"dotnetnuke|umbraco|sitefinity|orchard", re.I)),
+]
+
+# Path extensions that only make sense on one stack.
+EXTENSION_STACKS = {
+    ".php": "php",
+    ".phtml": "php",
+    ".jsp": "java",
+    ".jspx": "java",
+    ".do": "java",
+    ".action": "java",
+    ".jsf": "java",
+    ".faces": "java",
+    ".asp": "aspnet",
+    ".aspx": "aspnet",
+    ".ashx": "aspnet",
+    ".asmx": "aspnet",
+    ".axd": "aspnet",
+    ".cfm": "coldfusion",
+    ".cfc": "coldfusion",
+}
+
+_ASSET_PREFIXES = [
+    ("php", ("/wp-content/", "/wp-includes/", "/sites/default/files/", "/media/jui/")),
+    ("node", ("/_next/", "/_nuxt/", "/__nuxt/")),
+    ("python", ("/static/admin/", "/__debug__/")),
+    ("java", ("/javax.faces.resource/",)),
+]
+_BODY_MARKERS = [
+    ("aspnet", re.compile(r'name="__VIEWSTATE"', re.I)),
+    ("python", re.compile(r'name="csrfmiddlewaretoken"', re.I)),
+]
+
+_GENERATOR_RE = re.compile(
+    r"<meta\s+[^>]*name=[\"']generator[\"'][^>]*content=[\"']([^\"']+)", re.I
+)
+_ASSET_RE = re.compile(r"(?:href|src|action)=[\"']([^\"'#?]+)", re.I)
+
+
+@dataclass
+class TechProfile:
+    """Stacks inferred for one host and the evidence for each."""
+
+    stacks: set[str] = field(default_factory=set)
+    evidence: list[str] = field(default_factory=list)
+
+    def add(self, stack: str, why: str) -> None:
+        self.stacks.add(stack)
+        if why not in self.evidence:
+            self.evidence.append(why)
+
+
+def extension_stack(path: str) -> Optional[str]:
+    return EXTENSION_STACKS.get(PurePosixPath(path.split("?", 1)[0]).suffix.lower())
+
+
+def detect_technologies(response: httpx.Response) -> TechProfile:
+    """Infer the server stack from a page's headers, cookies and HTML.
+
+    Redirect hops are included, since session cookies are often set on
+    the redirect rather than the final page.
+    """
+    profile = TechProfile()
+    host = urlparse(str(response.url)).netloc
+    for resp in [*response.history, response]:
+        for name in _STACK_HEADERS:
+            value = resp.headers.get(name)
+            if not value:
+                continue
+            for stack, rule in _HEADER_RULES:
+                if rule.search(value):
+                    profile.add(stack, f"{name}: {value}")
+        for name, stack in _MARKER_HEADERS.items():
+            if name in resp.headers:
+                profile.add(stack, f"{name} header")
+        for cookie in resp.headers.get_list("set-cookie"):
+            cookie_name = cookie.split("=", 1)[0].strip()
+            for stack, rule in _COOKIE_RULES:
+                if rule.search(cookie_name):
+                    profile.add(stack, f"cookie {cookie_name}")
+
+    if "html" not in response.headers.get("content-type", "html"):
+        return profile
+    html = response.text
+    for m in _GENERATOR_RE.finditer(html):
+        generator = unescape(m.group(1)).strip()
+        for stack, rule in _GENERATOR_RULES:
+            if rule.search(generator):
+                profile.add(stack, f"generator {generator}")
+    for m in _ASSET_RE.finditer(html):
+        parsed = urlparse(unescape(m.group(1)).strip())
+        if parsed.netloc and parsed.netloc != host:
+            continue  # third-party assets say nothing about this host
+        path = parsed.path
+        ext_stack = extension_stack(path)
+        if ext_stack:
+            profile.add(ext_stack, f"{PurePosixPath(path).suffix} link")
+        for stack, prefixes in _ASSET_PREFIXES:
+            for prefix in prefixes:
+                if path.startswith(prefix):
+                    profile.add(stack, f"assets under {prefix}")
+    for stack, rule in _BODY_MARKERS:
+        if rule.search(html):
+            profile.add(stack, rule.pattern.split('"')[1] + " field")
+    return profile
+
+
+class StackFilter:
+    """``skip(target, path)`` predicate that drops paths meant for other stacks.
+
+    Only a stack-specific extension (``.aspx``, ``.cfm``, ...) is evidence
+    enough to skip: such a path is skipped on a host whose detected stacks
+    do not include it. Extensionless paths, paths listed in ``core``, and
+    hosts nothing was detected on are always probed, since reverse proxies
+    and mixed stacks hide what serves a given path. The
+    index tags from ``path_tags`` only inform ranking. Picklable (the index
+    reopens lazily), so it works with ``--workers``.
+    """
+
+    def __init__(self, stacks: Mapping[str, Collection[str]], index: Optional[Path] = None) -> None:
+        self.stacks = {target: frozenset(s) for target, s in stacks.items() if s}
+        self.index_path = index
+        self.pruned: Counter[str] = Counter()
+        self._index: Optional[WordlistIndex] = None
+
+    def __getstate__(self) -> dict:
+        return {"stacks": self.stacks, "index_path": self.index_path, "pruned": Counter()}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._index = None
+
+    def path_tags(self, path: str) -> set[str]:
+        tags = set()
+        stack = extension_stack(path)
+        if stack:
+            tags.add(stack)
+        if self.index_path is not None:
+            if self._index is None:
+                self._index = WordlistIndex(self.index_path)
+            pos = self._index.find(path)
+            if pos is not None:
+                tags.update(self._index.tags_of(pos))
+        return tags
+
+    def __call__(self, target: str, path: str) -> bool:
+        stacks = self.stacks.get(target)
+        if not stacks:
+            return False
+        stack = extension_stack(path)
+        if stack is None or stack in stacks or self.path_tags(path) & GENERIC_TAGS:
+            return False
+        self.pruned[target] += 1
+        return True
+
+    def close(self) -> None:
+        if self._index is not None:
+            self._index.close()
+            self._index = None
@@ -0,0 +1,120 @@
+import hashlib
+import mmap
+from array import array
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+
+def _is_entry(line: bytes) -> bool:
+    """A stripped line holds an entry: it is neither blank nor a comment."""
+    return bool(line) and not line.startswith(b"#")
+
+
+def iter_wordlist(path: Path) -> Iterator[str]:
+    """Yield entries from a wordlist file one at a time.
+
+    The file is memory-mapped and split line by line, so only the entry being
+    yielded is ever materialized as a Python string.
+    """
+    with path.open("rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return
+        with mm:
+            for raw in iter(mm.readline, b""):
+                line = raw.strip()
+                if _is_entry(line):
+                    yield line.decode("utf-8", errors="replace")
+
+
+def count_wordlist(path: Path) -> int:
+    """Count the entries ``iter_wordlist`` would yield, without decoding them."""
+    with path.open("rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return 0
+        with mm:
+            return sum(1 for raw in iter(mm.readline, b"") if _is_entry(raw.strip()))
+
+
+def _fingerprint(entry: str) -> int:
+    norm = entry.strip().lstrip("/")
+    return int.from_bytes(hashlib.blake2b(norm.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class FingerprintSet:
+    """Set of 64-bit fingerprints stored in one flat ``array('Q')``.
+
+    Open addressing with linear probing, kept at most 3/4 full, so each
+    entry costs 11-21 bytes instead of about 70 for a ``set[int]``. Slot
+    value 0 marks an empty slot; the fingerprint 0 is tracked on its own.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        size = 1 << max(3, (capacity * 4 // 3).bit_length())
+        self._table = array("Q", [0]) * size
+        self._mask = size - 1
+        self._len = 0
+        self._has_zero = False
+
+    def __len__(self) -> int:
+        return self._len + self._has_zero
+
+    def __contains__(self, fp: int) -> bool:
+        if fp == 0:
+            return self._has_zero
+        table, mask = self._table, self._mask
+        i = fp & mask
+        while True:
+            slot = table[i]
+            if slot == fp:
+                return True
+            if slot == 0:
+                return False
+            i = (i + 1) & mask
+
+    def add(self, fp: int) -> bool:
+        """Add ``fp``; False if it was already present."""
+        if fp == 0:
+            added, self._has_zero = not self._has_zero, True
+            return added
+        table, mask = self._table, self._mask
+        i = fp & mask
+        while True:
+            slot = table[i]
+            if slot == fp:
+                return False
+            if slot == 0:
+                break
+            i = (i + 1) & mask
+        table[i] = fp
+        self._len += 1
+        if self._len * 4 > len(table) * 3:
+            self._grow()
+        return True
+
+    def _grow(self) -> None:
+        old = self._table
+        size = len(old) * 2
+        self._table = table = array("Q", [0]) * size
+        self._mask = mask = size - 1
+        for fp in old:
+            if fp:
+                i = fp & mask
+                while table[i]:
+                    i = (i + 1) & mask
+                table[i] = fp
+
+
+def dedupe(entries: Iterable[str], capacity: int = 1024) -> Iterator[str]:
+    """Yield each path once, treating ``admin/`` and ``/admin/`` as equal.
+
+    Only a 64-bit fingerprint per entry is kept, in a ``FingerprintSet``;
+    ``capacity`` (the expected entry count) saves growing it along the way.
+    """
+    add = FingerprintSet(capacity).add
+    for entry in entries:
+        if add(_fingerprint(entry)):
+            yield entry
@@ -0,0 +1,227 @@
+import bisect
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Collection, Iterable, Iterator
+from pathlib import Path
+from typing import Literal, Optional
+
+from .wordlist import _fingerprint, iter_wordlist
+
+INDEX_MAGIC = b"APFWIDX\x00"
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".apfidx"
+MAX_TAGS = 64
+
+# magic, version, byte order ("<" or ">"), entry count, tag count, tag table bytes
+_HEADER = struct.Struct("<8sBcxxIII")
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def is_index(path: Path) -> bool:
+    """True if ``path`` is a compiled wordlist index."""
+    try:
+        with path.open("rb") as f:
+            return f.read(len(INDEX_MAGIC)) == INDEX_MAGIC
+    except OSError:
+        return False
+
+
+def compile_index(sources: Iterable[tuple[Path, Collection[str]]], output: Path) -> int:
+    """Compile wordlists into a deduplicated, tagged index at ``output``.
+
+    ``sources`` pairs each wordlist with the tags its entries get. Entries
+    are normalized (stripped, no leading ``/``) and deduplicated with the
+    same fingerprint as ``dedupe``; an entry found in several lists keeps
+    its first position and carries the tags of all of them. Returns the
+    number of entries written.
+
+    Layout after the header and tag table, each section 8-byte aligned:
+    entry fingerprints, tag masks and string offsets in entry order, then
+    the fingerprints sorted with their entry numbers for lookups, then the
+    UTF-8 strings.
+    """
+    tags: list[str] = []
+    positions: dict[int, int] = {}
+    fps = array("Q")
+    masks = array("Q")
+    offsets = array("I", [0])
+    blob = bytearray()
+    for path, source_tags in sources:
+        mask = 0
+        for tag in source_tags:
+            if tag not in tags:
+                if len(tags) == MAX_TAGS:
+                    raise ValueError(f"an index holds at most {MAX_TAGS} tags")
+                tags.append(tag)
+            mask |= 1 << tags.index(tag)
+        for entry in iter_wordlist(path):
+            norm = entry.strip().lstrip("/")
+            if not norm:
+                continue
+            fp = _fingerprint(norm)
+            pos = positions.get(fp)
+            if pos is not None:
+                masks[pos] |= mask
+                continue
+            positions[fp] = len(fps)
+            fps.append(fp)
+            masks.append(mask)
+            blob += norm.encode("utf-8")
+            offsets.append(len(blob))
+    order = array("I", sorted(range(len(fps)), key=fps.__getitem__))
+    sorted_fps = array("Q", (fps[i] for i in order))
+
+    tag_table = "\n".join(tags).encode("utf-8")
+    byteorder = b"<" if sys.byteorder == "little" else b">"
+    with output.open("wb") as f:
+        header = _HEADER.pack(
+            INDEX_MAGIC, INDEX_VERSION, byteorder, len(fps), len(tags), len(tag_table)
+        )
+        f.write(header + tag_table)
+        for section in (fps, masks, offsets, sorted_fps, order):
+            f.write(b"\x00" * (_align(f.tell()) - f.tell()))
+            section.tofile(f)
+        f.write(blob)
+    return len(fps)
+
+
+class WordlistIndex:
+    """Read-only view of a compiled index, memory-mapped.
+
+    Opening costs one ``mmap`` call; nothing is decoded until an entry is
+    yielded. Tag filters compare bit masks and set operations between
+    indexes compare fingerprints by binary search, so neither builds a
+    Python list of entries.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, byteorder, n, n_tags, tags_len = _HEADER.unpack_from(self._mm)
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                raise ValueError(f"{path} is not a version {INDEX_VERSION} wordlist index")
+            if byteorder != (b"<" if sys.byteorder == "little" else b">"):
+                raise ValueError(f"{path} was compiled on a machine with another byte order")
+            pos = _HEADER.size
+            self.tags = self._mm[pos : pos + tags_len].decode("utf-8").split("\n") if n_tags else []
+            pos += tags_len
+            self._views: list[memoryview] = []
+
+            def section(fmt: Literal["I", "Q"], count: int) -> memoryview:
+                nonlocal pos
+                pos = _align(pos)
+                size = count * struct.calcsize(fmt)
+                view = memoryview(self._mm)[pos : pos + size].cast(fmt)
+                self._views.append(view)
+                pos += size
+                return view
+
+            self._fps = section("Q", n)
+            self._masks = section("Q", n)
+            self._offsets = section("I", n + 1)
+            self._sorted_fps = section("Q", n)
+            self._order = section("I", n)
+            self._blob = memoryview(self._mm)[pos:]
+            self._views.append(self._blob)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        for view in getattr(self, "_views", []):
+            view.release()
+        self._views = []
+        self._mm.close()
+
+    def __enter__(self) -> "WordlistIndex":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._fps)
+
+    def entry(self, i: int) -> str:
+        return str(self._blob[self._offsets[i] : self._offsets[i + 1]], "utf-8")
+
+    def tags_of(self, i: int) -> list[str]:
+        mask = self._masks[i]
+        return [tag for bit, tag in enumerate(self.tags) if mask >> bit & 1]
+
+    def _mask(self, tags: Optional[Iterable[str]]) -> int:
+        mask = 0
+        for tag in tags or ():
+            if tag not in self.tags:
+                raise KeyError(f"unknown tag {tag!r}; index has: {', '.join(self.tags)}")
+            mask |= 1 << self.tags.index(tag)
+        return mask
+
+    def _find_fp(self, fp: int) -> Optional[int]:
+        i = bisect.bisect_left(self._sorted_fps, fp)
+        if i < len(self._sorted_fps) and self._sorted_fps[i] == fp:
+            return self._order[i]
+        return None
+
+    def _has_fp(self, fp: int) -> bool:
+        return self._find_fp(fp) is not None
+
+    def find(self, path: str) -> Optional[int]:
+        """Position of ``path`` in the index (leading ``/`` ignored), or None."""
+        return self._find_fp(_fingerprint(path))
+
+    def __contains__(self, path: object) -> bool:
+        return isinstance(path, str) and self.find(path) is not None
+
+    def _matches(
+        self, tags: Optional[Iterable[str]], exclude_tags: Optional[Iterable[str]]
+    ) -> Iterator[int]:
+        want, drop = self._mask(tags), self._mask(exclude_tags)
+        for i, mask in enumerate(self._masks):
+            if (not want or mask & want) and not mask & drop:
+                yield i
+
+    def select(
+        self,
+        tags: Optional[Iterable[str]] = None,
+        *,
+        exclude_tags: Optional[Iterable[str]] = None,
+        exclude: Optional["WordlistIndex"] = None,
+    ) -> Iterator[str]:
+        """Entries with any of ``tags`` (all if None), in index order.
+
+        Entries carrying one of ``exclude_tags`` or present in the
+        ``exclude`` index are left out.
+        """
+        for i in self._matches(tags, exclude_tags):
+            if exclude is None or not exclude._has_fp(self._fps[i]):
+                yield self.entry(i)
+
+    def count(
+        self, tags: Optional[Iterable[str]] = None, *, exclude_tags: Optional[Iterable[str]] = None
+    ) -> int:
+        if not tags and not exclude_tags:
+            return len(self)
+        return sum(1 for _ in self._matches(tags, exclude_tags))
+
+    def __iter__(self) -> Iterator[str]:
+        return self.select()
+
+    def union(self, other: "WordlistIndex") -> Iterator[str]:
+        yield from self
+        yield from other.select(exclude=self)
+
+    def intersection(self, other: "WordlistIndex") -> Iterator[str]:
+        for i, fp in enumerate(self._fps):
+            if other._has_fp(fp):
+                yield self.entry(i)
+
+    def difference(self, other: "WordlistIndex") -> Iterator[str]:
+        return self.select(exclude=other)
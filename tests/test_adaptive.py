@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from admin_page_finder.adaptive import AdaptiveLimiter
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_grows_then_backs_off():
+    limiter = AdaptiveLimiter(initial=2, maximum=32)
+    for _ in range(10):
+        await limiter.acquire()
+        limiter.release(latency=0.01)
+    grown = limiter.limit
+    assert grown > 2
+    await limiter.acquire()
+    limiter.release(latency=0.01, overloaded=True)
+    assert limiter.limit == max(1, grown // 2)
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limiter_caps_inflight():
+    limiter = AdaptiveLimiter(initial=2, maximum=2)
+    peak = 0
+
+    async def job():
+        nonlocal peak
+        await limiter.acquire()
+        peak = max(peak, limiter.inflight)
+        await asyncio.sleep(0.01)
+        limiter.release(latency=0.01)
+
+    await asyncio.gather(*(job() for _ in range(10)))
+    assert peak == 2
+    assert limiter.inflight == 0
@@ -0,0 +1,91 @@
+import asyncio
+import pickle
+import time
+
+import pytest
+
+from admin_page_finder.cache import CheckpointWriter, JsonlCache, SqliteCache, open_cache
+
+
+def test_sqlite_cache_membership_is_keyed_by_target_and_options(tmp_path):
+    db = tmp_path / "results.db"
+    cache = SqliteCache(db, options={"probe": "range"})
+    cache.add_many(
+        [
+            {"target": "http://a.example", "path": "/admin/", "status": 200},
+            {"target": "http://b.example", "path": "/login", "status": 404},
+        ]
+    )
+    assert cache.should_skip("http://a.example", "/admin/")
+    assert not cache.should_skip("http://b.example", "/admin/")
+    cache.close()
+
+    reopened = SqliteCache(db, options={"probe": "head"})
+    assert not reopened.should_skip("http://a.example", "/admin/")
+    assert len(reopened) == 2
+    reopened.close()
+
+
+def test_sqlite_cache_ttl_expiry(tmp_path):
+    cache = SqliteCache(tmp_path / "results.db", ttl=60)
+    cache.add_many([{"target": "http://a.example", "path": "/admin/"}])
+    cache._conn.execute("UPDATE results SET created = ?", (time.time() - 120,))
+    assert not cache.should_skip("http://a.example", "/admin/")
+    assert cache.expire() == 1
+    assert len(cache) == 0
+
+
+def test_sqlite_cache_pickles_to_a_new_connection(tmp_path):
+    cache = SqliteCache(tmp_path / "results.db", options={"probe": "range"})
+    cache.add_many([{"target": "http://a.example", "path": "/admin/"}])
+    copy = pickle.loads(pickle.dumps(cache.should_skip)).__self__
+    assert copy._conn is not cache._conn
+    assert copy.should_skip("http://a.example", "/admin/")
+    assert not copy.should_skip("http://a.example", "/login")
+    copy.close()
+    cache.close()
+
+
+def test_open_cache_picks_backend_by_suffix(tmp_path):
+    assert isinstance(open_cache(tmp_path / "c.jsonl"), JsonlCache)
+    assert isinstance(open_cache(tmp_path / "c.db"), SqliteCache)
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_writer_flushes_while_running(tmp_path):
+    cache = SqliteCache(tmp_path / "results.db")
+    async with CheckpointWriter(cache, batch_size=1000, flush_interval=0.05) as writer:
+        for i in range(3):
+            await writer.put({"target": "http://a.example", "path": f"/p{i}"})
+        await asyncio.sleep(0.2)
+        # Durable before the writer is closed: a killed scan keeps these rows.
+        assert len(cache) == 3
+        await writer.put({"target": "http://a.example", "path": "/last"})
+    assert len(cache) == 4 and writer.written == 4
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_writer_does_not_block_the_loop(tmp_path):
+    cache = SqliteCache(tmp_path / "results.db")
+    add_many = cache.add_many
+
+    def slow_add_many(results):
+        time.sleep(0.3)  # a slow disk
+        return add_many(results)
+
+    cache.add_many = slow_add_many
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    async with CheckpointWriter(cache, flush_interval=0.01) as writer:
+        await writer.put({"target": "http://a.example", "path": "/admin/"})
+        await asyncio.sleep(0.05)
+    ticker.cancel()
+    assert ticks >= 10 and cache.should_skip("http://a.example", "/admin/")
+    cache.close()
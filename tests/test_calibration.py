@@ -0,0 +1,45 @@
+import pytest
+import respx
+
+from admin_page_finder.calibration import calibrate_host
+from admin_page_finder.http import AsyncHttpClient
+from admin_page_finder.scanner import scan_admin_paths
+
+
+def _not_found_page(request):
+    return respx.MockResponse(200, text=f"<h1>Sorry, {request.url.path} was not found</h1>")
+
+
+@pytest.mark.asyncio
+async def test_calibrate_detects_wildcard_host():
+    base = "http://example.com"
+    with respx.mock(base_url=base) as router:
+        router.get(url__regex=r".*").mock(side_effect=_not_found_page)
+        client = AsyncHttpClient()
+        baseline = await calibrate_host(client, base)
+        await client.aclose()
+    assert baseline is not None and baseline.wildcard
+    assert len({fp.body_hash for fp in baseline.fingerprints}) == 1
+
+
+@pytest.mark.asyncio
+async def test_scan_flags_soft_404_but_keeps_real_hits():
+    base = "http://example.com"
+    with respx.mock(base_url=base) as router:
+        router.get("/admin/").respond(200, text="<form>Admin login</form>")
+        router.get(url__regex=r".*").mock(side_effect=_not_found_page)
+        res = await scan_admin_paths(base, ["admin/", "nothing-here"], calibrate=True)
+    by_path = {r.path: r for r in res}
+    assert by_path["/admin/"].ok and not by_path["/admin/"].soft_404
+    assert by_path["/nothing-here"].soft_404 and not by_path["/nothing-here"].ok
+
+
+@pytest.mark.asyncio
+async def test_scan_skips_wildcard_hosts():
+    base = "http://example.com"
+    with respx.mock(base_url=base) as router:
+        router.get(url__regex=r".*").mock(side_effect=_not_found_page)
+        res = await scan_admin_paths(
+            base, ["admin/", "login"], calibrate=True, wildcard_policy="skip"
+        )
+    assert res == []
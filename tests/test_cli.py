@@ -1,6 +1,8 @@
+import respx
 from typer.testing import CliRunner
 
 from admin_page_finder.cli import app
+from admin_page_finder.wordlist_index import WordlistIndex, compile_index
 
 
 def test_cli_help():
@@ -8,3 +10,43 @@ def test_cli_help():
     result = runner.invoke(app, ["--help"])
     assert result.exit_code == 0
     assert "async scanner" in result.stdout.lower()
+
+
+def test_tree_resume_reuses_cached_prunes(tmp_path):
+    wordlist = tmp_path / "words.txt"
+    wordlist.write_text(
+        "\n".join(["admin/"] + [f"backup/{i}" for i in range(5)] + ["old/a", "old/b"]),
+        encoding="utf-8",
+    )
+    args = ["scan", "http://example.com", "-w", str(wordlist), "--cache", str(tmp_path / "c.db")]
+    args += ["--tree", "--no-discover", "--no-fingerprint", "--no-crawl", "--no-dns-prefetch"]
+    runner = CliRunner()
+    with respx.mock(base_url="http://example.com") as router:
+        router.get("/admin/").respond(200, text="ok")
+        route = router.get(url__regex=r".*").respond(404)
+        assert runner.invoke(app, args).exit_code == 0
+        probed = [call.request.url.path for call in route.calls]
+        assert runner.invoke(app, args).exit_code == 0
+    # Three calibration probes, then backup/ and old/ prune their entries.
+    assert probed[3:] == ["/backup/", "/old/"]
+    assert route.call_count == len(probed)
+
+
+def test_scan_closes_the_wordlist_index(tmp_path, monkeypatch):
+    words = tmp_path / "words.txt"
+    words.write_text("admin/\nlogin\n", encoding="utf-8")
+    index = tmp_path / "words.apfidx"
+    compile_index([(words, ["mine"])], index)
+    closed = []
+    close = WordlistIndex.close
+
+    def record_close(self):
+        closed.append(self.path)
+        close(self)
+
+    monkeypatch.setattr(WordlistIndex, "close", record_close)
+    args = ["scan", "http://example.com", "-w", str(index), "--no-discover", "--no-fingerprint"]
+    with respx.mock(base_url="http://example.com") as router:
+        router.get(url__regex=r".*").respond(404)
+        assert CliRunner().invoke(app, args + ["--no-dns-prefetch"]).exit_code == 0
+    assert closed == [index]
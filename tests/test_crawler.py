@@ -0,0 +1,78 @@
+import pytest
+import respx
+
+from admin_page_finder.crawler import CrawlBudget, LinkExtractor, SiteCrawler, extract_js_routes
+from admin_page_finder.http import AsyncHttpClient
+from admin_page_finder.scanner import scan_admin_paths
+
+BUNDLE = (
+    'const routes=[{path:"admin",component:A},{path:"admin/users/:id",component:U},'
+    '{path:"about",component:B}];fetch("/api/dashboard/stats");load("/img/admin.png");'
+    'const cdn="//cdn.example.org/admin";'
+)
+
+
+def test_extract_js_routes():
+    assert sorted(set(extract_js_routes(BUNDLE))) == [
+        "/admin",
+        "/admin/users",
+        "/api/dashboard/stats",
+    ]
+
+
+def test_link_extractor_streams_chunks():
+    html = (
+        '<html><head><script src="/static/app.js"></script></head><body>'
+        '<a href="/account">Admin area</a><a href="/wp-login.php">x</a>'
+        '<a href="https://other.org/admin">elsewhere</a>'
+        '<script>router.push("/panel/login")</script></body></html>'
+    )
+    parser = LinkExtractor("http://example.com/")
+    for i in range(0, len(html), 7):
+        parser.feed(html[i : i + 7])
+    pages, scripts, hints = parser.take()
+    assert scripts == ["http://example.com/static/app.js"]
+    assert "https://other.org/admin" in pages
+    assert hints == ["/account", "/wp-login.php", "/panel/login"]
+
+
+@pytest.mark.asyncio
+async def test_site_crawler_follows_scripts_within_budget():
+    base = "http://example.com"
+    with respx.mock(base_url=base, assert_all_called=False) as router:
+        router.get("/").respond(
+            200,
+            html='<script src="/app.js"></script><a href="/p1">1</a><a href="/p2">2</a>',
+        )
+        router.get("/app.js").respond(
+            200, text=BUNDLE, headers={"Content-Type": "application/javascript"}
+        )
+        router.get("/p1").respond(200, html='<a href="/p3">3</a>')
+        p2 = router.get("/p2").respond(200, html="")
+        found: list[str] = []
+        client = AsyncHttpClient()
+        crawler = SiteCrawler(client, base, found.append, budget=CrawlBudget(max_pages=3))
+        await crawler.run()
+        await client.aclose()
+    assert set(found) == {"/admin", "/admin/users", "/api/dashboard/stats"}
+    assert crawler.fetched == 3 and not p2.called
+
+
+@pytest.mark.asyncio
+async def test_scan_probes_crawled_routes():
+    base = "http://example.com"
+    with respx.mock(base_url=base, assert_all_called=False) as router:
+        router.get("/").respond(200, html='<script src="/app.js"></script>')
+        router.get("/app.js").respond(
+            200, text=BUNDLE, headers={"Content-Type": "application/javascript"}
+        )
+        router.get("/admin").respond(200, text="ok")
+        router.get(url__regex=r".*").respond(404)
+        res = await scan_admin_paths(
+            base, ["admin", "login", "backup"], concurrency=2, crawl=CrawlBudget()
+        )
+    paths = [r.path for r in res]
+    assert sorted(paths) == sorted(
+        ["/admin", "/login", "/backup", "/admin/users", "/api/dashboard/stats"]
+    )
+    assert [r.path for r in res if r.ok] == ["/admin"]
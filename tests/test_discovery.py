@@ -1,12 +1,17 @@
+import asyncio
+import gzip
+
 import pytest
 import respx
 
 from admin_page_finder.discovery import (
     fetch_homepage_hints,
+    fetch_robots,
     fetch_robots_paths,
     fetch_sitemap_paths,
 )
 from admin_page_finder.http import AsyncHttpClient
+from admin_page_finder.sitemap import SitemapParser, _same_site
 
 
 @pytest.mark.asyncio
@@ -50,3 +55,77 @@ async def test_fetch_sitemap_paths_and_homepage():
         await client.aclose()
     assert "/admin/login" in sm
     assert "/dashboard" in hp
+
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+def urlset(*paths):
+    urls = "".join(f"<url><loc>http://example.com{p}</loc></url>" for p in paths)
+    return f'<urlset xmlns="{SITEMAP_NS}">{urls}</urlset>'
+
+
+def sitemapindex(*locs):
+    entries = "".join(f"<sitemap><loc>{loc}</loc></sitemap>" for loc in locs)
+    return f'<sitemapindex xmlns="{SITEMAP_NS}">{entries}</sitemapindex>'
+
+
+def test_sitemap_parser_reads_gzip_fed_a_byte_at_a_time():
+    body = gzip.compress(urlset("/a", "/admin/x?y=1&amp;z=2").encode())
+    parser = SitemapParser()
+    locs = [loc for i in range(len(body)) for loc in parser.feed(body[i : i + 1])]
+    assert locs == ["http://example.com/a", "http://example.com/admin/x?y=1&z=2"]
+    assert not parser.is_index
+
+
+def test_sitemap_parser_stops_at_max_bytes():
+    parser = SitemapParser(max_bytes=200)
+    locs = parser.feed(urlset(*(f"/admin/{i}" for i in range(100))).encode())
+    assert parser.done and parser.size == 200
+    assert 0 < len(locs) < 100
+
+
+def test_sitemap_parser_caps_gzip_output():
+    body = gzip.compress(b"<urlset>" + b" " * 10_000_000)
+    parser = SitemapParser(max_bytes=1000)
+    for i in range(len(body)):
+        parser.feed(body[i : i + 1])
+        assert parser.size <= 1000
+    assert parser.done
+
+
+def test_same_site_rejects_bare_suffixes():
+    assert _same_site("example.com", "www.example.com")
+    assert _same_site("cdn.example.com", "example.com")
+    assert not _same_site("com", "example.com")
+    assert not _same_site("co.uk", "www.example.co.uk")
+    assert not _same_site("other.com", "example.com")
+
+
+@pytest.mark.asyncio
+async def test_fetch_sitemap_paths_follows_robots_and_indexes():
+    base = "http://example.com"
+    with respx.mock(base_url=base, assert_all_called=False) as router:
+        router.get("/robots.txt").respond(
+            200, text="Sitemap: http://example.com/maps/root.xml\nDisallow: /admin-old/\n"
+        )
+        router.get("/maps/root.xml").respond(
+            200, text=sitemapindex("/maps/pages.xml.gz", "http://other.org/s.xml", "/maps/deep.xml")
+        )
+        router.get("/maps/pages.xml.gz").respond(
+            200,
+            content=gzip.compress(urlset("/shop", "/wp-login.php").encode()),
+            headers={"Content-Type": "application/x-gzip"},
+        )
+        router.get("/maps/deep.xml").respond(200, text=sitemapindex("/maps/deeper.xml"))
+        router.get("/maps/deeper.xml").respond(200, text=sitemapindex("/maps/deepest.xml"))
+        deepest = router.get("/maps/deepest.xml").respond(200, text=urlset("/admin/deep"))
+        other = router.get("http://other.org/s.xml").respond(200, text=urlset("/admin"))
+        router.get(url__regex=r".*").respond(404)
+        client = AsyncHttpClient()
+        robots = asyncio.ensure_future(fetch_robots(client, base))
+        paths = await fetch_sitemap_paths(client, base, robots=robots)
+        await client.aclose()
+    assert paths == ["/wp-login.php"]
+    assert (await robots).disallowed == ["/admin-old/"]
+    assert not deepest.called and not other.called
@@ -0,0 +1,55 @@
+import pytest
+import respx
+
+from admin_page_finder.http import AsyncHttpClient, ProtocolChooser
+
+
+def test_protocol_chooser_keeps_h1_only_when_clearly_faster():
+    chooser = ProtocolChooser(samples=2)
+    assert chooser.route("a") == "h2"
+    chooser.record("a", "h2", "HTTP/2", 0.050)
+    routes = [chooser.route("a") for _ in range(4)]
+    assert routes.count("h1") == 2 and routes.count("h2") == 2
+    chooser.record("a", "h1", "HTTP/1.1", 0.010)
+    chooser.record("a", "h1", "HTTP/1.1", 0.012)
+    chooser.record("a", "h2", "HTTP/2", 0.060)
+    assert chooser.choice["a"] == "h1" and chooser.route("a") == "h1"
+
+    # A host that never offers h2 stays on the negotiating pool.
+    chooser.record("b", "h2", "HTTP/1.1", 0.010)
+    assert chooser.route("b") == "h2"
+
+
+async def test_client_shards_pools_and_shares_cookies():
+    client = AsyncHttpClient(pool_size=10, http_version="h1")
+    assert len(client._pools.clients) == 3
+    try:
+        with respx.mock(base_url="http://example.com") as router:
+            router.get("/login").respond(200, headers={"Set-Cookie": "sid=1; Path=/"})
+            seen = router.get("/admin").respond(200)
+            await client.get("http://example.com/login")
+            client._pools.inflight[0] = 5  # push the next request onto another pool
+            await client.get("http://example.com/admin")
+        assert seen.calls.last.request.headers["cookie"] == "sid=1"
+        assert client._pools.inflight == [5, 0, 0]
+    finally:
+        client._pools.inflight[0] = 0
+        await client.aclose()
+
+
+async def test_h2_hosts_spread_over_pools():
+    client = AsyncHttpClient(pool_size=20, http_version="h2")
+    try:
+        hosts = [f"h{i}.example:443" for i in range(16)]
+        homes = [client._pools_for(host)[2] for host in hosts]
+        # Each host sticks to one pool, and no pool holds more hosts than connections.
+        assert homes == [client._pools_for(host)[2] for host in hosts]
+        assert max(homes.count(i) for i in set(homes)) <= 4
+        assert len(set(homes)) == len(client._pools.clients) == 5
+    finally:
+        await client.aclose()
+
+
+def test_client_rejects_unknown_http_version():
+    with pytest.raises(ValueError):
+        AsyncHttpClient(http_version="h3")
@@ -0,0 +1,51 @@
+import httpx
+import pytest
+import respx
+
+from admin_page_finder.metrics import MetricsTextfileWriter, ScanMetrics, serve_metrics
+from admin_page_finder.scanner import scan_admin_paths
+from admin_page_finder.stats import ScanStats
+
+
+@pytest.mark.asyncio
+async def test_scan_feeds_metrics():
+    base = "http://example.com"
+    stats = ScanStats()
+    metrics = ScanMetrics(stats)
+    with respx.mock(base_url=base) as router:
+        router.get("/admin/").respond(200, text="ok")
+        router.get("/missing").respond(404)
+        await scan_admin_paths(
+            base, ["admin/", "missing"], calibrate=False, stats=stats, metrics=metrics
+        )
+    assert metrics.requests[("GET", 200)] == 1
+    assert metrics.requests[("GET", 404)] == 1
+    assert metrics.duration_count == 2
+    text = metrics.render()
+    assert 'apf_requests_total{method="GET",code="200"} 1' in text
+    assert 'apf_request_duration_seconds_bucket{le="+Inf"} 2' in text
+    assert "apf_probes_completed_total 2" in text
+    assert "apf_probes_queued 0" in text
+
+
+@pytest.mark.asyncio
+async def test_serve_metrics_and_textfile(tmp_path):
+    metrics = ScanMetrics()
+    metrics.observe_retry()
+    server = await serve_metrics(metrics, port=0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        async with httpx.AsyncClient() as client:
+            resp = await client.get(f"http://127.0.0.1:{port}/metrics")
+            missing = await client.get(f"http://127.0.0.1:{port}/other")
+    finally:
+        server.close()
+        await server.wait_closed()
+    assert resp.status_code == 200 and "apf_retries_total 1" in resp.text
+    assert missing.status_code == 404
+
+    out = tmp_path / "apf.prom"
+    writer = MetricsTextfileWriter(metrics, out, interval=60)
+    writer.start()
+    await writer.aclose()
+    assert "apf_retries_total 1" in out.read_text()
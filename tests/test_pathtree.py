@@ -0,0 +1,40 @@
+from admin_page_finder.pathtree import PathTree
+
+
+def drain(walk, present):
+    """Probe order of a walk where only directories in ``present`` exist."""
+    probed = []
+    while (item := walk.pop()) is not None:
+        path, node = item
+        probed.append(path)
+        if node is not None:
+            walk.settle(node, absent=node.path not in present)
+    assert walk.done
+    return probed
+
+
+def test_tree_groups_entries_by_segment():
+    tree = PathTree(["admin/", "admin/login.php", "/admin/#/users", "login?next=/admin"])
+    assert len(tree) == 4
+    admin = tree.root.children["admin"]
+    assert admin.entries == ["admin/", "/admin/#/users"]
+    assert admin.count == 3
+    assert tree.root.children["login"].entries == ["login?next=/admin"]
+
+
+def test_walk_probes_parents_first_and_prunes_absent_subtrees():
+    tree = PathTree(["a/x", "a/y", "a/b/c", "a/b/d", "z/only", "top"])
+    walk = tree.walk()
+    assert drain(walk, present={"/a"}) == ["a/", "z/only", "top", "a/x", "a/y", "a/b/"]
+    assert walk.pruned == 2
+
+
+def test_listed_directory_entry_is_its_own_gate():
+    walk = PathTree(["admin/", "admin/login"]).walk()
+    assert drain(walk, present=set()) == ["admin/"]
+    assert walk.pruned == 1
+
+
+def test_walk_orders_siblings_by_score():
+    walk = PathTree(["a", "b", "c"]).walk(score={"a": 0.1, "b": 0.5, "c": 0.3}.get)
+    assert drain(walk, present=set()) == ["b", "c", "a"]
@@ -0,0 +1,35 @@
+import asyncio
+import io
+
+from rich.console import Console
+
+from admin_page_finder.profiling import ScanProfiler
+
+
+def busy(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+async def test_profiler_phases_lag_and_hot_functions(tmp_path):
+    profiler = ScanProfiler(lag_interval=0.01)
+    profiler.start()
+    profiler.start_lag_monitor()
+    with profiler.phase("scan"):
+        for _ in range(3):
+            with profiler.phase("scan.output"):
+                busy(20_000)
+        await asyncio.sleep(0.05)
+    await profiler.stop_lag_monitor()
+    profiler.stop()
+
+    assert profiler.phases["scan.output"].calls == 3
+    assert profiler.phases["scan"].wall >= profiler.phases["scan.output"].wall
+    assert profiler.lag.count > 0
+    assert any("busy" in row[0] or "genexpr" in row[0] for row in profiler.hot_functions())
+
+    profiler.dump(tmp_path / "scan.prof")
+    assert (tmp_path / "scan.prof").stat().st_size > 0
+    console = Console(file=io.StringIO(), width=120)
+    console.print(profiler.report())
+    text = console.file.getvalue()
+    assert "output" in text and "event-loop lag" in text and "Hot functions" in text
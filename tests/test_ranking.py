@@ -0,0 +1,42 @@
+import json
+
+from admin_page_finder.cache import SqliteCache
+from admin_page_finder.ranking import PRIOR_RATE, HitHistory, PathRanker
+from admin_page_finder.technology import StackFilter
+
+
+def test_history_loads_caches_and_outputs(tmp_path):
+    ndjson = tmp_path / "old.ndjson"
+    ndjson.write_text(
+        "\n".join(
+            json.dumps({"path": p, "status": s, "ok": s == 200})
+            for p, s in [("/admin/", 200), ("/login", 404), ("/login", 404)]
+        ),
+        encoding="utf-8",
+    )
+    db = tmp_path / "cache.db"
+    cache = SqliteCache(db, options={"probe": "head"})
+    cache.add_many([{"target": "http://a", "path": "/admin/", "status": 200, "ok": True}])
+    cache.close()
+
+    history = HitHistory.load([ndjson, db])
+    assert history.hits["/admin/"] == 2 and history.probes["/login"] == 2
+    assert history.rate("admin/") > history.rate("/never-seen") == PRIOR_RATE
+    assert history.rate("/never-seen") > history.rate("/login")
+
+
+def test_history_skips_unreadable_files(tmp_path, caplog):
+    notes = tmp_path / "h.txt"
+    notes.write_text("not a database\n", encoding="utf-8")
+    history = HitHistory.load([notes, tmp_path / "missing.db"])
+    assert len(history) == 0
+    assert notes.read_text(encoding="utf-8") == "not a database\n"
+    assert not (tmp_path / "missing.db").exists()
+    assert "Ignoring scan history" in caplog.text
+
+
+def test_ranker_prefers_the_targets_stack():
+    ranker = PathRanker(HitHistory(), StackFilter({"http://a": {"php"}}))
+    assert ranker("http://a", "/index.php") > ranker("http://a", "/admin/")
+    assert ranker("http://a", "/admin/") > ranker("http://a", "/default.aspx")
+    assert ranker("http://b", "/index.php") == ranker("http://b", "/default.aspx")
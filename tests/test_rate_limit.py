@@ -0,0 +1,52 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from admin_page_finder.rate_limit import AsyncRateLimiter, SharedTokenBucket, TokenBucket
+
+
+def test_token_bucket_reservations_queue_up():
+    bucket = TokenBucket(10, burst=1)
+    now = time.monotonic()
+    assert bucket.reserve(now) == 0.0
+    assert bucket.reserve(now) == pytest.approx(0.1)
+    assert bucket.reserve(now) == pytest.approx(0.2)
+    bucket.refund()
+    assert bucket.reserve(now) == pytest.approx(0.2)
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_paces_concurrent_waiters():
+    limiter = AsyncRateLimiter(200, burst=1)
+    start = time.perf_counter()
+    await asyncio.gather(*(limiter.acquire() for _ in range(41)))
+    assert time.perf_counter() - start == pytest.approx(0.2, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_per_host_buckets_are_independent():
+    limiter = AsyncRateLimiter(None, per_host_rate=1)
+    waits = [await limiter.acquire(h) for h in ("a", "b", "c")]
+    assert waits == [0.0, 0.0, 0.0]
+    with pytest.raises(ValueError):
+        AsyncRateLimiter(None)
+
+
+def _drain(bucket, n):
+    for _ in range(n):
+        bucket.reserve()
+
+
+def test_shared_token_bucket_spans_processes():
+    ctx = multiprocessing.get_context("spawn")
+    bucket = SharedTokenBucket(1, burst=1, ctx=ctx)
+    proc = ctx.Process(target=_drain, args=(bucket, 5))
+    proc.start()
+    proc.join()
+    assert proc.exitcode == 0
+    # The child took the burst token and four more; this one waits behind them.
+    assert bucket.reserve() == pytest.approx(5.0, abs=0.5)
+    limiter = AsyncRateLimiter(None, per_host_rate=1, host_buckets={"a": bucket})
+    assert limiter._buckets("a") == [bucket]
@@ -0,0 +1,74 @@
+import asyncio
+import http.server
+import socket
+import threading
+
+import httpx
+import pytest
+
+from admin_page_finder.resolver import DnsCache, ResolvingTransport, load_hosts_file
+from admin_page_finder.scanner import scan_targets
+
+
+def test_load_hosts_file(tmp_path):
+    path = tmp_path / "hosts"
+    path.write_text("127.0.0.1 localhost app.test  # local\n::1 app.test\nbogus line\n")
+    assert load_hosts_file(path) == {"localhost": ["127.0.0.1"], "app.test": ["127.0.0.1", "::1"]}
+
+
+async def test_dns_cache_shares_lookups_and_remembers_failures():
+    cache = DnsCache(hosts={"pinned.test": "10.0.0.1"})
+    assert await cache.resolve("Pinned.test") == ["10.0.0.1"]
+    assert await cache.resolve("127.0.0.1") == ["127.0.0.1"]
+    first, second = await asyncio.gather(cache.resolve("localhost"), cache.resolve("localhost"))
+    assert first == second and cache.lookups == 1
+    assert cache.cached("localhost") == first
+
+    errors = await cache.prefetch(["nope.invalid", "localhost"])
+    assert errors["localhost"] is None and isinstance(errors["nope.invalid"], OSError)
+    await cache.prefetch(["nope.invalid"])
+    assert cache.lookups == 2
+
+
+async def test_scan_connects_to_pinned_address_and_keeps_host_header():
+    hosts_seen: list[str] = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802
+            hosts_seen.append(self.headers["Host"])
+            self.send_response(200 if self.path == "/admin/" else 404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args, **kwargs):
+            return
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        resolver = DnsCache(hosts={"admin.invalid": "127.0.0.1"})
+        results = await scan_targets(
+            [f"http://admin.invalid:{port}", "http://nope.invalid"],
+            ["admin/"],
+            resolver=resolver,
+        )
+    finally:
+        server.shutdown()
+    assert [(r.url, r.status) for r in results] == [(f"http://admin.invalid:{port}/admin/", 200)]
+    assert hosts_seen == [f"admin.invalid:{port}"]
+
+
+async def test_resolving_transport_raises_httpx_errors():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]  # closed once the block ends
+    resolver = DnsCache(hosts={"down.invalid": "127.0.0.1"})
+    transport = ResolvingTransport(
+        resolver, ssl_context=httpx.create_ssl_context(), limits=httpx.Limits()
+    )
+    async with httpx.AsyncClient(transport=transport) as client:
+        with pytest.raises(httpx.ConnectError):
+            await client.get(f"http://down.invalid:{port}/")
+        with pytest.raises(httpx.ConnectError):
+            await client.get("http://nope.invalid/")
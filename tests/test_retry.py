@@ -0,0 +1,50 @@
+import httpx
+import pytest
+import respx
+
+from admin_page_finder.http import AsyncHttpClient
+from admin_page_finder.retry import RetryBudget, RetryPolicy, parse_retry_after
+from admin_page_finder.scanner import scan_admin_paths
+
+FAST = RetryPolicy(backoff_initial=0.001, backoff_max=0.001)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:05 GMT", now=1445412480.0) == 5.0
+    assert parse_retry_after("soon") is None
+
+
+def test_retry_budget_limits_extra_requests():
+    budget = RetryBudget(ratio=0.1, minimum=0, requests=100)
+    spent = 0
+    while budget.can_retry():
+        budget.retries += 1
+        spent += 1
+    assert spent == 10
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_status_and_counts_them():
+    base = "http://example.com"
+    with respx.mock(base_url=base) as router:
+        router.get("/admin/").mock(
+            side_effect=[
+                httpx.Response(503, headers={"Retry-After": "0"}),
+                httpx.Response(200, text="ok"),
+            ]
+        )
+        res = await scan_admin_paths(base, ["admin/"], retry_policy=FAST)
+    assert res[0].ok and res[0].retries == 1
+
+
+@pytest.mark.asyncio
+async def test_connect_errors_are_not_retried():
+    base = "http://example.com"
+    with respx.mock(base_url=base) as router:
+        route = router.get("/admin/").mock(side_effect=httpx.ConnectError("dns"))
+        client = AsyncHttpClient(retry_policy=FAST)
+        with pytest.raises(httpx.ConnectError):
+            await client.get(f"{base}/admin/")
+        await client.aclose()
+    assert route.call_count == 1
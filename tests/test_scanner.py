@@ -1,7 +1,13 @@
+import asyncio
+import itertools
+
+import httpx
 import pytest
 import respx
 
-from admin_page_finder.scanner import scan_admin_paths
+from admin_page_finder import scanner
+from admin_page_finder.scanner import iter_scan, scan_admin_paths, scan_targets
+from admin_page_finder.stats import ScanStats
 
 
 @pytest.mark.asyncio
@@ -15,3 +21,172 @@ async def test_scan_admin_paths_basic():
     assert any(r.ok and r.path == "/admin/" for r in res)
     assert any((r.status == 302) for r in res)
     assert any((r.status == 404) for r in res)
+
+
+@pytest.mark.asyncio
+async def test_scan_targets_multiple_hosts():
+    with respx.mock(assert_all_called=False) as router:
+        router.get("http://a.example/admin/").respond(200, text="ok")
+        router.get("http://b.example/admin/").respond(404)
+        router.get("http://b.example/panel").respond(200, text="ok")
+        router.get(url__regex=r".*").respond(404)
+        res = await scan_targets(
+            ["a.example", "http://b.example/"],
+            ["admin/"],
+            extra_paths={"b.example": ["panel"]},
+        )
+    hits = {r.url for r in res if r.ok}
+    assert hits == {"http://a.example/admin/", "http://b.example/panel"}
+    assert [r.url for r in res][0].startswith("http://a.example")
+
+
+@pytest.mark.asyncio
+async def test_slow_host_does_not_hold_up_fast_host():
+    async def slow(request):
+        await asyncio.sleep(0.3)
+        return httpx.Response(404)
+
+    with respx.mock(assert_all_called=False) as router:
+        router.get(url__startswith="http://slow.example").mock(side_effect=slow)
+        router.get(url__startswith="http://fast.example").respond(404)
+        hosts = [
+            r.url.split("/")[2]
+            async for r in iter_scan(
+                ["http://slow.example", "http://fast.example"],
+                [f"p{i}" for i in range(20)],
+                concurrency=4,
+                per_host_concurrency=2,
+            )
+        ]
+    # The fast host is done before the slow one answers its first probes.
+    assert hosts[:20] == ["fast.example"] * 20
+    assert hosts.count("slow.example") == 20
+
+
+@pytest.mark.asyncio
+async def test_iter_scan_streams_from_generator():
+    base = "http://example.com"
+    with respx.mock(base_url=base) as router:
+        router.get("/admin/").respond(200, text="ok")
+        router.get(url__regex=r".*").respond(404)
+        paths = (f"p{i}" for i in range(50))
+        seen = [r async for r in iter_scan(base, itertools.chain(["admin/"], paths), concurrency=4)]
+    assert len(seen) == 51
+    assert sum(r.ok for r in seen) == 1
+
+
+@pytest.mark.asyncio
+async def test_head_probe_falls_back_to_get():
+    base = "http://example.com"
+    with respx.mock(base_url=base) as router:
+        head = router.head(url__regex=r".*").respond(405)
+        router.get("/admin/").respond(206, headers={"Content-Range": "bytes 0-1/9000"})
+        router.get(url__regex=r".*").respond(404)
+        res = await scan_admin_paths(
+            base, ["admin/", "a", "b"], probe="head", per_host_concurrency=1
+        )
+    admin = next(r for r in res if r.path == "/admin/")
+    assert admin.ok and admin.status == 200 and admin.content_length == 9000
+    # The host is remembered as not supporting HEAD after the first 405.
+    assert head.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_ranked_scan_stops_after_hits():
+    base = "http://example.com"
+    with respx.mock(base_url=base, assert_all_called=False) as router:
+        router.get("/panel").respond(200, text="ok")
+        router.get(url__regex=r".*").respond(404)
+        paths = [f"p{i}" for i in range(30)] + ["panel"]
+        res = [
+            r
+            async for r in iter_scan(
+                base,
+                paths,
+                concurrency=1,
+                rank=lambda _target, path: 1.0 if path == "panel" else 0.0,
+                stop_after_hits=1,
+            )
+        ]
+    assert [r.path for r in res] == ["/panel"]
+
+
+@pytest.mark.asyncio
+async def test_ranked_scan_streams_the_wordlist(monkeypatch):
+    monkeypatch.setattr(scanner, "RANK_WINDOW", 4)
+    base = "http://example.com"
+    read = 0
+    read_at_first_probe = []
+
+    def paths():
+        nonlocal read
+        for i in range(40):
+            read += 1
+            yield f"p{i}"
+
+    def respond(request):
+        read_at_first_probe.append(read)
+        return httpx.Response(200, text="ok")
+
+    with respx.mock(base_url=base) as router:
+        router.get(url__regex=r".*").mock(side_effect=respond)
+        res = [
+            r.path
+            async for r in iter_scan(
+                base,
+                paths(),
+                concurrency=1,
+                rank=lambda _target, path: int(path[1:]) % 4,
+            )
+        ]
+    assert read_at_first_probe[0] < 40
+    # Within each window the highest score goes first.
+    assert res[:4] == ["/p3", "/p2", "/p1", "/p0"]
+
+
+@pytest.mark.asyncio
+async def test_host_time_budget_stops_new_probes():
+    base = "http://example.com"
+    with respx.mock(base_url=base, assert_all_called=False) as router:
+        router.get(url__regex=r".*").respond(404)
+        res = await scan_admin_paths(base, [f"p{i}" for i in range(20)], host_time_budget=0)
+    assert res == []
+
+
+@pytest.mark.asyncio
+async def test_tree_scan_prunes_missing_directories():
+    base = "http://example.com"
+    paths = ["admin/", "admin/login.php", "admin/index.php"]
+    paths += [f"backup/{name}" for name in ("a", "b", "c")]
+    paths += ["secure/login", "secure/panel", "top.php"]
+    with respx.mock(base_url=base, assert_all_called=False) as router:
+        router.get("/admin/").respond(403)
+        router.get("/admin/login.php").respond(200, text="ok")
+        router.get("/secure/").respond(401)
+        router.get("/secure/panel").respond(200, text="ok")
+        router.get(url__regex=r".*").respond(404)
+        stats = ScanStats()
+        res = await scan_admin_paths(base, paths, concurrency=2, tree=True, stats=stats)
+    probed = {r.path for r in res}
+    assert "/admin/login.php" in probed and "/secure/panel" in probed
+    assert "/backup/" in probed and not probed & {"/backup/a", "/backup/b", "/backup/c"}
+    assert stats.host_pruned == {"example.com": 3}
+    assert {r.path for r in res if r.ok} == {"/admin/login.php", "/secure/panel"}
+
+
+@pytest.mark.asyncio
+async def test_stats_count_jobs_settled_without_a_probe():
+    base = "http://example.com"
+    with respx.mock(base_url=base, assert_all_called=False) as router:
+        router.get(url__regex=r".*").respond(404)
+        stats = ScanStats()
+        async for _ in iter_scan(
+            base,
+            [f"p{i}" for i in range(10)],
+            extra_paths={base: ["p1", "extra"]},
+            skip=lambda _target, path: path in {"/p0", "/extra"},
+            stats=stats,
+        ):
+            pass
+    # p0 and extra are skipped; p1 is probed once, as an extra.
+    assert stats.completed == 9 and stats.skipped == 3
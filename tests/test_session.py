@@ -0,0 +1,72 @@
+import contextlib
+import http.server
+import threading
+
+import pytest
+import respx
+
+from admin_page_finder.discovery import fetch_robots
+from admin_page_finder.metrics import ScanMetrics
+from admin_page_finder.session import ScanSession
+
+
+class KeepAliveHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # noqa: N802
+        body = b"ok" if self.path == "/admin/" else b"not found"
+        self.send_response(200 if self.path == "/admin/" else 404)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    do_HEAD = do_GET
+
+    def log_message(self, *args, **kwargs):
+        return
+
+
+@contextlib.contextmanager
+def serve_keepalive():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    th = threading.Thread(target=server.serve_forever, daemon=True)
+    th.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        th.join(timeout=2)
+
+
+@pytest.mark.asyncio
+async def test_session_shares_connections_across_discovery_and_scans():
+    metrics = ScanMetrics()
+    with serve_keepalive() as base:
+        async with ScanSession(metrics=metrics, http_version="h1") as session:
+            await session.warm_up(base)
+            await fetch_robots(session.client, base)
+            for _ in range(2):
+                res = [
+                    r
+                    async for r in session.scan(
+                        base, ["admin/", "login", "panel"], concurrency=1, per_host_concurrency=1
+                    )
+                ]
+                assert [r.path for r in res if r.ok] == ["/admin/"]
+    assert sum(metrics.requests.values()) == 8
+    assert metrics.connections_opened == 1
+
+
+@pytest.mark.asyncio
+async def test_session_keeps_host_baselines_between_scans():
+    base = "http://example.com"
+    with respx.mock(base_url=base) as router:
+        route = router.get(url__regex=r".*").respond(404)
+        async with ScanSession() as session:
+            for _ in range(2):
+                async for _res in session.scan(base, ["admin/", "login"], calibrate=True):
+                    pass
+            assert len(session.baselines) == 1
+    # Three calibration probes in the first scan only, then two paths per scan.
+    assert route.call_count == 3 + 2 * 2
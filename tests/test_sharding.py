@@ -0,0 +1,65 @@
+import functools
+
+import pytest
+
+from admin_page_finder.cli import _path_seen
+from admin_page_finder.metrics import ScanMetrics
+from admin_page_finder.sharding import iter_scan_sharded
+from admin_page_finder.stats import ScanStats
+
+from .test_integration import serve
+
+
+@pytest.mark.asyncio
+async def test_path_sharding_scans_each_path_once():
+    stats = ScanStats()
+    metrics = ScanMetrics(stats)
+    paths = ["/admin/", "/login", *(f"/missing{i}" for i in range(20))]
+    with serve() as (base, _):
+        results = [
+            r
+            async for r in iter_scan_sharded(
+                base, paths, workers=3, rate_limit=500, stats=stats, metrics=metrics
+            )
+        ]
+    assert sorted(r.path for r in results) == sorted(paths)
+    assert {r.path for r in results if r.ok} == {"/admin/"}
+    assert stats.completed == len(paths)
+    assert sum(metrics.requests.values()) >= len(paths)
+
+
+@pytest.mark.asyncio
+async def test_target_sharding_splits_targets_between_workers():
+    with serve() as (base, _):
+        other = base.replace("127.0.0.1", "localhost")
+        results = [
+            r
+            async for r in iter_scan_sharded(
+                [base, other],
+                ["/admin/", "/missing"],
+                workers=2,
+                extra_paths={other: ["/login"]},
+            )
+        ]
+    assert sorted((r.target, r.path) for r in results) == sorted(
+        [
+            (base, "/admin/"),
+            (base, "/missing"),
+            (other, "/admin/"),
+            (other, "/missing"),
+            (other, "/login"),
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_sharded_stats_count_skipped_jobs():
+    stats = ScanStats()
+    skip = functools.partial(_path_seen, frozenset({"/login", "/missing0"}))
+    paths = ["/admin/", "/login", *(f"/missing{i}" for i in range(4))]
+    with serve() as (base, _):
+        results = [
+            r async for r in iter_scan_sharded(base, paths, workers=2, skip=skip, stats=stats)
+        ]
+    assert len(results) == 4
+    assert stats.completed == 4 and stats.skipped == 2
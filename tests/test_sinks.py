@@ -0,0 +1,43 @@
+import csv
+import json
+
+from admin_page_finder.scanner import ScanResult
+from admin_page_finder.sinks import FIELDNAMES, open_sink
+
+
+def _result(i: int) -> ScanResult:
+    return ScanResult(
+        path=f"/p{i}",
+        url=f"http://example.com/p{i}",
+        status=200 if i == 0 else 404,
+        ok=i == 0,
+        redirected=False,
+        final_url=f"http://example.com/p{i}",
+        elapsed_ms=1,
+        content_length=0,
+    )
+
+
+def test_sinks_stream_parseable_output(tmp_path):
+    paths = {kind: tmp_path / f"out.{kind}" for kind in ("json", "ndjson", "csv")}
+    sinks = [open_sink(kind, p, batch_size=2) for kind, p in paths.items()]
+    for i in range(3):
+        for sink in sinks:
+            sink.write(_result(i))
+    # Full batches are on disk before the sink is closed.
+    assert len(paths["ndjson"].read_text().splitlines()) == 2
+    for sink in sinks:
+        sink.close()
+
+    assert [r["path"] for r in json.loads(paths["json"].read_text())] == ["/p0", "/p1", "/p2"]
+    lines = paths["ndjson"].read_text().splitlines()
+    assert json.loads(lines[0])["ok"] is True and len(lines) == 3
+    with paths["csv"].open(newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == FIELDNAMES and len(rows) == 3
+
+
+def test_empty_json_array(tmp_path):
+    out = tmp_path / "out.json"
+    open_sink("json", out).close()
+    assert json.loads(out.read_text()) == []
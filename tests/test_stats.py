@@ -0,0 +1,44 @@
+import io
+
+import pytest
+from rich.console import Console
+
+from admin_page_finder.dashboard import ScanDashboard
+from admin_page_finder.stats import LatencyHistogram, ScanStats
+
+
+def test_latency_histogram_percentiles():
+    hist = LatencyHistogram()
+    assert hist.percentile(50) is None
+    for ms in range(1, 101):
+        hist.record(ms / 1000)
+    assert hist.percentile(50) == pytest.approx(0.050, rel=0.1)
+    assert hist.percentile(99) == pytest.approx(0.099, rel=0.1)
+
+
+def test_scan_stats_and_dashboard_render():
+    stats = ScanStats()
+    stats.record("a.example", 200, 0.01)
+    stats.record("a.example", 0, 0.5, retries=2)
+    assert stats.completed == 2 and stats.errors == 1 and stats.retries == 2
+    assert stats.rate() > 0
+
+    dashboard = ScanDashboard(stats, total=10)
+    dashboard.advance(2)
+    console = Console(file=io.StringIO(), width=120)
+    console.print(dashboard)
+    text = console.file.getvalue()
+    assert "req/s" in text and "a.example" in text and "err:1" in text
+
+
+def test_dashboard_total_drops_unprobed_jobs():
+    stats = ScanStats()
+    dashboard = ScanDashboard(stats, total=10)
+    stats.skipped = 2
+    stats.host_pruned["a.example"] = 3
+    dashboard.advance(4)
+    Console(file=io.StringIO()).print(dashboard)
+    task = dashboard.progress.tasks[dashboard.task]
+    assert task.total == 5
+    dashboard.finish()
+    assert task.total == task.completed == 4
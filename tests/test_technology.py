@@ -0,0 +1,91 @@
+import pickle
+
+import httpx
+
+from admin_page_finder.cli import WORDLIST_DIR, _builtin_sources
+from admin_page_finder.technology import (
+    STACK_TAGS,
+    StackFilter,
+    detect_technologies,
+    extension_stack,
+)
+from admin_page_finder.wordlist import iter_wordlist
+from admin_page_finder.wordlist_index import compile_index
+
+
+def _page(html="", headers=None, url="https://shop.example/"):
+    headers = {"Content-Type": "text/html", **(headers or {})}
+    return httpx.Response(200, headers=headers, text=html, request=httpx.Request("GET", url))
+
+
+def test_detects_stack_from_headers_and_cookies():
+    resp = _page(headers={"Server": "Apache-Coyote/1.1", "Set-Cookie": "JSESSIONID=1; Path=/"})
+    profile = detect_technologies(resp)
+    assert profile.stacks == {"java"}
+    assert "cookie JSESSIONID" in profile.evidence
+
+    assert detect_technologies(_page(headers={"X-Powered-By": "PHP/8.2"})).stacks == {"php"}
+    assert detect_technologies(_page(headers={"Server": "nginx"})).stacks == set()
+
+
+def test_detects_stack_from_html():
+    html = (
+        '<meta name="generator" content="WordPress 6.4">'
+        '<link href="/wp-content/themes/x.css">'
+        '<script src="https://cdn.example/app.aspx"></script>'
+    )
+    profile = detect_technologies(_page(html))
+    # The third-party .aspx asset does not count.
+    assert profile.stacks == {"php"}
+    assert detect_technologies(_page('<input name="__VIEWSTATE">')).stacks == {"aspnet"}
+
+
+def test_stack_filter_skips_only_foreign_extensions(tmp_path):
+    core = tmp_path / "core.txt"
+    core.write_text("admin/\nadmin/login.aspx\n", encoding="utf-8")
+    java = tmp_path / "java.txt"
+    java.write_text("manager/html\nadmin/\nadmin/login.jsp\n", encoding="utf-8")
+    index = tmp_path / "lists.apfidx"
+    compile_index([(core, ["core"]), (java, ["java"])], index)
+
+    skip = StackFilter({"https://a.example": {"php"}}, index=index)
+    assert skip("https://a.example", "/admin/login.jsp")
+    assert skip("https://a.example", "/default.aspx")
+    assert not skip("https://a.example", "/manager/html")  # java list, but no extension
+    assert not skip("https://a.example", "/admin/login.aspx")  # core
+    assert not skip("https://a.example", "/admin/index.php")
+    assert not skip("https://a.example", "/unlisted")
+    assert not skip("https://b.example", "/admin/login.jsp")  # nothing detected there
+    assert skip.pruned == {"https://a.example": 2}
+
+    copy = pickle.loads(pickle.dumps(skip))
+    assert copy("https://a.example", "/admin/login.jsp")
+    copy.close()
+    skip.close()
+
+
+def test_stack_filter_keeps_generic_paths_on_every_stack():
+    generic = [
+        "/admin/login/",
+        "/admin/auth/login",
+        "/docs",
+        "/admin/index.html",
+        "/accounts/login/",
+        "/phpmyadmin/",
+        "/cms/admin/",
+        "/panel-administracion/",
+    ]
+    for stack in STACK_TAGS:
+        skip = StackFilter({"https://a.example": {stack}})
+        assert not any(skip("https://a.example", p) for p in generic), stack
+
+
+def test_stack_filter_shrinks_the_default_wordlist(tmp_path):
+    index = tmp_path / "builtin.apfidx"
+    compile_index(_builtin_sources(), index)
+    mega = ["/" + p.lstrip("/") for p in iter_wordlist(WORDLIST_DIR / "mega.txt")]
+    skip = StackFilter({"https://a.example": {"php"}}, index=index)
+    skipped = [p for p in mega if skip("https://a.example", p)]
+    skip.close()
+    assert skipped and all(extension_stack(p) not in (None, "php") for p in skipped)
+    assert len(skipped) < len(mega)
@@ -0,0 +1,44 @@
+import tracemalloc
+
+from admin_page_finder.wordlist import FingerprintSet, count_wordlist, dedupe, iter_wordlist
+
+
+def test_iter_wordlist_skips_comments_and_blanks(tmp_path):
+    wl = tmp_path / "list.txt"
+    wl.write_text("# header\nadmin/\n\n  login  \n#admin2/\n/admin/\n", encoding="utf-8")
+    assert list(iter_wordlist(wl)) == ["admin/", "login", "/admin/"]
+    assert count_wordlist(wl) == 3
+    assert list(dedupe(iter_wordlist(wl))) == ["admin/", "login"]
+
+
+def test_count_wordlist_agrees_with_iter_wordlist(tmp_path):
+    wl = tmp_path / "list.txt"
+    wl.write_text("admin/\n  # indented comment\n\t#tab comment\n \nlogin\n", encoding="utf-8")
+    assert count_wordlist(wl) == len(list(iter_wordlist(wl))) == 2
+
+
+def test_iter_wordlist_empty_file(tmp_path):
+    wl = tmp_path / "empty.txt"
+    wl.write_bytes(b"")
+    assert list(iter_wordlist(wl)) == []
+    assert count_wordlist(wl) == 0
+
+
+def test_fingerprint_set_grows_and_keeps_zero():
+    fps = FingerprintSet(capacity=4)
+    assert all(fps.add(fp) for fp in [0, 1, 8, 16, 2**64 - 1, *range(100, 1100)])
+    assert not fps.add(0) and not fps.add(8) and not fps.add(2**64 - 1)
+    assert len(fps) == 1005 and 555 in fps and 99 not in fps
+
+
+def test_dedupe_memory_is_bounded():
+    n = 60_000
+    tracemalloc.start()
+    try:
+        kept = sum(1 for _ in dedupe((f"dir{i % 30_000}/page" for i in range(n)), n))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert kept == 30_000
+    # A set of int fingerprints would take about 73 bytes per entry.
+    assert peak < 32 * n
@@ -0,0 +1,53 @@
+import pytest
+from typer.testing import CliRunner
+
+from admin_page_finder.cli import app
+from admin_page_finder.wordlist_index import WordlistIndex, compile_index, is_index
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    core = tmp_path / "core.txt"
+    core.write_text("# core\nadmin/\nlogin\n/dashboard\n", encoding="utf-8")
+    php = tmp_path / "php.txt"
+    php.write_text("/admin/\nadmin.php\nlogin \n", encoding="utf-8")
+    out = tmp_path / "lists.apfidx"
+    assert compile_index([(core, ["core"]), (php, ["php"])], out) == 4
+    return out
+
+
+def test_compiled_index_dedupes_and_merges_tags(index_path):
+    assert is_index(index_path)
+    with WordlistIndex(index_path) as index:
+        assert list(index) == ["admin/", "login", "dashboard", "admin.php"]
+        assert index.tags_of(index.find("/admin/")) == ["core", "php"]
+        assert "dashboard" in index and "missing" not in index
+        assert list(index.select(["php"])) == ["admin/", "login", "admin.php"]
+        assert list(index.select(exclude_tags=["php"])) == ["dashboard"]
+        assert index.count(["core"], exclude_tags=["php"]) == 1
+        with pytest.raises(KeyError):
+            index.count(["java"])
+
+
+def test_set_operations_between_indexes(index_path, tmp_path):
+    seen = tmp_path / "seen.txt"
+    seen.write_text("login\nextra\n", encoding="utf-8")
+    seen_index = tmp_path / "seen.apfidx"
+    compile_index([(seen, ["seen"])], seen_index)
+    with WordlistIndex(index_path) as index, WordlistIndex(seen_index) as other:
+        assert list(index.select(["core", "php"], exclude=other)) == [
+            "admin/",
+            "dashboard",
+            "admin.php",
+        ]
+        assert list(index.intersection(other)) == ["login"]
+        assert list(index.union(other))[-1] == "extra"
+    assert not is_index(seen)
+
+
+def test_wordlist_query_command(index_path):
+    result = CliRunner().invoke(
+        app, ["wordlist", "query", str(index_path), "--tags", "php", "--exclude-tags", "core"]
+    )
+    assert result.exit_code == 0
+    assert result.stdout.split() == ["admin.php"]